@@ -14,7 +14,7 @@
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import workspaces, sessions, artifacts, auth, events
+from app.api.v1.endpoints import workspaces, sessions, artifacts, auth, events, metrics, jobs
 
 api_router = APIRouter()
 
@@ -23,3 +23,5 @@ api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"]
 api_router.include_router(artifacts.router, prefix="/artifacts", tags=["artifacts"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -13,15 +13,30 @@
 # interaction patterns), may not be used, redistributed, or adapted
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from app.db.session import get_db
+from app.core.ghost_store import get_ghost_store
+from app.core.artifact.versions import VersionNotLoaded
 from app.schemas.artifact import (
     Artifact as ArtifactSchema,
+    ArtifactBatchGetRequest,
+    ArtifactBatchResult,
+    ArtifactBatchUpsertRequest,
     ArtifactCreate,
+    ArtifactPrefetchRequest,
+    ArtifactPrefetchResult,
     ArtifactUpdate,
+    GhostCreate,
+    GhostDiscardResult,
+    GhostMutation,
+    MutationHeader,
+    MutationPage,
+    MutationRecord as MutationRecordSchema,
 )
 from app.services.artifact_service import ArtifactService
+from app.services.llm_context import LLMContextService
 from app.api.deps import get_current_user, oauth2_scheme
 from app.schemas.user import User
 
@@ -52,6 +67,85 @@ async def create_artifact(
     return await ArtifactService.create_or_update_artifact(db, artifact_in, token=token)
 
 
+@router.post("/batch-get", response_model=ArtifactBatchResult, tags=["artifacts"])
+async def batch_get_artifacts(
+    batch_in: ArtifactBatchGetRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """Load the artifacts of many panes at once, each with a status."""
+    items = await ArtifactService.batch_get(db, batch_in.artifact_ids, token=token)
+    return ArtifactBatchResult(items=items)
+
+
+@router.post("/batch-upsert", response_model=ArtifactBatchResult, tags=["artifacts"])
+async def batch_upsert_artifacts(
+    batch_in: ArtifactBatchUpsertRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """Create or update many artifacts in one transaction, each with a status."""
+    items = await ArtifactService.batch_upsert(db, batch_in.artifacts, token=token)
+    return ArtifactBatchResult(items=items)
+
+
+@router.post("/prefetch", response_model=ArtifactPrefetchResult, tags=["artifacts"])
+async def prefetch_artifacts(
+    prefetch_in: ArtifactPrefetchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Warm the payloads of artifacts a turn is about to reference (e.g. when
+    `@P2` is typed or a pane is focused), so the execute call does not pay
+    for loading them.
+    """
+    ids = list(dict.fromkeys(prefetch_in.artifact_ids))
+    outcomes = await LLMContextService.prefetch_artifacts(db, ids, token=token)
+    return ArtifactPrefetchResult(artifacts=outcomes)
+
+
+@router.get("/{id}/versions", response_model=MutationPage, tags=["artifacts"])
+async def list_versions(
+    id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """The artifact's version history, oldest first, without payloads."""
+    page = await ArtifactService.list_versions(db, id, offset=offset, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    items, total = page
+    return MutationPage(items=items, total=total, offset=offset, limit=limit)
+
+
+@router.get(
+    "/{id}/versions/{version_id}", response_model=MutationRecordSchema, tags=["artifacts"]
+)
+async def get_version(
+    id: str,
+    version_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    mutation = await ArtifactService.get_version(db, id, version_id)
+    if not mutation:
+        raise HTTPException(status_code=404, detail="Version not found")
+    try:
+        payload = await ArtifactService.load_version_payload(db, mutation, token=token)
+    except VersionNotLoaded:
+        raise HTTPException(status_code=404, detail="Version payload is no longer stored")
+    return MutationRecordSchema.model_validate(
+        {**MutationHeader.model_validate(mutation).model_dump(), "payload": payload}
+    )
+
+
 @router.patch("/{id}", response_model=ArtifactSchema, tags=["artifacts"])
 async def update_artifact(
     id: str,
@@ -64,3 +158,73 @@ async def update_artifact(
     if not db_obj:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return await ArtifactService.update_artifact(db, db_obj, artifact_in, token=token)
+
+
+@router.get("/{id}/ghosts", response_model=List[GhostMutation], tags=["artifacts"])
+async def list_ghosts(
+    id: str,
+    current_user: User = Depends(get_current_user),
+):
+    return get_ghost_store().list(current_user.id, id)
+
+
+@router.post("/{id}/ghosts", response_model=GhostMutation, tags=["artifacts"])
+async def create_ghost(
+    id: str,
+    ghost_in: GhostCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """Add an iteration to the ghost session; nothing is written to the DB."""
+    db_obj = await ArtifactService.get_artifact(db, id, token=token)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    origin = ghost_in.origin.model_dump() if ghost_in.origin else {"type": "adhoc_command"}
+    return ArtifactService.create_adhoc_mutation(
+        id,
+        ghost_in.payload,
+        origin,
+        parent_id=ArtifactService.head_version(db_obj),
+        owner=current_user.id,
+        change_summary=ghost_in.change_summary or "Ghost iteration",
+    )
+
+
+@router.post(
+    "/{id}/ghosts/{ghost_id}/accept", response_model=ArtifactSchema, tags=["artifacts"]
+)
+async def accept_ghost(
+    id: str,
+    ghost_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    db_obj = await ArtifactService.get_artifact(db, id, token=token)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    accepted = await ArtifactService.accept_ghost(
+        db, db_obj, ghost_id, owner=current_user.id, token=token
+    )
+    if not accepted:
+        raise HTTPException(status_code=404, detail="Ghost not found or expired")
+    return accepted
+
+
+@router.post(
+    "/{id}/ghosts/discard", response_model=GhostDiscardResult, tags=["artifacts"]
+)
+async def discard_ghosts(
+    id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    db_obj = await ArtifactService.get_artifact(db, id, token=token)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    discarded, recycled = await ArtifactService.discard_ghosts(
+        db, db_obj, owner=current_user.id
+    )
+    return GhostDiscardResult(discarded=discarded, recycled=recycled)
@@ -18,30 +18,51 @@ from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 import json
 from app.services.auth.dependency import get_auth_service
-from app.db.session import AsyncSessionLocal
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.session import get_session_factory
+from app.core.events import Subscription, get_event_bus
 
 router = APIRouter()
 
+HEARTBEAT_INTERVAL = 10
 
-async def event_generator(request: Request):
-    while True:
-        if await request.is_disconnected():
-            break
 
-        # Simple heartbeat
-        payload = json.dumps(
-            {"type": "heartbeat", "timestamp": asyncio.get_event_loop().time()}
-        )
-        yield f"data: {payload}\n\n"
-        await asyncio.sleep(10)
+def heartbeat():
+    return {"type": "heartbeat", "timestamp": asyncio.get_event_loop().time()}
+
+
+async def event_generator(request: Request, subscription: Subscription):
+    try:
+        event = heartbeat()
+        while True:
+            if await request.is_disconnected():
+                break
+
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+            try:
+                event = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # Simple heartbeat
+                event = heartbeat()
+    finally:
+        get_event_bus().unsubscribe(subscription)
 
 
 @router.get("/stream", tags=["events"])
 async def stream_events(
     request: Request,
     token: str = None,
-    auth_service = Depends(get_auth_service)
+    workspace_id: str = None,
+    auth_service = Depends(get_auth_service),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):
+    """
+    Server-sent events for the current user. Streaming chat turns in
+    `workspace_id` (default: the user's active workspace) are relayed as
+    `turn_start`, `turn_frame` and `turn_end` events; a viewer that falls
+    behind, or joins mid-turn, receives a `turn_snapshot` instead. Streaming
+    a workspace the user is not a member of is refused with 403.
+    """
     if not token:
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
@@ -50,9 +71,18 @@ async def stream_events(
     if not token:
         raise HTTPException(status_code=401, detail="Missing authentication token")
 
-    async with AsyncSessionLocal() as db:
+    async with session_factory() as db:
         user = await auth_service.validate_token(token, db)
         if not user:
              raise HTTPException(status_code=401, detail="Invalid authentication token")
 
-    return StreamingResponse(event_generator(request), media_type="text/event-stream")
+    workspace_id = workspace_id or user.active_workspace_id
+    if workspace_id and workspace_id not in {
+        m.workspace_id for m in user.memberships
+    }:
+        raise HTTPException(status_code=403, detail="Not a member of this workspace")
+
+    subscription = get_event_bus().subscribe(user.id, workspace_id)
+    return StreamingResponse(
+        event_generator(request, subscription), media_type="text/event-stream"
+    )
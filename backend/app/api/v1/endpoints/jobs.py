@@ -0,0 +1,31 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.jobs import get_job_manager
+from app.api.deps import get_current_user
+from app.schemas.job import Job
+from app.schemas.user import User
+
+router = APIRouter()
+
+
+@router.get("/{id}", response_model=Job, tags=["jobs"])
+async def get_job(id: str, current_user: User = Depends(get_current_user)):
+    job = get_job_manager().get(id)
+    # Other users' jobs are reported as missing
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
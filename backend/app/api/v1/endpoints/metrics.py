@@ -0,0 +1,27 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from app.core.metrics import get_metrics_registry
+from app.api.deps import get_current_user
+from app.schemas.user import User
+
+router = APIRouter()
+
+
+@router.get("/", response_model=Dict[str, Any], tags=["metrics"])
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    return get_metrics_registry().snapshot()
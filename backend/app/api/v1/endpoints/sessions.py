@@ -13,17 +13,28 @@
 # interaction patterns), may not be used, redistributed, or adapted
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
+from app.db.session import get_db, get_session_factory
+from app.core.config import get_settings
+from app.core.jobs import JobQueueFull
+from app.core.admission import AdmissionRejected, get_admission_controller
+from app.core.events import get_event_bus
+from app.core.turn_stream import (
+    TurnNotFound,
+    TurnWindowLost,
+    get_turn_broker,
+    parse_event_id,
+)
 from app.schemas.chat import (
     ChatSession,
     ChatSessionUpdate,
     ExecutionRequest,
     ExecutionResponse,
 )
+from app.schemas.job import JobAccepted
 from app.services.session_service import SessionService
 from app.services.execution_service import ExecutionService
 from app.api.deps import get_current_user, oauth2_scheme
@@ -32,6 +43,12 @@ from app.schemas.user import User
 router = APIRouter()
 
 
+def _turn_response(turn_id: str, frames) -> StreamingResponse:
+    return StreamingResponse(
+        frames, media_type="text/event-stream", headers={"X-Turn-Id": turn_id}
+    )
+
+
 @router.get(
     "/workspace/{workspace_id}", response_model=List[ChatSession], tags=["sessions"]
 )
@@ -70,21 +87,134 @@ async def update_session(
     return db_obj
 
 
-@router.post("/execute", response_model=ExecutionResponse, tags=["sessions"])
+@router.post(
+    "/execute",
+    response_model=ExecutionResponse,
+    responses={202: {"model": JobAccepted}},
+    tags=["sessions"],
+)
 async def execute_interaction(
     req: ExecutionRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
     current_user: User = Depends(get_current_user),
     token: str = Depends(oauth2_scheme)
 ):
+    if req.background:
+        try:
+            job = ExecutionService.submit_job(
+                session_factory, req, user_id=current_user.id, token=token
+            )
+        except JobQueueFull as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(get_settings().JOB_RETRY_AFTER_SECONDS)},
+            )
+        accepted = JobAccepted(job_id=job.id, status=job.status)
+        return JSONResponse(
+            status_code=202,
+            content=accepted.model_dump(),
+            headers={"Location": f"{get_settings().API_V1_STR}/jobs/{job.id}"},
+        )
+
+    broker = get_turn_broker()
+    resume = parse_event_id(request.headers.get("last-event-id"))
+    if req.stream and req.type == "chat" and resume:
+        # A re-submitted turn resumes from the log instead of running again
+        turn_id, after_seq = resume
+        try:
+            frames = await broker.attach(
+                turn_id, current_user.id, after_seq, request.is_disconnected
+            )
+            return _turn_response(turn_id, frames)
+        except TurnWindowLost:
+            raise HTTPException(status_code=410, detail="Stream position expired")
+        except TurnNotFound:
+            pass
+
+    try:
+        ticket = await get_admission_controller().acquire(current_user.id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     if req.stream and req.type == "chat":
-        return StreamingResponse(
-            ExecutionService.execute_stream(db, req, token=token), media_type="text/event-stream"
+        # The turn runs on its own DB session and outlives this response;
+        # the admission slot is held until the turn itself ends
+        def produce(is_abandoned):
+            return ticket.guard(
+                ExecutionService.execute_stream_detached(
+                    session_factory, req, token=token, is_disconnected=is_abandoned
+                )
+            )
+
+        # Other viewers of the workspace follow the turn over /events/stream
+        bus = get_event_bus()
+        try:
+            workspace_id = (
+                await SessionService.get_workspace_id(db, req.session_id)
+                or "default_workspace"
+            )
+            turn_id = await broker.start(
+                current_user.id,
+                produce,
+                on_frame=bus.publish_turn_frame,
+                on_close=bus.end_turn,
+            )
+        except BaseException:
+            ticket.release()
+            raise
+        bus.begin_turn(
+            turn_id, workspace_id, session_id=req.session_id, user_id=current_user.id
+        )
+        frames = await broker.attach(
+            turn_id, current_user.id, 0, request.is_disconnected
         )
+        return _turn_response(turn_id, frames)
 
-    result = await ExecutionService.execute(db, req, token=token)
+    try:
+        result = await ExecutionService.execute(db, req, token=token)
+    finally:
+        ticket.release()
     if not result.get("success"):
         raise HTTPException(
             status_code=400, detail=result.get("message", "Execution failed")
         )
     return result
+
+
+@router.get("/turns/{turn_id}/stream", tags=["sessions"])
+async def resume_turn_stream(
+    turn_id: str,
+    request: Request,
+    last_event_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Replay a streaming turn's frames after `Last-Event-ID` (header, or the
+    `last_event_id` query parameter) and follow it until it ends.
+    """
+    event_id = request.headers.get("last-event-id") or last_event_id
+    after_seq = 0
+    if event_id:
+        parsed = parse_event_id(event_id)
+        if parsed is None and event_id.isdigit():
+            parsed = (turn_id, int(event_id))
+        if parsed is None or parsed[0] != turn_id:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+        after_seq = parsed[1]
+
+    try:
+        frames = await get_turn_broker().attach(
+            turn_id, current_user.id, after_seq, request.is_disconnected
+        )
+    except TurnWindowLost:
+        raise HTTPException(status_code=410, detail="Stream position expired")
+    except TurnNotFound:
+        raise HTTPException(status_code=404, detail="Turn not found")
+    return _turn_response(turn_id, frames)
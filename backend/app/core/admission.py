@@ -0,0 +1,175 @@
+import asyncio
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, Hashable
+from app.core.config import get_settings
+
+
+class AdmissionRejected(Exception):
+    """The turn was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted turn's slot. Releasing is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", user: Hashable):
+        self._controller = controller
+        self._user = user
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self._user)
+
+    async def guard(self, stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Yield from `stream`, holding the slot until it ends or is closed."""
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            self.release()
+
+
+class AdmissionController:
+    """
+    Caps concurrent turns globally and per user.
+
+    Turns that cannot start right away wait in a short queue: FIFO within a
+    user, round-robin across users, so one user's backlog cannot starve
+    others. When the queue (or the user's share of it) is full, or a turn
+    waits longer than `queue_timeout`, AdmissionRejected is raised.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_user: int,
+        queue_size: int,
+        queue_per_user: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.queue_per_user = queue_per_user
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._user_in_flight: Dict[Hashable, int] = {}
+        # Users with waiters, in round-robin order
+        self._waiting: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _can_run(self, user: Hashable) -> bool:
+        return (
+            self._in_flight < self.max_concurrent
+            and self._user_in_flight.get(user, 0) < self.max_per_user
+        )
+
+    def _grant(self, user: Hashable) -> Ticket:
+        self._in_flight += 1
+        self._user_in_flight[user] = self._user_in_flight.get(user, 0) + 1
+        self._admitted += 1
+        return Ticket(self, user)
+
+    async def acquire(self, user: Hashable) -> Ticket:
+        if not self._waiting.get(user) and self._can_run(user):
+            # Only overtake the queue when no waiting user could use the slot
+            if not any(self._can_run(u) for u in self._waiting):
+                return self._grant(user)
+
+        waiters = self._waiting.get(user)
+        if self._queued >= self.queue_size or (
+            waiters is not None and len(waiters) >= self.queue_per_user
+        ):
+            self._rejected += 1
+            raise AdmissionRejected("Too many concurrent requests", self.retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        if waiters is None:
+            waiters = self._waiting[user] = deque()
+        waiters.append(future)
+        self._queued += 1
+        try:
+            return await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up; hand the slot back
+                future.result().release()
+            else:
+                self._remove_waiter(user, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self._timed_out += 1
+                raise AdmissionRejected(
+                    "Timed out waiting for a slot", self.retry_after
+                )
+            raise
+
+    def _remove_waiter(self, user: Hashable, future: asyncio.Future) -> None:
+        waiters = self._waiting.get(user)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self._queued -= 1
+            if not waiters:
+                del self._waiting[user]
+
+    def _release(self, user: Hashable) -> None:
+        self._in_flight -= 1
+        remaining = self._user_in_flight.get(user, 0) - 1
+        if remaining > 0:
+            self._user_in_flight[user] = remaining
+        else:
+            self._user_in_flight.pop(user, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for user in list(self._waiting):
+            if self._in_flight >= self.max_concurrent:
+                return
+            if not self._can_run(user):
+                continue
+            waiters = self._waiting.pop(user)
+            future = waiters.popleft()
+            self._queued -= 1
+            # Served users go to the back of the rotation
+            if waiters:
+                self._waiting[user] = waiters
+            if future.done():
+                # Abandoned (timed out or cancelled) but not yet removed
+                continue
+            future.set_result(self._grant(user))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "users_in_flight": len(self._user_in_flight),
+            "users_queued": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+        }
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+        max_per_user=settings.ADMISSION_MAX_PER_USER,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_per_user=settings.ADMISSION_QUEUE_PER_USER,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
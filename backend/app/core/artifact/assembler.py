@@ -0,0 +1,165 @@
+import json
+import logging
+import re
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters that can legally open a top-level JSON value
+_JSON_START = set('{["-0123456789tfn')
+_CLOSERS = {"}": "{", "]": "["}
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NON_WS = re.compile(r"\S")
+
+
+class JSONStreamScanner:
+    """
+    Push-style structural scanner for a JSON document that arrives in chunks.
+
+    It tracks string/escape state and bracket nesting so that a payload which
+    can no longer become valid JSON (mismatched closers, trailing garbage,
+    non-JSON leading text) is flagged as soon as the offending chunk arrives.
+    Scalars are not validated here; the final parse takes care of those.
+    """
+
+    def __init__(self):
+        self.malformed = False
+        self.error: Optional[str] = None
+        self._started = False
+        self._scalar = False
+        self._finished = False
+        self._in_string = False
+        self._escape = False
+        self._stack = []
+
+    @property
+    def complete(self) -> bool:
+        return self._finished and not self.malformed
+
+    def _fail(self, reason: str) -> None:
+        self.malformed = True
+        self.error = reason
+
+    def feed(self, chunk: str) -> None:
+        if self.malformed or self._scalar or not chunk:
+            return
+
+        pos = 0
+        end = len(chunk)
+
+        if not self._started:
+            m = _NON_WS.search(chunk)
+            if not m:
+                return
+            if m.group() not in _JSON_START:
+                self._fail(f"Unexpected leading character {m.group()!r}")
+                return
+            self._started = True
+            # Bare scalars cannot be checked structurally; leave them to the parser
+            if m.group() not in "{[\"":
+                self._scalar = True
+                return
+            pos = m.start()
+
+        while pos < end:
+            if self._finished:
+                if _NON_WS.search(chunk, pos):
+                    self._fail("Trailing data after top-level value")
+                return
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                m = _STRING_SPECIAL.search(chunk, pos)
+                if not m:
+                    return
+                pos = m.end()
+                if m.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if not self._stack:
+                        self._finished = True
+                continue
+
+            m = _STRUCTURAL.search(chunk, pos)
+            if not m:
+                return
+            char = m.group()
+            pos = m.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+            else:
+                if not self._stack or self._stack[-1] != _CLOSERS[char]:
+                    self._fail(f"Unbalanced {char!r}")
+                    return
+                self._stack.pop()
+                if not self._stack:
+                    self._finished = True
+
+
+class ArtifactPayloadAssembler:
+    """
+    Accumulates the streamed payload of a single generated artifact.
+
+    Chunks are written into a spooled buffer (kept in memory up to
+    `spool_bytes`, then moved to a temporary file) instead of a list of
+    strings, and are scanned as they arrive so malformed JSON is detected
+    before the end of the stream.
+    """
+
+    def __init__(
+        self,
+        artifact_id: str,
+        artifact_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        spool_bytes: int = 1024 * 1024,
+    ):
+        self.artifact_id = artifact_id
+        self.artifact_type = artifact_type
+        self.metadata = metadata or {}
+        self.size = 0
+        self.scanner = JSONStreamScanner()
+        self._buffer = tempfile.SpooledTemporaryFile(
+            max_size=spool_bytes, mode="w+", encoding="utf-8"
+        )
+
+    @property
+    def malformed(self) -> bool:
+        return self.scanner.malformed
+
+    @property
+    def spilled(self) -> bool:
+        return bool(getattr(self._buffer, "_rolled", False))
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        was_malformed = self.scanner.malformed
+        self.scanner.feed(chunk)
+        if self.scanner.malformed and not was_malformed:
+            logger.warning(
+                f"Artifact {self.artifact_id} payload is not valid JSON "
+                f"({self.scanner.error}); keeping raw content"
+            )
+        self._buffer.write(chunk)
+        self.size += len(chunk)
+
+    def result(self) -> Any:
+        """Parse the accumulated payload, falling back to raw content."""
+        self._buffer.seek(0)
+        if not self.scanner.malformed:
+            try:
+                return json.load(self._buffer)
+            except json.JSONDecodeError:
+                self._buffer.seek(0)
+        return {"raw_content": self._buffer.read()}
+
+    def close(self) -> None:
+        self._buffer.close()
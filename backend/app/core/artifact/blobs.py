@@ -0,0 +1,14 @@
+import hashlib
+import json
+from typing import Any, Tuple
+
+
+def canonical_json(payload: Any) -> str:
+    """Key-sorted, whitespace-free JSON: equal payloads encode identically."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def payload_digest(payload: Any) -> Tuple[str, int]:
+    """SHA-256 hex digest of the canonical JSON of `payload`, and its size in bytes."""
+    encoded = canonical_json(payload).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest(), len(encoded)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from app.core.artifact.store import ArtifactStore
+
+_Key = Tuple[str, str]  # (artifact_id, storage_key)
+
+
+class _Entry:
+    __slots__ = ("encoded", "expires_at")
+
+    def __init__(self, encoded: str, expires_at: Optional[float]):
+        self.encoded = encoded
+        self.expires_at = expires_at
+
+
+class CachingArtifactStore(ArtifactStore):
+    """
+    Read-through cache in front of another ArtifactStore.
+
+    Payloads are kept JSON-encoded, so every hit hands out a fresh copy and
+    the budget is counted in bytes. Entries are evicted least recently used
+    beyond `max_bytes` and, with a `ttl_seconds`, expire after it. Saving an
+    artifact drops its cached payloads, and concurrent misses for the same
+    key share a single load from the inner store.
+
+    The cache is per process and only sees saves made through it. Artifacts
+    are saved with save_revision, so every save records a new storage key
+    and a reader in another process misses instead of getting the old
+    payload; a key that is overwritten in place (by an outside writer) is
+    served stale until `ttl_seconds`, if set.
+    """
+
+    def __init__(self, inner: ArtifactStore, max_bytes: int, ttl_seconds: float = 0):
+        self.inner = inner
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[_Key, asyncio.Future] = {}
+        # In-flight loads that raced with a save; their result is not cached
+        self._stale: Set[_Key] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def save(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
+        try:
+            return await self.inner.save(artifact_id, content, token=token)
+        finally:
+            self.invalidate(artifact_id)
+
+    async def save_revision(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
+        try:
+            return await self.inner.save_revision(artifact_id, content, token=token)
+        finally:
+            self.invalidate(artifact_id)  # Earlier revisions are no longer read
+
+    async def load(self, artifact_id: str, storage_key: str, token: Optional[str] = None) -> Any:
+        key = (artifact_id, storage_key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at is None or entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry.encoded)
+            self._drop(key)
+
+        while key in self._inflight:
+            inflight = self._inflight[key]
+            try:
+                encoded = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if inflight.cancelled():
+                    continue  # The leading load was cancelled; take over
+                raise
+            self.coalesced += 1
+            return json.loads(encoded) if encoded is not None else None
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await self.inner.load(artifact_id, storage_key, token=token)
+            encoded = json.dumps(content) if content is not None else None
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; keep the loop from logging it as unretrieved
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            stale = key in self._stale
+            self._stale.discard(key)
+
+        future.set_result(encoded)
+        if encoded is not None and not stale:
+            self._put(key, encoded)
+        return content
+
+    def _put(self, key: _Key, encoded: str) -> None:
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self._entries[key] = _Entry(encoded, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: _Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.encoded)
+
+    def invalidate(self, artifact_id: str) -> None:
+        """Forget every cached payload of `artifact_id`."""
+        self._stale.update(k for k in self._inflight if k[0] == artifact_id)
+        for key in [k for k in self._entries if k[0] == artifact_id]:
+            self._drop(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": type(self.inner).__name__,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,135 @@
+import difflib
+from typing import Any, Dict, List, Optional
+from app.core.artifact.blobs import canonical_json
+
+# A delta is a list of JSON-patch (RFC 6902) "add", "remove" and "replace"
+# operations, plus a "text" operation that rewrites a multi-line string
+# (code, docs) through line hunks: [[start, end, replacement], ...] over the
+# old string's lines, in ascending order.
+Delta = List[Dict[str, Any]]
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(part: str) -> str:
+    return part.replace("~1", "/").replace("~0", "~")
+
+
+def _same(old: Any, new: Any) -> bool:
+    # `True == 1` in Python, but not in JSON
+    return type(old) is type(new) and old == new
+
+
+def diff(old: Any, new: Any) -> Delta:
+    """Operations that turn `old` into `new`."""
+    ops: Delta = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: Delta) -> None:
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        # Appends, prepends and edits in the middle touch only that range
+        shortest = min(len(old), len(new))
+        prefix = 0
+        while prefix < shortest and _same(old[prefix], new[prefix]):
+            prefix += 1
+        suffix = 0
+        while suffix < shortest - prefix and _same(old[-1 - suffix], new[-1 - suffix]):
+            suffix += 1
+        old_mid = old[prefix:len(old) - suffix]
+        new_mid = new[prefix:len(new) - suffix]
+        common = min(len(old_mid), len(new_mid))
+        for i in range(common):
+            _diff(old_mid[i], new_mid[i], f"{path}/{prefix + i}", ops)
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old_mid) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{prefix + i}"})
+        for i in range(common, len(new_mid)):
+            ops.append({"op": "add", "path": f"{path}/{prefix + i}", "value": new_mid[i]})
+    elif isinstance(old, str) and isinstance(new, str) and "\n" in old:
+        ops.append({"op": "text", "path": path, "hunks": _text_hunks(old, new)})
+    else:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def _text_hunks(old: str, new: str) -> List[List[Any]]:
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, "".join(new_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _apply_text(old: str, hunks: List[List[Any]]) -> str:
+    lines = old.splitlines(keepends=True)
+    parts = []
+    position = 0
+    for start, end, replacement in hunks:
+        parts.extend(lines[position:start])
+        parts.append(replacement)
+        position = end
+    parts.extend(lines[position:])
+    return "".join(parts)
+
+
+def apply(doc: Any, delta: Delta) -> Any:
+    """
+    Apply `delta` to `doc` without modifying it: containers on the paths
+    the operations touch are copied (once per call), the rest is shared.
+    """
+    copied: Dict[int, Any] = {}  # Holds the copies, so their ids stay unique
+    for op in delta:
+        parts = [_unescape(p) for p in op["path"].split("/")[1:]] if op["path"] else []
+        doc = _apply_op(doc, parts, op, copied)
+    return doc
+
+
+def _own(node: Any, copied: Dict[int, Any]) -> Any:
+    if id(node) in copied:
+        return node
+    node = list(node) if isinstance(node, list) else dict(node)
+    copied[id(node)] = node
+    return node
+
+
+def _apply_op(node: Any, parts: List[str], op: Dict[str, Any], copied: Dict[int, Any]) -> Any:
+    if not parts:
+        if op["op"] == "text":
+            return _apply_text(node, op["hunks"])
+        return op["value"]
+
+    node = _own(node, copied)
+    key: Any = int(parts[0]) if isinstance(node, list) else parts[0]
+    if len(parts) == 1 and op["op"] == "remove":
+        del node[key]
+    elif len(parts) == 1 and op["op"] == "add":
+        if isinstance(node, list):
+            node.insert(key, op["value"])
+        else:
+            node[key] = op["value"]
+    else:
+        node[key] = _apply_op(node[key], parts[1:], op, copied)
+    return node
+
+
+def encoded_size(delta: Optional[Delta]) -> int:
+    """Rough size of a delta, for comparing it with the full payload."""
+    return len(canonical_json(delta or []).encode("utf-8"))
@@ -1,6 +1,7 @@
 from functools import lru_cache
 from app.core.config import get_settings
 from app.core.artifact.store import ArtifactStore
+from app.core.artifact.caching import CachingArtifactStore
 from app.core.artifact.stores.database import DatabaseArtifactStore
 from app.core.artifact.stores.filesystem import FilesystemArtifactStore
 from app.core.artifact.stores.gcs import GCSArtifactStore
@@ -13,11 +14,17 @@ def get_artifact_store() -> ArtifactStore:
     backend = settings.ARTIFACT_STORAGE_BACKEND.lower()
 
     if backend == "file":
-        return FilesystemArtifactStore()
+        store = FilesystemArtifactStore()
     elif backend == "gcs":
-        return GCSArtifactStore()
+        store = GCSArtifactStore()
     elif backend == "http":
-        return HTTPArtifactStore()
+        store = HTTPArtifactStore()
     else:
-        # Default to DB
+        # Default to DB; payloads live on the row, so there is nothing to cache
         return DatabaseArtifactStore()
+
+    if settings.ARTIFACT_CACHE_MAX_BYTES > 0:
+        return CachingArtifactStore(
+            store, settings.ARTIFACT_CACHE_MAX_BYTES, settings.ARTIFACT_CACHE_TTL_SECONDS
+        )
+    return store
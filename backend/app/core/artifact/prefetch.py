@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import get_settings
+from app.core.llm_protocol import LLMArtifact
+
+
+class ContextArtifactCache:
+    """
+    Projected LLM context artifacts, keyed by (artifact id, head version id),
+    so a chat turn that references a prefetched artifact skips loading its
+    payload from the artifact store and re-projecting it. A new version gets
+    a new key; stale entries age out by LRU and `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, LLMArtifact]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, artifact_id: str, version_id: str) -> Optional[LLMArtifact]:
+        key = (artifact_id, version_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def contains(self, artifact_id: str, version_id: str) -> bool:
+        """Like `get`, without touching recency or hit accounting."""
+        entry = self._entries.get((artifact_id, version_id))
+        return entry is not None and entry[0] > time.monotonic()
+
+    def set(self, artifact_id: str, version_id: str, projected: LLMArtifact) -> None:
+        key = (artifact_id, version_id)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, projected)
+        self._entries.move_to_end(key)
+        self.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+@lru_cache
+def get_context_artifact_cache() -> ContextArtifactCache:
+    settings = get_settings()
+    return ContextArtifactCache(
+        settings.ARTIFACT_PREFETCH_MAX_ENTRIES, settings.ARTIFACT_PREFETCH_TTL_SECONDS
+    )
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any, Optional
+from app.core.artifact.blobs import payload_digest
 
 
 class ArtifactStore(ABC):
@@ -32,3 +33,12 @@ class ArtifactStore(ABC):
             Any: The stored content
         """
         pass
+
+    async def save_revision(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
+        """
+        Like save(), but under a key derived from the content as well as the
+        artifact id, so a later save of the artifact never overwrites it.
+        Use it for payloads that must stay readable by their key.
+        """
+        checksum, _ = payload_digest(content)
+        return await self.save(f"{artifact_id}@{checksum[:16]}", content, token=token)
@@ -3,12 +3,14 @@ import httpx
 from typing import Any, Optional
 from app.core.artifact.store import ArtifactStore
 from app.core.config import get_settings
+from app.core.resilience import get_upstream
 
 
 class HTTPArtifactStore(ArtifactStore):
     def __init__(self):
         self.settings = get_settings()
         self.base_url = self.settings.ARTIFACT_HTTP_URL
+        self.upstream = get_upstream("artifact_store")
 
     async def save(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
         if not self.base_url:
@@ -22,8 +24,13 @@ class HTTPArtifactStore(ArtifactStore):
         if token:
             headers["Authorization"] = f"Bearer {token}"
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(url, json=content, headers=headers)
+        # A save writes the whole payload under its key, so a retry that
+        # repeats it leaves the same result
+        async with httpx.AsyncClient(timeout=self.upstream.timeout) as client:
+            resp = await self.upstream.call(
+                lambda: client.post(url, json=content, headers=headers),
+                idempotent=True,
+            )
             resp.raise_for_status()
 
         # Return URL as key
@@ -34,8 +41,10 @@ class HTTPArtifactStore(ArtifactStore):
         if token:
             headers["Authorization"] = f"Bearer {token}"
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(timeout=self.upstream.timeout) as client:
             # key is the full URL
-            resp = await client.get(storage_key, headers=headers)
+            resp = await self.upstream.call(
+                lambda: client.get(storage_key, headers=headers)
+            )
             resp.raise_for_status()
             return resp.json()
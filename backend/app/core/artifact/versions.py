@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from app.core.artifact.blobs import payload_digest
+from app.core.artifact.deltas import Delta, apply, diff, encoded_size
+from app.core.config import get_settings
+
+MISSING = object()
+
+
+class VersionNotLoaded(LookupError):
+    """
+    A version's payload cannot be read synchronously (its delta base is not
+    loaded, or it lives in the artifact store); use
+    ArtifactService.load_version_payload.
+    """
+
+    def __init__(self, artifact_id: str, version_id: str):
+        super().__init__(f"Payload of version {version_id} of artifact {artifact_id} is not loaded")
+        self.artifact_id = artifact_id
+        self.version_id = version_id
+
+
+class VersionCache:
+    """
+    Recently materialized version payloads, keyed by payload checksum, so
+    reading a delta-encoded version rarely walks its chain back to the
+    keyframe. Cached payloads are shared: treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, checksum: str) -> Any:
+        """The payload, or MISSING."""
+        payload = self._entries.get(checksum, MISSING)
+        if payload is MISSING:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(checksum)
+            self.hits += 1
+        return payload
+
+    def __contains__(self, checksum: str) -> bool:
+        return checksum in self._entries
+
+    def set(self, checksum: str, payload: Any) -> None:
+        self._entries[checksum] = payload
+        self._entries.move_to_end(checksum)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@lru_cache
+def get_version_cache() -> VersionCache:
+    return VersionCache(get_settings().VERSION_CACHE_ENTRIES)
+
+
+def encode_delta(base: Any, payload: Any, checksum: str, size: int) -> Optional[Delta]:
+    """
+    The delta from `base` to `payload` (whose canonical JSON has `checksum`
+    and `size`), or None when a keyframe is the better choice: the delta is
+    more than half the payload's size, or it does not reproduce the payload
+    exactly.
+    """
+    delta = diff(base, payload)
+    if encoded_size(delta) * 2 > size:
+        return None
+    if payload_digest(apply(base, delta))[0] != checksum:
+        return None
+    return delta
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import time
+from typing import Any, Optional
+import aiosqlite
+from app.core.cache.store import ResultCache
+
+
+class SQLiteResultCache(ResultCache):
+    """
+    File-backed cache that several worker processes on one host can share.
+    Stands in for a networked cache (e.g. Redis) with the same semantics:
+    absolute expiry per entry and LRU eviction by last access time.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        async with self._lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(self.path)
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS result_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                await conn.commit()
+                self._conn = conn
+            return self._conn
+
+    async def _get(self, key: str) -> Optional[Any]:
+        conn = await self._connection()
+        now = time.time()
+        async with conn.execute(
+            "SELECT value FROM result_cache WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        await conn.execute(
+            "UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        await conn.commit()
+        return json.loads(row[0])
+
+    async def _set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        conn = await self._connection()
+        now = time.time()
+        await conn.execute(
+            "INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl_seconds, now),
+        )
+        await conn.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+        cursor = await conn.execute(
+            "DELETE FROM result_cache WHERE key IN ("
+            "SELECT key FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.evictions += max(cursor.rowcount, 0)
+        await conn.commit()
+
+    async def delete(self, key: str) -> None:
+        conn = await self._connection()
+        await conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+        await conn.commit()
+
+    async def clear(self) -> None:
+        conn = await self._connection()
+        await conn.execute("DELETE FROM result_cache")
+        await conn.commit()
+
+    async def aclose(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
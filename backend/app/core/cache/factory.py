@@ -0,0 +1,23 @@
+from functools import lru_cache
+from app.core.config import get_settings
+from app.core.cache.store import ResultCache
+from app.core.cache.backends.memory import MemoryResultCache
+from app.core.cache.backends.sqlite import SQLiteResultCache
+
+
+@lru_cache()
+def get_result_cache() -> ResultCache:
+    settings = get_settings()
+    backend = settings.RESULT_CACHE_BACKEND.lower()
+
+    if backend == "sqlite":
+        return SQLiteResultCache(
+            settings.RESULT_CACHE_SQLITE_PATH,
+            settings.RESULT_CACHE_MAX_ENTRIES,
+            settings.RESULT_CACHE_TTL_SECONDS,
+        )
+    else:
+        # Default to in-process
+        return MemoryResultCache(
+            settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_TTL_SECONDS
+        )
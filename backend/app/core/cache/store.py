@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class ResultCache(ABC):
+    """
+    Key/value cache for execution results with LRU + TTL eviction.
+
+    Values are JSON-serializable. Backends implement the underscored
+    primitives; hit/miss accounting lives here so every backend reports the
+    same metrics.
+    """
+
+    backend_name = "abstract"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        await self._set(key, value, self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self.stores += 1
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[Any]:
+        """Return the live value for `key`, or None if absent or expired."""
+        pass
+
+    @abstractmethod
+    async def _set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store `value`, evicting least recently used entries over capacity."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        """Release backend resources."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
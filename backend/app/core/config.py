@@ -42,6 +42,105 @@ class Settings(BaseSettings):
     ARTIFACT_STORAGE_PATH: str = "./artifacts"
     ARTIFACT_GCS_BUCKET: Optional[str] = None
     ARTIFACT_HTTP_URL: Optional[str] = None
+    ARTIFACT_CACHE_MAX_BYTES: int = 67108864  # Read-through payload cache for external stores; 0 disables
+    ARTIFACT_CACHE_TTL_SECONDS: float = 0  # 0 keeps entries until evicted (each save gets a new key)
+    ARTIFACT_BATCH_CONCURRENCY: int = 8  # Parallel store loads/saves per batch request
+
+    # Version history storage
+    VERSION_STORAGE_MODE: str = "full"  # full, delta (deltas between keyframes)
+    VERSION_KEYFRAME_INTERVAL: int = 16  # A full payload at least every N versions
+    VERSION_CACHE_ENTRIES: int = 256  # Recently materialized version payloads
+
+    # LLM HTTP client pool
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP2: bool = False  # Requires the optional `h2` package
+    LLM_HTTP_TIMEOUT: float = 60.0  # Read timeout between stream chunks
+
+    # Upstream resilience (LLM service, HTTP artifact store, auth service)
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_READ_TIMEOUT: float = 30.0  # Default for upstreams without their own
+    AUTH_HTTP_TIMEOUT: float = 10.0
+    UPSTREAM_RETRIES: int = 2
+    UPSTREAM_RETRY_BACKOFF: float = 0.1  # Base delay, doubled per attempt, full jitter
+    UPSTREAM_RETRY_BACKOFF_MAX: float = 2.0
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2  # Retries per request over a 10s window
+    UPSTREAM_RETRY_BUDGET_MIN_PER_SECOND: float = 1.0
+    UPSTREAM_BREAKER_FAILURES: int = 5  # Consecutive failures that open the circuit
+    UPSTREAM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Streaming turns
+    STREAM_DISCONNECT_POLICY: str = "drop"  # drop, save_partial
+    STREAM_DISCONNECT_CHECK_INTERVAL: float = 0.25  # Seconds between checks
+    STREAM_COALESCE_WINDOW_MS: int = 20  # 0 disables text delta coalescing
+    STREAM_COALESCE_MAX_BYTES: int = 4096  # UTF-8 bytes of text per coalesced frame
+    STREAM_RESUME_GRACE_SECONDS: float = 15.0  # Keep generating this long without a reader
+    STREAM_LOG_BACKEND: str = "memory"  # memory, sqlite
+    STREAM_LOG_SQLITE_PATH: str = "./stream_log.db"
+    STREAM_LOG_TTL_SECONDS: float = 300.0  # Replay window after a turn ends
+    STREAM_LOG_MAX_TURNS: int = 1000
+    STREAM_LOG_MAX_FRAMES: int = 10000  # Per turn
+    STREAM_LOG_MAX_TURN_BYTES: int = 8388608  # Per turn; 0 disables
+    STREAM_LOG_MAX_BYTES: int = 268435456  # All turns; 0 disables
+    STREAM_LOG_FLUSH_INTERVAL: float = 0.05  # sqlite: seconds frames wait for a batched commit
+    STREAM_LOG_FLUSH_FRAMES: int = 64  # sqlite: commit at once when this many are pending
+
+    # LLM request context
+    LLM_ARTIFACT_PAYLOAD_MAX_BYTES: int = 262144  # 0 disables the cap
+    LLM_CONTEXT_MAX_TOKENS: int = 8000  # History budget; 0 sends all history
+    LLM_CONTEXT_CHARS_PER_TOKEN: int = 4
+    LLM_CONTEXT_CACHE_SESSIONS: int = 256
+    ARTIFACT_PREFETCH_MAX_ENTRIES: int = 512  # Projected (artifact, version) entries
+    ARTIFACT_PREFETCH_TTL_SECONDS: float = 600.0
+    ARTIFACT_PREFETCH_CONCURRENCY: int = 8  # Parallel artifact store loads per request
+
+    # Result cache for repeatable commands and chat turns (opt-in)
+    RESULT_CACHE_ENABLED: bool = False
+    RESULT_CACHE_BACKEND: str = "memory"  # memory, sqlite
+    RESULT_CACHE_SQLITE_PATH: str = "./result_cache.db"
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SECONDS: float = 3600.0
+    RESULT_CACHE_COMMANDS: List[str] = ["plot", "optimize", "sum", "summarize", "diff"]
+    RESULT_CACHE_CHAT: bool = True
+
+    # Admission control for /sessions/execute
+    ADMISSION_MAX_CONCURRENT: int = 64
+    ADMISSION_MAX_PER_USER: int = 4
+    ADMISSION_QUEUE_SIZE: int = 128
+    ADMISSION_QUEUE_PER_USER: int = 8
+    ADMISSION_QUEUE_TIMEOUT: float = 10.0  # Seconds a turn may wait for a slot
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Sandboxed /run executor. Off by default: the workers enforce resource
+    # limits, not a security boundary. User code runs with the server's OS
+    # privileges (filesystem, network, /proc); enable only for trusted users.
+    SANDBOX_ENABLED: bool = False
+    SANDBOX_WORKERS: int = 2  # Pre-warmed worker processes
+    SANDBOX_TIMEOUT_SECONDS: float = 10.0  # Wall clock per call
+    SANDBOX_CPU_SECONDS: int = 5  # CPU time per call
+    SANDBOX_MEMORY_BYTES: int = 536870912  # Address space per worker; 0 disables
+    SANDBOX_MAX_OUTPUT_CHARS: int = 65536
+    SANDBOX_PAYLOAD_CACHE_ENTRIES: int = 32  # Shared-memory payloads kept
+
+    # Background jobs
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 100
+    JOB_RETENTION: int = 1000  # Finished jobs kept for status lookups
+    JOB_RETRY_AFTER_SECONDS: int = 5
+    JOB_PROGRESS_INTERVAL_SECONDS: float = 0.5  # Between job_progress events of a job
+    EVENT_STREAM_BUFFER: int = 100  # Per-subscriber events before dropping
+
+    # Ad-hoc ghost iterations, kept in memory until accepted or discarded
+    GHOST_STORE_MAX_SESSIONS: int = 1000  # (user, artifact) iteration sessions
+    GHOST_STORE_MAX_ITERATIONS: int = 20  # Most recent ghosts kept per session
+    GHOST_STORE_TTL_SECONDS: float = 3600.0  # Since the session was last used
+    GHOST_RECYCLE_BIN_SECONDS: int = 0  # Keep discarded ghosts in the DB this long; 0 disables
+    GHOST_RECYCLE_BIN_SWEEP_SECONDS: int = 3600  # Purge expired ones this often (and at startup); 0: startup only
+
+    # Generated artifact streaming
+    ARTIFACT_STREAM_SPOOL_BYTES: int = 1048576  # Spool to a temp file above this
+    ARTIFACT_OFFLOAD_THRESHOLD_BYTES: int = 4194304  # Offload to the store above this
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=True, extra="ignore"
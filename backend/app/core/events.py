@@ -0,0 +1,215 @@
+import asyncio
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set
+from app.core.config import get_settings
+
+
+class TurnState:
+    """
+    What a streaming turn has produced so far, folded from its frames once
+    for all viewers. Slow viewers get this instead of the frames they missed.
+    """
+
+    def __init__(self, turn_id: str, workspace_id: str, info: Dict[str, Any]):
+        self.turn_id = turn_id
+        self.workspace_id = workspace_id
+        self.info = info
+        self.seq = 0
+        self.content: List[str] = []
+        self.artifacts: Dict[str, Dict[str, Any]] = {}
+        self.message: Optional[Dict[str, Any]] = None
+        self.done = False
+
+    def apply(self, seq: int, payload: Dict[str, Any]) -> None:
+        self.seq = seq
+        kind = payload.get("type")
+        if kind == "text_delta":
+            self.content.append(payload.get("content", ""))
+        elif kind == "artifact_start":
+            self.artifacts[payload["artifact_id"]] = {
+                "artifact_id": payload["artifact_id"],
+                "artifact_type": payload.get("artifact_type"),
+                "metadata": payload.get("metadata"),
+                "chunks": [],
+                "complete": False,
+            }
+        elif kind == "artifact_chunk":
+            artifact = self.artifacts.get(payload.get("artifact_id"))
+            if artifact is not None:
+                artifact["chunks"].append(payload.get("chunk", ""))
+        elif kind == "artifact_end":
+            artifact = self.artifacts.get(payload.get("artifact_id"))
+            if artifact is not None:
+                artifact["complete"] = True
+        elif kind == "final_message":
+            self.message = payload.get("message")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": "turn_snapshot",
+            "turn_id": self.turn_id,
+            "seq": self.seq,
+            **self.info,
+            "content": "".join(self.content),
+            "artifacts": [
+                {
+                    "artifact_id": a["artifact_id"],
+                    "artifact_type": a["artifact_type"],
+                    "metadata": a["metadata"],
+                    "content": "".join(a["chunks"]),
+                    "complete": a["complete"],
+                }
+                for a in self.artifacts.values()
+            ],
+            "message": self.message,
+            "done": self.done,
+        }
+
+
+class Subscription:
+    """
+    A subscriber's bounded inbox. When full, the oldest event is dropped;
+    a viewer that falls behind on a turn stops receiving its frames and gets
+    one snapshot of the turn once its inbox has drained.
+    """
+
+    def __init__(
+        self,
+        user_id: Optional[int],
+        maxsize: int,
+        workspace_id: Optional[str] = None,
+        snapshot: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+    ):
+        self.user_id = user_id
+        self.workspace_id = workspace_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.snapshots = 0
+        self._snapshot = snapshot
+        self._lagging: "OrderedDict[str, None]" = OrderedDict()  # Turn ids
+
+    def put(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            oldest = self.queue.get_nowait()
+            self.dropped += 1
+            if "turn_id" in oldest:
+                self._lagging[oldest["turn_id"]] = None
+        self.queue.put_nowait(event)
+
+    def put_turn_event(self, turn_id: str, event: Dict[str, Any]) -> None:
+        # Frames after a gap are useless to the viewer; skip to the snapshot
+        if turn_id in self._lagging or self.queue.full():
+            self._lagging[turn_id] = None
+            self.dropped += 1
+            return
+        self.queue.put_nowait(event)
+
+    def mark_lagging(self, turn_id: str) -> None:
+        self._lagging[turn_id] = None
+
+    async def get(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Next event; raises asyncio.TimeoutError after `timeout` seconds."""
+        while self._lagging and self.queue.empty():
+            turn_id, _ = self._lagging.popitem(last=False)
+            event = self._snapshot(turn_id) if self._snapshot else None
+            if event is not None:
+                self.snapshots += 1
+                return event
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventBus:
+    """
+    In-process fan-out for server-sent events (`/events/stream`).
+
+    Events published with a `user_id` reach only that user's subscriptions;
+    events without one are broadcast. Frames of in-flight streaming turns are
+    relayed to every subscription of the turn's workspace: each frame is
+    decoded once by the shared producer and the same event is queued for
+    every viewer.
+    """
+
+    def __init__(self, maxsize: int = 100, finished_turns: int = 64):
+        self.maxsize = maxsize
+        self.finished_turns = finished_turns
+        self._subscriptions: Set[Subscription] = set()
+        self._turns: Dict[str, TurnState] = {}
+        # Finished turns stay available for the snapshots of lagging viewers
+        self._finished: "OrderedDict[str, TurnState]" = OrderedDict()
+        self._relayed = 0
+
+    def subscribe(
+        self, user_id: Optional[int] = None, workspace_id: Optional[str] = None
+    ) -> Subscription:
+        subscription = Subscription(
+            user_id, self.maxsize, workspace_id, snapshot=self.turn_snapshot
+        )
+        # Viewers joining mid-turn start from the turn's current state
+        for turn in self._turns.values():
+            if workspace_id is not None and turn.workspace_id == workspace_id:
+                subscription.mark_lagging(turn.turn_id)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: Dict[str, Any], user_id: Optional[int] = None) -> None:
+        for subscription in list(self._subscriptions):
+            if user_id is None or subscription.user_id == user_id:
+                subscription.put(event)
+
+    def _publish_turn_event(self, turn: TurnState, event: Dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions):
+            if subscription.workspace_id == turn.workspace_id:
+                subscription.put_turn_event(turn.turn_id, event)
+
+    def begin_turn(self, turn_id: str, workspace_id: str, **info: Any) -> None:
+        turn = self._turns[turn_id] = TurnState(turn_id, workspace_id, info)
+        self._publish_turn_event(
+            turn, {"type": "turn_start", "turn_id": turn_id, "seq": 0, **info}
+        )
+
+    def publish_turn_frame(self, turn_id: str, seq: int, frame: str) -> None:
+        """Relay one SSE frame (`data: {...}`) of an in-flight turn."""
+        turn = self._turns.get(turn_id)
+        if turn is None or not frame.startswith("data: "):
+            return
+        payload = json.loads(frame[6:])
+        turn.apply(seq, payload)
+        self._relayed += 1
+        self._publish_turn_event(
+            turn, {"type": "turn_frame", "turn_id": turn_id, "seq": seq, "event": payload}
+        )
+
+    def end_turn(self, turn_id: str) -> None:
+        turn = self._turns.pop(turn_id, None)
+        if turn is None:
+            return
+        turn.done = True
+        self._finished[turn_id] = turn
+        while len(self._finished) > self.finished_turns:
+            self._finished.popitem(last=False)
+        self._publish_turn_event(
+            turn, {"type": "turn_end", "turn_id": turn_id, "seq": turn.seq}
+        )
+
+    def turn_snapshot(self, turn_id: str) -> Optional[Dict[str, Any]]:
+        turn = self._turns.get(turn_id) or self._finished.get(turn_id)
+        return turn.snapshot() if turn is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "dropped": sum(s.dropped for s in self._subscriptions),
+            "snapshots": sum(s.snapshots for s in self._subscriptions),
+            "live_turns": len(self._turns),
+            "relayed_frames": self._relayed,
+        }
+
+
+@lru_cache
+def get_event_bus() -> EventBus:
+    return EventBus(get_settings().EVENT_STREAM_BUFFER)
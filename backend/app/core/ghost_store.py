@@ -0,0 +1,124 @@
+import time
+import uuid
+from collections import OrderedDict
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import get_settings
+
+
+class GhostIteration:
+    """One throwaway version produced by an ad-hoc "Iterate" loop."""
+
+    def __init__(
+        self,
+        artifact_id: str,
+        parent_id: Optional[str],
+        payload: Any,
+        origin: Dict[str, Any],
+        change_summary: Optional[str],
+    ):
+        self.id = uuid.uuid4().hex
+        self.artifact_id = artifact_id
+        self.parent_id = parent_id
+        self.payload = payload
+        self.origin = origin
+        self.change_summary = change_summary
+        self.created_at = datetime.now(UTC)
+        self.status = "ghost"
+
+
+class _GhostSession:
+    def __init__(self, expires_at: float):
+        self.iterations: List[GhostIteration] = []
+        self.expires_at = expires_at
+
+
+class GhostStore:
+    """
+    Ephemeral ghost iterations, per (user, artifact), kept in memory until
+    they are accepted or discarded. Sessions are evicted least recently used
+    beyond `max_sessions` and expire `ttl_seconds` after their last use;
+    each keeps its `max_iterations` most recent ghosts.
+    """
+
+    def __init__(self, max_sessions: int, max_iterations: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.max_iterations = max_iterations
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[Tuple[Optional[int], str], _GhostSession]" = OrderedDict()
+        self._created = 0
+        self._evicted = 0
+        self._expired = 0
+
+    def _session(
+        self, owner: Optional[int], artifact_id: str, create: bool = False
+    ) -> Optional[_GhostSession]:
+        now = time.monotonic()
+        for key, session in list(self._sessions.items()):
+            if session.expires_at <= now:
+                del self._sessions[key]
+                self._expired += 1
+
+        key = (owner, artifact_id)
+        session = self._sessions.get(key)
+        if session is None:
+            if not create:
+                return None
+            session = self._sessions[key] = _GhostSession(now + self.ttl_seconds)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evicted += 1
+        self._sessions.move_to_end(key)
+        session.expires_at = now + self.ttl_seconds
+        return session
+
+    def add(
+        self,
+        owner: Optional[int],
+        artifact_id: str,
+        parent_id: Optional[str],
+        payload: Any,
+        origin: Dict[str, Any],
+        change_summary: Optional[str] = None,
+    ) -> GhostIteration:
+        ghost = GhostIteration(artifact_id, parent_id, payload, origin, change_summary)
+        session = self._session(owner, artifact_id, create=True)
+        session.iterations.append(ghost)
+        del session.iterations[: -self.max_iterations]
+        self._created += 1
+        return ghost
+
+    def list(self, owner: Optional[int], artifact_id: str) -> List[GhostIteration]:
+        session = self._session(owner, artifact_id)
+        return list(session.iterations) if session is not None else []
+
+    def get(
+        self, owner: Optional[int], artifact_id: str, ghost_id: str
+    ) -> Optional[GhostIteration]:
+        for ghost in self.list(owner, artifact_id):
+            if ghost.id == ghost_id:
+                return ghost
+        return None
+
+    def clear(self, owner: Optional[int], artifact_id: str) -> None:
+        self._sessions.pop((owner, artifact_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "iterations": sum(len(s.iterations) for s in self._sessions.values()),
+            "created": self._created,
+            "evicted_sessions": self._evicted,
+            "expired_sessions": self._expired,
+        }
+
+
+@lru_cache
+def get_ghost_store() -> GhostStore:
+    settings = get_settings()
+    return GhostStore(
+        settings.GHOST_STORE_MAX_SESSIONS,
+        settings.GHOST_STORE_MAX_ITERATIONS,
+        settings.GHOST_STORE_TTL_SECONDS,
+    )
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.config import get_settings
+from app.core.events import EventBus, get_event_bus
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[["Job"], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when the queue is at capacity."""
+
+
+class Job:
+    def __init__(self, kind: str, user_id: Optional[int], func: JobFunc, session_id: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.user_id = user_id
+        self.session_id = session_id
+        self.status = "queued"  # queued, running, succeeded, failed
+        self.progress: Optional[float] = None
+        self.message: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(UTC)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._func = func
+        self._bus: Optional[EventBus] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def report_progress(self, progress: Optional[float] = None, message: Optional[str] = None) -> None:
+        """Record progress and push it to the submitting user's event stream."""
+        self.progress = progress
+        self.message = message
+        self._publish("job_progress")
+
+    def to_event(self, event_type: str) -> Dict[str, Any]:
+        return {
+            "type": event_type,
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "session_id": self.session_id,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+        }
+
+    def _publish(self, event_type: str) -> None:
+        if self._bus is not None:
+            self._bus.publish(self.to_event(event_type), user_id=self.user_id)
+
+
+class JobManager:
+    """
+    Runs jobs on a fixed pool of worker tasks fed by a bounded queue.
+
+    Submitting never blocks: a full queue raises JobQueueFull so the caller
+    can shed load. Finished jobs are kept (up to `retention`) for status
+    lookups; lifecycle changes are published on the event bus.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        retention: int,
+        bus: Optional[EventBus] = None,
+    ):
+        self.workers = workers
+        self.retention = retention
+        self._bus = bus or get_event_bus()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        kind: str,
+        func: JobFunc,
+        user_id: Optional[int] = None,
+        session_id: Optional[str] = None,
+    ) -> Job:
+        self.start()
+        job = Job(kind, user_id, func, session_id=session_id)
+        job._bus = self._bus
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize})")
+        self._remember(job)
+        job._publish("job_queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        if len(self._jobs) > self.retention:
+            # Forget the oldest finished jobs; pending ones are always kept
+            for old_id in [j.id for j in self._jobs.values() if j.done]:
+                if len(self._jobs) <= self.retention:
+                    break
+                del self._jobs[old_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = datetime.now(UTC)
+        job._publish("job_started")
+        self._running += 1
+        try:
+            job.result = await job._func(job)
+            job.status = "succeeded"
+            self._completed += 1
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            job.status = "failed"
+            job.error = str(e)
+            self._failed += 1
+        finally:
+            self._running -= 1
+            job.finished_at = datetime.now(UTC)
+            job._publish("job_completed" if job.status == "succeeded" else "job_failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "tracked": len(self._jobs),
+        }
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        settings = get_settings()
+        _manager = JobManager(
+            workers=settings.JOB_WORKERS,
+            queue_size=settings.JOB_QUEUE_MAX_SIZE,
+            retention=settings.JOB_RETENTION,
+        )
+    return _manager
+
+
+async def shutdown_job_manager() -> None:
+    global _manager
+    if _manager is not None:
+        await _manager.stop()
+        _manager = None
@@ -1,19 +1,50 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, AsyncGenerator, Any, Dict, Literal
-from pydantic import BaseModel, Field
-from app.schemas.artifact import Artifact
+from typing import List, Optional, AsyncGenerator, Any, Dict, Literal, Union, Annotated
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, ValidationError
+
+class LLMArtifact(BaseModel):
+    """
+    LLM-facing view of an artifact: the current head payload only, without
+    mutation history. Oversized payloads are replaced by a text preview.
+    """
+    id: str
+    type: str
+    name: str
+    version_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    payload: Optional[Any] = None
+    payload_truncated: bool = False
+    payload_preview: Optional[str] = None
 
 class LLMMessage(BaseModel):
     role: str
     content: str
-    artifacts: List[Artifact] = []
+    # References into LLMRequest.context_artifacts; each artifact is sent once
+    artifact_ids: List[str] = []
 
 class LLMRequest(BaseModel):
     session_id: str
     messages: List[LLMMessage]
-    context_artifacts: List[Artifact] = []
+    context_artifacts: List[LLMArtifact] = []
     api_key: Optional[str] = None
 
+    # Pre-serialized JSON of `messages`, one fragment per message
+    _message_fragments: Optional[List[str]] = PrivateAttr(default=None)
+
+    def set_message_fragments(self, fragments: List[str]) -> None:
+        self._message_fragments = fragments
+
+    def to_json(self) -> str:
+        """
+        Request body as JSON. Reuses cached message fragments when present so
+        already-sent history is not serialized again.
+        """
+        fragments = self._message_fragments
+        if fragments is None or len(fragments) != len(self.messages):
+            return self.model_dump_json()
+        head = self.model_dump_json(exclude={"messages"})
+        return f'{head[:-1]},"messages":[{",".join(fragments)}]}}'
+
 class LLMEvent(BaseModel):
     type: str
 
@@ -36,7 +67,76 @@ class ArtifactEndEvent(LLMEvent):
     type: Literal["artifact_end"] = "artifact_end"
     artifact_id: str
 
+LLMStreamEvent = Annotated[
+    Union[TextDeltaEvent, ArtifactStartEvent, ArtifactChunkEvent, ArtifactEndEvent],
+    Field(discriminator="type"),
+]
+
+_stream_event_adapter = TypeAdapter(LLMStreamEvent)
+# Lines that are not events at all; anything else that fails validation is an error
+_ignored_errors = {"json_invalid", "dict_type", "union_tag_invalid", "union_tag_not_found"}
+
+def decode_event(line: Union[str, bytes]) -> Optional[LLMEvent]:
+    """
+    Decode one NDJSON line of an LLM event stream; None for lines that are
+    not known events. JSON parsing and validation happen in a single pass
+    in pydantic-core, dispatched on `type`.
+    """
+    try:
+        return _stream_event_adapter.validate_json(line)
+    except ValidationError as e:
+        if e.errors()[0]["type"] in _ignored_errors:
+            return None
+        raise
+
+# text_delta lines already have the browser's SSE payload shape. Only
+# lines that start with `type` are recognised, so the check stays a prefix test
+_raw_text_delta_prefixes = ('{"type":"text_delta",', '{"type": "text_delta", ')
+_text_deltas_adapter = TypeAdapter(List[TextDeltaEvent])
+
+def is_raw_text_delta(line: str) -> bool:
+    return line.startswith(_raw_text_delta_prefixes)
+
+def decode_text_deltas(lines: List[str]) -> str:
+    """Concatenated content of raw text_delta lines, decoded in one batch."""
+    if not lines:
+        return ""
+    try:
+        events = _text_deltas_adapter.validate_json(f"[{','.join(lines)}]")
+    except ValidationError:
+        # A malformed line must not lose the rest of the text
+        events = []
+        for line in lines:
+            try:
+                event = decode_event(line)
+            except ValidationError:
+                continue
+            if isinstance(event, TextDeltaEvent):
+                events.append(event)
+    return "".join(event.content for event in events)
+
 class LLMProvider(ABC):
+    name = "llm"  # Label for metrics
+
     @abstractmethod
     async def generate_stream(self, request: LLMRequest) -> AsyncGenerator[LLMEvent, None]:
         pass
+
+    async def generate_frames(
+        self, request: LLMRequest
+    ) -> AsyncGenerator[Union[str, LLMEvent], None]:
+        """
+        Like generate_stream, but text deltas may be yielded as their raw
+        NDJSON line (a str) when the upstream already emits the client's
+        wire format, so they can be forwarded without a decode/encode cycle.
+        """
+        async for event in self.generate_stream(request):
+            yield event
+
+    async def aclose(self) -> None:
+        """Release long-lived resources (connection pools etc.)."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Provider-specific runtime statistics for monitoring."""
+        return {}
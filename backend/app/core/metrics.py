@@ -0,0 +1,38 @@
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """
+    In-process registry of monitoring data.
+
+    Subsystems register a collector callable under a name; `snapshot()`
+    calls every collector and returns their results keyed by that name.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = {}
+        for name, collector in list(self._collectors.items()):
+            try:
+                data[name] = collector()
+            except Exception as e:
+                logger.error(f"Metrics collector {name} failed: {e}")
+                data[name] = {"error": str(e)}
+        return data
+
+
+@lru_cache
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
@@ -0,0 +1,352 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import httpx
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """The upstream's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Upstream {upstream} is unavailable (circuit open)")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+# Errors raised before the request could have reached the upstream
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Statuses that mean the upstream did not process the request
+_REJECTED_STATUSES = {429, 503}
+# Methods a retry cannot apply twice (RFC 9110, section 9.2.2)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+
+
+class RetryBudget:
+    """
+    Caps retries to `ratio` of the requests seen in the last `window`
+    seconds (plus `min_per_second`), so retries cannot multiply the load on
+    an upstream that is already failing.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, window: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self.exhausted = 0
+
+    def _trim(self, now: float) -> None:
+        for times in (self._requests, self._retries):
+            while times and times[0] <= now - self.window:
+                times.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        now = time.monotonic()
+        self._trim(now)
+        allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+        if len(self._retries) >= allowed:
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails calls
+    fast for `reset_timeout` seconds. Then a single probe call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and not self.retry_after():
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """The probe ended without a verdict (e.g. it was cancelled)."""
+        self._probing = False
+
+
+class Upstream:
+    """
+    Resilience policy for one remote dependency: connect/read timeouts,
+    retries with full-jitter backoff limited by a retry budget, and a
+    circuit breaker.
+
+    Idempotent calls are retried on any transport error or 5xx/429 answer;
+    other calls only when the request cannot have been processed
+    (connection errors, 429 and 503). Unless the caller says otherwise,
+    a call is idempotent if its HTTP method is.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect_timeout: float,
+        read_timeout: float,
+        retries: int,
+        backoff: float,
+        backoff_max: float,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+    ):
+        self.name = name
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.budget = budget
+        self._calls = 0
+        self._failures = 0
+        self._retried = 0
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+    @staticmethod
+    def _idempotent(request: Optional[httpx.Request], idempotent: Optional[bool]) -> bool:
+        if idempotent is not None:
+            return idempotent
+        return request is not None and request.method in _IDEMPOTENT_METHODS
+
+    @staticmethod
+    def _retryable_error(exc: Exception, idempotent: bool) -> bool:
+        if isinstance(exc, _CONNECT_ERRORS):
+            return True
+        return idempotent and isinstance(exc, httpx.TransportError)
+
+    @staticmethod
+    def _retryable_status(status: int, idempotent: bool) -> bool:
+        if status in _REJECTED_STATUSES:
+            return True
+        return idempotent and status >= 500
+
+    @staticmethod
+    def _is_failure(status: int) -> bool:
+        return status >= 500 or status == 429
+
+    def _can_retry(self, attempt: int) -> bool:
+        """Whether attempt number `attempt` may be followed by a retry."""
+        if attempt > self.retries or not self.budget.try_acquire():
+            return False
+        self._retried += 1
+        return True
+
+    async def _backoff(self, attempt: int) -> None:
+        # Full jitter, so clients that failed together do not retry together
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        await asyncio.sleep(random.uniform(0, delay))
+
+    def _record(self, failed: bool) -> None:
+        if failed:
+            self._failures += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def call(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        idempotent: Optional[bool] = None,
+    ) -> httpx.Response:
+        """
+        Run `send` under the policy. Returns the last response, which may
+        still be an error status once retries are exhausted; raises the last
+        transport error, or CircuitOpenError without calling the upstream.
+        `idempotent` defaults to whether the request's method is (GET yes,
+        POST no).
+        """
+        self._calls += 1
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_breaker()
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                self._record(failed=True)
+                try:
+                    request = e.request
+                except RuntimeError:  # Raised before a request was built
+                    request = None
+                if (
+                    self._retryable_error(e, self._idempotent(request, idempotent))
+                    and self._can_retry(attempt)
+                ):
+                    await self._backoff(attempt)
+                    continue
+                raise
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            failed = self._is_failure(response.status_code)
+            self._record(failed)
+            if (
+                failed
+                and self._retryable_status(
+                    response.status_code, self._idempotent(response.request, idempotent)
+                )
+                and self._can_retry(attempt)
+            ):
+                await self._backoff(attempt)
+                continue
+            return response
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        open_stream: Callable[[], Any],
+        idempotent: bool = False,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming response (`open_stream` returns e.g. `client.stream(...)`)
+        under the policy. Only opening the stream is retried; errors while
+        the body is read count as failures but are not retried.
+        """
+        self._calls += 1
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_breaker()
+            manager = open_stream()
+            try:
+                response = await manager.__aenter__()
+            except httpx.TransportError as e:
+                self._record(failed=True)
+                if self._retryable_error(e, idempotent) and self._can_retry(attempt):
+                    await self._backoff(attempt)
+                    continue
+                raise
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            status = response.status_code
+            if (
+                self._is_failure(status)
+                and self._retryable_status(status, idempotent)
+                and self._can_retry(attempt)
+            ):
+                await manager.__aexit__(None, None, None)
+                self._record(failed=True)
+                await self._backoff(attempt)
+                continue
+            break
+
+        try:
+            yield response
+        except httpx.TransportError:
+            self._record(failed=True)
+            await manager.__aexit__(None, None, None)
+            raise
+        except BaseException as e:
+            if self._is_failure(response.status_code):
+                self._record(failed=True)
+            else:
+                # E.g. the consumer was cancelled: no verdict on the upstream
+                self.breaker.release_probe()
+            await manager.__aexit__(type(e), e, e.__traceback__)
+            raise
+        else:
+            self._record(failed=self._is_failure(response.status_code))
+            await manager.__aexit__(None, None, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "opened": self.breaker.opened,
+            "rejected": self.breaker.rejected,
+            "calls": self._calls,
+            "failures": self._failures,
+            "retries": self._retried,
+            "retry_budget_exhausted": self.budget.exhausted,
+        }
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def get_upstream(name: str, read_timeout: Optional[float] = None) -> Upstream:
+    """
+    Shared policy for the upstream `name` ("llm", "artifact_store", "auth"),
+    created from settings on first use.
+    """
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        settings = get_settings()
+        upstream = _upstreams[name] = Upstream(
+            name,
+            connect_timeout=settings.UPSTREAM_CONNECT_TIMEOUT,
+            read_timeout=read_timeout or settings.UPSTREAM_READ_TIMEOUT,
+            retries=settings.UPSTREAM_RETRIES,
+            backoff=settings.UPSTREAM_RETRY_BACKOFF,
+            backoff_max=settings.UPSTREAM_RETRY_BACKOFF_MAX,
+            breaker=CircuitBreaker(
+                settings.UPSTREAM_BREAKER_FAILURES, settings.UPSTREAM_BREAKER_RESET_SECONDS
+            ),
+            budget=RetryBudget(
+                settings.UPSTREAM_RETRY_BUDGET_RATIO,
+                settings.UPSTREAM_RETRY_BUDGET_MIN_PER_SECOND,
+            ),
+        )
+    return upstream
+
+
+def upstream_stats() -> Dict[str, Any]:
+    return {name: upstream.stats() for name, upstream in _upstreams.items()}
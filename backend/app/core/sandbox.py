@@ -0,0 +1,333 @@
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxError(Exception):
+    """The code could not be run to completion by the sandbox."""
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+class SandboxCrashed(SandboxError):
+    pass
+
+
+# --- Worker side (runs in the pool processes) ---
+
+
+class _Interrupted(BaseException):
+    # BaseException so user code's `except Exception` cannot swallow it
+    pass
+
+
+def _raise_interrupted(signum, frame):
+    import signal
+
+    reason = "CPU time limit exceeded" if signum == signal.SIGXCPU else "Timed out"
+    raise _Interrupted(reason)
+
+
+# The only environment variables user code can see in a worker
+_WORKER_ENV = ("PATH", "LANG", "LC_ALL", "TZ", "TMPDIR")
+
+
+def _init_worker(memory_bytes: int) -> None:
+    import os
+    import resource
+    import signal
+
+    # Keep secrets (SECRET_KEY, LLM_API_KEY, DATABASE_URL, ...) away from user code
+    kept = {name: os.environ[name] for name in _WORKER_ENV if name in os.environ}
+    os.environ.clear()
+    os.environ.update(kept)
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    signal.signal(signal.SIGXCPU, _raise_interrupted)
+    signal.signal(signal.SIGALRM, _raise_interrupted)
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    try:
+        # The parent owns the segment; keep the worker's tracker out of it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_code(
+    code: str,
+    segment: Optional[Tuple[str, int]],
+    cpu_seconds: int,
+    wall_seconds: float,
+    max_output: int,
+) -> Dict[str, Any]:
+    import resource
+    import signal
+
+    data = None
+    if segment is not None:
+        name, size = segment
+        shm = _attach_segment(name)
+        try:
+            data = pickle.loads(shm.buf[:size])
+        finally:
+            shm.close()
+
+    emitted = []
+
+    def emit(payload: Any, name: Optional[str] = None, type: str = "data") -> None:
+        emitted.append({"payload": payload, "name": name, "type": type})
+
+    namespace = {"__name__": "__sandbox__", "data": data, "emit": emit}
+    stdout = io.StringIO()
+    error = None
+
+    # CPU limit is cumulative per process, so extend it by this call's budget
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    limit = int(used + cpu_seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    signal.setitimer(signal.ITIMER_REAL, wall_seconds)
+    try:
+        with contextlib.redirect_stdout(stdout):
+            exec(compile(code, "<run>", "exec"), namespace)
+    except _Interrupted as e:
+        error = str(e)
+    except BaseException as e:
+        error = f"{e.__class__.__name__}: {e}"
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+    result = None if error else namespace.get("result")
+    try:
+        # Results are persisted as JSON payloads
+        json.dumps([result, [e["payload"] for e in emitted]])
+    except (TypeError, ValueError) as e:
+        error = error or f"Result is not JSON serializable: {e}"
+        result, emitted = None, []
+
+    return {
+        "stdout": stdout.getvalue()[:max_output],
+        "result": result,
+        "artifacts": emitted if not error else [],
+        "error": error,
+    }
+
+
+# --- Parent side ---
+
+
+class SandboxPool:
+    """
+    Executes user code in a pool of pre-warmed worker processes.
+
+    Each call runs under a CPU-time budget, a wall-clock timeout and an
+    address-space limit, in a worker that is replaced after the call, so no
+    state (patched modules, builtins, signal handlers) carries over to the
+    next caller. Workers start with a scrubbed environment. A worker that
+    dies or hangs takes the pool down with it, and the pool is rebuilt
+    before the next call, so the server process is never affected. These
+    are resource limits, not a security boundary: the code runs with the
+    server's OS privileges (see SANDBOX_ENABLED).
+
+    Input payloads are pickled once per artifact version into shared memory
+    and reused by later calls; workers read them straight from the segment.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        cpu_seconds: int,
+        memory_bytes: int,
+        max_output: int,
+        payload_cache_entries: int,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_output = max_output
+        self.payload_cache_entries = payload_cache_entries
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._segments: "OrderedDict[str, Tuple[shared_memory.SharedMemory, int]]" = OrderedDict()
+        self._segments_in_use: Dict[str, int] = {}
+        self._runs = 0
+        self._timeouts = 0
+        self._crashes = 0
+        self._restarts = 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_bytes,),
+            # A fresh process per call; the replacement spawns right away
+            max_tasks_per_child=1,
+        )
+
+    async def start(self) -> None:
+        """
+        Create the pool. Workers serve one call each, so none are started
+        ahead of time: a warm-up call would use up the worker it warmed.
+        """
+        if self._executor is not None:
+            return
+        self._executor = self._create_executor()
+
+    def _kill_workers(self, executor: ProcessPoolExecutor) -> None:
+        # Concurrent failures of the same pool must not kill its replacement
+        if executor is None or executor is not self._executor:
+            return
+        self._executor = None
+        kill = getattr(executor, "kill_workers", None)  # Python 3.14+
+        if kill is not None:
+            kill()
+        else:
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._restarts += 1
+
+    def _acquire_segment(self, key: str, payload: Any) -> Tuple[str, int]:
+        """Shared-memory copy of `payload`, pinned until _release_segment."""
+        entry = self._segments.get(key)
+        if entry is None:
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+            shm.buf[: len(data)] = data
+            entry = self._segments[key] = (shm, len(data))
+        self._segments.move_to_end(key)
+        self._segments_in_use[key] = self._segments_in_use.get(key, 0) + 1
+        self._evict_segments()
+        shm, size = entry
+        return shm.name, size
+
+    def _release_segment(self, key: str) -> None:
+        self._segments_in_use[key] -= 1
+        if not self._segments_in_use[key]:
+            del self._segments_in_use[key]
+        self._evict_segments()
+
+    def _evict_segments(self) -> None:
+        for key in list(self._segments):
+            if len(self._segments) <= self.payload_cache_entries:
+                return
+            if self._segments_in_use.get(key):
+                continue
+            shm, _ = self._segments.pop(key)
+            shm.close()
+            shm.unlink()
+
+    async def run(
+        self,
+        code: str,
+        payload: Any = None,
+        payload_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run `code` with `payload` bound to `data`. Returns stdout, the value
+        the code assigned to `result`, artifacts passed to `emit()` and an
+        error string (None on success). `payload_key` identifies an immutable
+        payload (e.g. artifact id and version) so it is shared only once.
+
+        Raises SandboxTimeout or SandboxCrashed when the worker had to be
+        killed or died.
+        """
+        await self.start()
+        segment = None
+        if payload_key is not None:
+            segment = self._acquire_segment(payload_key, payload)
+
+        self._runs += 1
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            future = loop.run_in_executor(
+                executor,
+                _run_code,
+                code,
+                segment,
+                self.cpu_seconds,
+                self.timeout,
+                self.max_output,
+            )
+            # The worker enforces the timeout itself; the grace period only
+            # covers code stuck outside the interpreter
+            return await asyncio.wait_for(future, self.timeout + 2)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self._kill_workers(executor)
+            raise SandboxTimeout(f"Execution exceeded {self.timeout}s")
+        except BrokenProcessPool:
+            self._crashes += 1
+            self._kill_workers(executor)
+            raise SandboxCrashed("Sandbox worker crashed")
+        finally:
+            if payload_key is not None:
+                self._release_segment(payload_key)
+
+    async def aclose(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for shm, _ in self._segments.values():
+            shm.close()
+            shm.unlink()
+        self._segments.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "runs": self._runs,
+            "timeouts": self._timeouts,
+            "crashes": self._crashes,
+            "restarts": self._restarts,
+            "cached_payloads": len(self._segments),
+            "cached_payload_bytes": sum(size for _, size in self._segments.values()),
+        }
+
+
+_pool: Optional[SandboxPool] = None
+
+
+def get_sandbox_pool() -> SandboxPool:
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = SandboxPool(
+            workers=settings.SANDBOX_WORKERS,
+            timeout=settings.SANDBOX_TIMEOUT_SECONDS,
+            cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+            memory_bytes=settings.SANDBOX_MEMORY_BYTES,
+            max_output=settings.SANDBOX_MAX_OUTPUT_CHARS,
+            payload_cache_entries=settings.SANDBOX_PAYLOAD_CACHE_ENTRIES,
+        )
+    return _pool
+
+
+async def shutdown_sandbox_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -0,0 +1,467 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+import aiosqlite
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TurnFrames:
+    """Frames of a turn after some sequence number, as read from a log."""
+
+    def __init__(
+        self,
+        owner: Optional[int],
+        frames: List[Tuple[int, str]],
+        first_seq: int,
+        closed: bool,
+    ):
+        self.owner = owner
+        self.frames = frames
+        self.first_seq = first_seq  # Oldest retained sequence number
+        self.closed = closed
+
+
+class StreamLog(ABC):
+    """
+    Append-only log of the SSE frames of streaming turns, kept so a client
+    can resume with Last-Event-ID. Closed turns expire after `ttl_seconds`;
+    each turn keeps at most `max_frames` (and `max_turn_bytes`) of its most
+    recent frames. Over `max_bytes` in all, the oldest other turns are
+    dropped, finished ones first. A byte limit of 0 disables it.
+    """
+
+    backend_name = "abstract"
+
+    def __init__(
+        self,
+        max_turns: int,
+        max_frames: int,
+        ttl_seconds: float,
+        max_turn_bytes: int = 0,
+        max_bytes: int = 0,
+    ):
+        self.max_turns = max_turns
+        self.max_frames = max_frames
+        self.ttl_seconds = ttl_seconds
+        self.max_turn_bytes = max_turn_bytes
+        self.max_bytes = max_bytes
+
+    @abstractmethod
+    async def create(self, turn_id: str, owner: Optional[int]) -> None:
+        pass
+
+    @abstractmethod
+    async def append(self, turn_id: str, seq: int, frame: str) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self, turn_id: str) -> None:
+        """Mark the turn finished; its frames expire after the TTL."""
+        pass
+
+    @abstractmethod
+    async def read(self, turn_id: str, after_seq: int) -> Optional[TurnFrames]:
+        """Frames with seq > `after_seq`, or None if the turn is unknown or expired."""
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend_name}
+
+
+def _frame_size(frame: str) -> int:
+    return len(frame.encode("utf-8"))
+
+
+class _TurnRecord:
+    __slots__ = ("owner", "frames", "first_seq", "closed", "expires_at", "size")
+
+    def __init__(self, owner: Optional[int]):
+        self.owner = owner
+        self.frames: List[Tuple[int, str]] = []
+        self.first_seq = 1
+        self.closed = False
+        self.expires_at: Optional[float] = None
+        self.size = 0  # Bytes of the retained frames
+
+
+class MemoryStreamLog(StreamLog):
+    backend_name = "memory"
+
+    def __init__(
+        self,
+        max_turns: int,
+        max_frames: int,
+        ttl_seconds: float,
+        max_turn_bytes: int = 0,
+        max_bytes: int = 0,
+    ):
+        super().__init__(max_turns, max_frames, ttl_seconds, max_turn_bytes, max_bytes)
+        self._turns: "OrderedDict[str, _TurnRecord]" = OrderedDict()
+        self._size = 0  # Bytes of all retained frames
+
+    def _remove(self, turn_id: str) -> None:
+        self._size -= self._turns.pop(turn_id).size
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for turn_id, record in list(self._turns.items()):
+            if record.expires_at is not None and record.expires_at <= now:
+                self._remove(turn_id)
+        # Over capacity: drop the oldest turns, finished ones first
+        for closed_only in (True, False):
+            for turn_id, record in list(self._turns.items()):
+                if len(self._turns) < self.max_turns:
+                    return
+                if record.closed or not closed_only:
+                    self._remove(turn_id)
+
+    def _trim(self, record: _TurnRecord) -> None:
+        """Drop the oldest frames over the turn's limits, keeping the newest."""
+        overflow = len(record.frames) - self.max_frames
+        size = record.size
+        drop = 0
+        while drop < len(record.frames) - 1 and (
+            drop < overflow or (self.max_turn_bytes and size > self.max_turn_bytes)
+        ):
+            size -= _frame_size(record.frames[drop][1])
+            drop += 1
+        if drop:
+            self._size -= record.size - size
+            record.size = size
+            del record.frames[:drop]
+            record.first_seq = record.frames[0][0]
+
+    def _evict(self, keep: str) -> None:
+        """Over the byte budget: drop the oldest turns but `keep`, finished ones first."""
+        for closed_only in (True, False):
+            for turn_id, record in list(self._turns.items()):
+                if self._size <= self.max_bytes:
+                    return
+                if turn_id != keep and (record.closed or not closed_only):
+                    self._remove(turn_id)
+
+    async def create(self, turn_id: str, owner: Optional[int]) -> None:
+        self._expire()
+        if turn_id in self._turns:
+            self._remove(turn_id)
+        self._turns[turn_id] = _TurnRecord(owner)
+
+    async def append(self, turn_id: str, seq: int, frame: str) -> None:
+        record = self._turns.get(turn_id)
+        if record is None:
+            return
+        record.frames.append((seq, frame))
+        size = _frame_size(frame)
+        record.size += size
+        self._size += size
+        self._trim(record)
+        if self.max_bytes and self._size > self.max_bytes:
+            self._evict(turn_id)
+
+    async def close(self, turn_id: str) -> None:
+        record = self._turns.get(turn_id)
+        if record is not None:
+            record.closed = True
+            record.expires_at = time.monotonic() + self.ttl_seconds
+
+    async def read(self, turn_id: str, after_seq: int) -> Optional[TurnFrames]:
+        record = self._turns.get(turn_id)
+        if record is None:
+            return None
+        if record.expires_at is not None and record.expires_at <= time.monotonic():
+            self._remove(turn_id)
+            return None
+        # Sequence numbers are dense, so the offset can be computed directly
+        start = max(0, after_seq + 1 - record.first_seq)
+        return TurnFrames(
+            record.owner, record.frames[start:], record.first_seq, record.closed
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["turns"] = len(self._turns)
+        stats["open_turns"] = sum(1 for r in self._turns.values() if not r.closed)
+        stats["frames"] = sum(len(r.frames) for r in self._turns.values())
+        stats["bytes"] = self._size
+        return stats
+
+
+class SQLiteStreamLog(StreamLog):
+    """
+    File-backed log, so turns produced by one worker process can be
+    replayed by another worker on the same host.
+
+    Appended frames are committed in batches, after `flush_interval`
+    seconds or once `flush_frames` are pending (every frame when the
+    interval is 0). Readers in this process see pending frames at once;
+    other processes see them after the next commit.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_turns: int,
+        max_frames: int,
+        ttl_seconds: float,
+        max_turn_bytes: int = 0,
+        max_bytes: int = 0,
+        flush_interval: float = 0.0,
+        flush_frames: int = 1,
+    ):
+        super().__init__(max_turns, max_frames, ttl_seconds, max_turn_bytes, max_bytes)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_frames = max(1, flush_frames)
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._pending: List[Tuple[str, int, str]] = []
+        self._flushing: List[Tuple[str, int, str]] = []  # Written, not yet committed
+        self._flush_task: Optional[asyncio.Future] = None
+        self._commits = 0
+
+    async def _connection(self) -> aiosqlite.Connection:
+        async with self._lock:
+            if self._conn is None:
+                conn = await aiosqlite.connect(self.path)
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS stream_turns ("
+                    "turn_id TEXT PRIMARY KEY, owner INTEGER, "
+                    "created_at REAL NOT NULL, closed INTEGER NOT NULL DEFAULT 0, "
+                    "expires_at REAL, bytes INTEGER NOT NULL DEFAULT 0)"
+                )
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS stream_frames ("
+                    "turn_id TEXT NOT NULL, seq INTEGER NOT NULL, frame TEXT NOT NULL, "
+                    "size INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (turn_id, seq))"
+                )
+                # Logs written before byte accounting
+                for table, column in (("stream_turns", "bytes"), ("stream_frames", "size")):
+                    async with conn.execute(f"PRAGMA table_info({table})") as cursor:
+                        columns = [row[1] for row in await cursor.fetchall()]
+                    if column not in columns:
+                        await conn.execute(
+                            f"ALTER TABLE {table} ADD COLUMN {column} "
+                            "INTEGER NOT NULL DEFAULT 0"
+                        )
+                await conn.commit()
+                self._conn = conn
+            return self._conn
+
+    async def create(self, turn_id: str, owner: Optional[int]) -> None:
+        conn = await self._connection()
+        now = time.time()
+        expired = "SELECT turn_id FROM stream_turns WHERE expires_at <= ?"
+        await conn.execute(
+            f"DELETE FROM stream_frames WHERE turn_id IN ({expired})", (now,)
+        )
+        await conn.execute("DELETE FROM stream_turns WHERE expires_at <= ?", (now,))
+        overflow = (
+            "SELECT turn_id FROM stream_turns ORDER BY closed DESC, created_at "
+            "LIMIT max(0, (SELECT count(*) FROM stream_turns) - ? + 1)"
+        )
+        await conn.execute(
+            f"DELETE FROM stream_frames WHERE turn_id IN ({overflow})", (self.max_turns,)
+        )
+        await conn.execute(
+            f"DELETE FROM stream_turns WHERE turn_id IN ({overflow})", (self.max_turns,)
+        )
+        await conn.execute(
+            "INSERT OR REPLACE INTO stream_turns (turn_id, owner, created_at) VALUES (?, ?, ?)",
+            (turn_id, owner, now),
+        )
+        await conn.commit()
+
+    async def append(self, turn_id: str, seq: int, frame: str) -> None:
+        self._pending.append((turn_id, seq, frame))
+        if self.flush_interval <= 0 or len(self._pending) >= self.flush_frames:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        try:
+            await self._flush()
+        except Exception:
+            logger.exception("Could not write stream log frames")
+
+    async def _flush(self) -> None:
+        """Write and commit the pending frames, then apply the limits."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, []
+            try:
+                conn = await self._connection()
+                rows = [
+                    (turn_id, seq, frame, _frame_size(frame), turn_id)
+                    for turn_id, seq, frame in self._flushing
+                ]
+                # Frames of turns dropped meanwhile are discarded
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO stream_frames (turn_id, seq, frame, size) "
+                    "SELECT ?, ?, ?, ? WHERE EXISTS "
+                    "(SELECT 1 FROM stream_turns WHERE turn_id = ?)",
+                    rows,
+                )
+                added: Dict[str, Tuple[int, int]] = {}  # turn_id -> (last seq, bytes)
+                for turn_id, seq, _, size, _ in rows:
+                    last_seq, total = added.get(turn_id, (0, 0))
+                    added[turn_id] = (max(last_seq, seq), total + size)
+                for turn_id, (last_seq, size) in added.items():
+                    await conn.execute(
+                        "UPDATE stream_turns SET bytes = bytes + ? WHERE turn_id = ?",
+                        (size, turn_id),
+                    )
+                    await self._trim(conn, turn_id, last_seq)
+                if self.max_bytes:
+                    await self._evict(conn, keep=set(added))
+                await conn.commit()
+                self._commits += 1
+            finally:
+                self._flushing = []
+
+    async def _trim(self, conn: aiosqlite.Connection, turn_id: str, last_seq: int) -> None:
+        """Drop the oldest frames over the turn's limits, keeping the newest."""
+        cutoff = last_seq - self.max_frames
+        if self.max_turn_bytes:
+            async with conn.execute(
+                "SELECT bytes FROM stream_turns WHERE turn_id = ?", (turn_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is not None and row[0] > self.max_turn_bytes:
+                # The newest frame whose suffix of the turn is over the limit
+                async with conn.execute(
+                    "SELECT max(seq) FROM (SELECT seq, sum(size) OVER "
+                    "(ORDER BY seq DESC) AS tail FROM stream_frames WHERE turn_id = ?) "
+                    "WHERE tail > ? AND seq < ?",
+                    (turn_id, self.max_turn_bytes, last_seq),
+                ) as cursor:
+                    cutoff = max(cutoff, (await cursor.fetchone())[0] or 0)
+        if cutoff <= 0:
+            return
+        async with conn.execute(
+            "DELETE FROM stream_frames WHERE turn_id = ? AND seq <= ? RETURNING size",
+            (turn_id, cutoff),
+        ) as cursor:
+            dropped = sum(size for (size,) in await cursor.fetchall())
+        if dropped:
+            await conn.execute(
+                "UPDATE stream_turns SET bytes = bytes - ? WHERE turn_id = ?",
+                (dropped, turn_id),
+            )
+
+    async def _evict(self, conn: aiosqlite.Connection, keep: Set[str]) -> None:
+        """Over the byte budget: drop the oldest turns but `keep`, finished ones first."""
+        async with conn.execute(
+            "SELECT turn_id, bytes FROM stream_turns ORDER BY closed DESC, created_at"
+        ) as cursor:
+            turns = await cursor.fetchall()
+        excess = sum(size for _, size in turns) - self.max_bytes
+        victims = []
+        for turn_id, size in turns:
+            if excess <= 0:
+                break
+            if turn_id not in keep:
+                victims.append(turn_id)
+                excess -= size
+        if victims:
+            marks = ", ".join("?" * len(victims))
+            await conn.execute(
+                f"DELETE FROM stream_frames WHERE turn_id IN ({marks})", victims
+            )
+            await conn.execute(
+                f"DELETE FROM stream_turns WHERE turn_id IN ({marks})", victims
+            )
+
+    async def close(self, turn_id: str) -> None:
+        await self._flush()
+        conn = await self._connection()
+        await conn.execute(
+            "UPDATE stream_turns SET closed = 1, expires_at = ? WHERE turn_id = ?",
+            (time.time() + self.ttl_seconds, turn_id),
+        )
+        await conn.commit()
+
+    async def read(self, turn_id: str, after_seq: int) -> Optional[TurnFrames]:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT owner, closed, expires_at FROM stream_turns WHERE turn_id = ?",
+            (turn_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None or (row[2] is not None and row[2] <= time.time()):
+            return None
+        owner, closed, _ = row
+        unwritten = {
+            seq: frame
+            for t, seq, frame in self._flushing + self._pending
+            if t == turn_id
+        }
+        async with conn.execute(
+            "SELECT min(seq) FROM stream_frames WHERE turn_id = ?", (turn_id,)
+        ) as cursor:
+            first_seq = (await cursor.fetchone())[0] or min(unwritten, default=1)
+        async with conn.execute(
+            "SELECT seq, frame FROM stream_frames WHERE turn_id = ? AND seq > ? ORDER BY seq",
+            (turn_id, after_seq),
+        ) as cursor:
+            frames = dict(await cursor.fetchall())
+        frames.update((seq, f) for seq, f in unwritten.items() if seq > after_seq)
+        return TurnFrames(owner, sorted(frames.items()), first_seq, bool(closed))
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._conn is not None or self._pending:
+            await self._flush()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["pending_frames"] = len(self._pending)
+        stats["commits"] = self._commits
+        return stats
+
+
+@lru_cache()
+def get_stream_log() -> StreamLog:
+    settings = get_settings()
+    backend = settings.STREAM_LOG_BACKEND.lower()
+
+    if backend == "sqlite":
+        return SQLiteStreamLog(
+            settings.STREAM_LOG_SQLITE_PATH,
+            settings.STREAM_LOG_MAX_TURNS,
+            settings.STREAM_LOG_MAX_FRAMES,
+            settings.STREAM_LOG_TTL_SECONDS,
+            settings.STREAM_LOG_MAX_TURN_BYTES,
+            settings.STREAM_LOG_MAX_BYTES,
+            settings.STREAM_LOG_FLUSH_INTERVAL,
+            settings.STREAM_LOG_FLUSH_FRAMES,
+        )
+    else:
+        return MemoryStreamLog(
+            settings.STREAM_LOG_MAX_TURNS,
+            settings.STREAM_LOG_MAX_FRAMES,
+            settings.STREAM_LOG_TTL_SECONDS,
+            settings.STREAM_LOG_MAX_TURN_BYTES,
+            settings.STREAM_LOG_MAX_BYTES,
+        )
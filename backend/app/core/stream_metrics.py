@@ -0,0 +1,176 @@
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from app.core.llm_protocol import ArtifactChunkEvent, LLMEvent, TextDeltaEvent
+
+# Upper bounds in seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram with percentile estimates from bucket bounds."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class _Series:
+    def __init__(self):
+        self.first_token = Histogram()
+        self.inter_token = Histogram()
+        self.total = Histogram()
+        self.turns = 0
+        self.events = 0
+        self.bytes = 0
+
+
+class StreamMetrics:
+    """
+    Latency histograms of generation streams, per (provider, kind,
+    artifacts) label set: time to first event, gaps between events and total
+    generation time, plus event and byte counters.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str, bool], _Series] = {}
+
+    def record(self, timing: "StreamTiming", artifacts: bool) -> None:
+        key = (timing.provider, timing.kind, artifacts)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        series.turns += 1
+        series.events += timing.events
+        series.bytes += timing.bytes
+        if timing.first_token is not None:
+            series.first_token.observe(timing.first_token)
+        for gap in timing.gaps:
+            series.inter_token.observe(gap)
+        series.total.observe(timing.total)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": [
+                {
+                    "provider": provider,
+                    "kind": kind,
+                    "artifacts": artifacts,
+                    "turns": series.turns,
+                    "events": series.events,
+                    "bytes": series.bytes,
+                    "time_to_first_token_seconds": series.first_token.snapshot(),
+                    "inter_token_seconds": series.inter_token.snapshot(),
+                    "generation_seconds": series.total.snapshot(),
+                }
+                for (provider, kind, artifacts), series in self._series.items()
+            ]
+        }
+
+
+@lru_cache
+def get_stream_metrics() -> StreamMetrics:
+    return StreamMetrics()
+
+
+class StreamTiming:
+    """
+    Timing of one generation: started on creation, marked on every event
+    from the source, and recorded into the StreamMetrics by `finish()`.
+    """
+
+    def __init__(self, provider: str, kind: str):
+        self.provider = provider
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.total = 0.0
+        self.gaps: List[float] = []
+        self.events = 0
+        self.bytes = 0
+        self._last: Optional[float] = None
+
+    def mark(self, nbytes: int = 0) -> None:
+        now = time.perf_counter()
+        if self._last is None:
+            self.first_token = now - self.started
+        else:
+            self.gaps.append(now - self._last)
+        self._last = now
+        self.events += 1
+        self.bytes += nbytes
+
+    async def track(
+        self, source: AsyncIterator[Union[str, LLMEvent]]
+    ) -> AsyncIterator[Union[str, LLMEvent]]:
+        """Pass `source` through, marking each event and its payload bytes."""
+        async for event in source:
+            if isinstance(event, str):  # Raw pass-through line
+                nbytes = len(event.encode())
+            elif isinstance(event, TextDeltaEvent):
+                nbytes = len(event.content.encode())
+            elif isinstance(event, ArtifactChunkEvent):
+                nbytes = len(event.chunk.encode())
+            else:
+                nbytes = 0
+            self.mark(nbytes)
+            yield event
+
+    def finish(self, artifacts: bool) -> Dict[str, Any]:
+        """Record the generation; returns the summary for turn metadata."""
+        self.total = time.perf_counter() - self.started
+        get_stream_metrics().record(self, artifacts)
+
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "provider": self.provider,
+            "time_to_first_token_ms": ms(self.first_token),
+            "max_inter_token_ms": ms(max(self.gaps)) if self.gaps else None,
+            "mean_inter_token_ms": ms(sum(self.gaps) / len(self.gaps)) if self.gaps else None,
+            "generation_ms": ms(self.total),
+            "events": self.events,
+            "bytes": self.bytes,
+        }
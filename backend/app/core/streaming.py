@@ -0,0 +1,183 @@
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+from app.core.llm_protocol import TextDeltaEvent, decode_text_deltas
+
+
+class ClientDisconnected(Exception):
+    """
+    Raised when the consumer of a stream has gone away. The first argument
+    carries any coalesced text that had not been released yet.
+    """
+
+    @property
+    def unflushed_text(self) -> str:
+        return self.args[0] if self.args else ""
+
+
+class TextTee:
+    """
+    Persistence side of a pass-through stream: collects a turn's text from
+    decoded deltas and from raw text_delta lines that were forwarded to the
+    client unchanged. Raw lines are decoded in one batch when the text is
+    needed, instead of once per token on the streaming path.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._raw: List[str] = []
+
+    def _decode_raw(self) -> None:
+        if self._raw:
+            self._parts.append(decode_text_deltas(self._raw))
+            self._raw = []
+
+    def add(self, content: str) -> None:
+        self._decode_raw()
+        self._parts.append(content)
+
+    def add_raw(self, line: str) -> None:
+        self._raw.append(line)
+
+    def value(self) -> str:
+        self._decode_raw()
+        return "".join(self._parts)
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+_DONE = object()
+
+
+class EventPump:
+    """
+    Drives an async iterator (e.g. an LLM provider stream) in its own task.
+
+    Events are handed over through a bounded queue, which lets the consumer
+    wait for the next event with a timeout, notice a client disconnect while
+    the upstream is idle, and cancel the upstream immediately. Running the
+    source in a single task also means closing it always happens in the task
+    that opened it (httpx streams rely on that).
+    """
+
+    def __init__(self, source: AsyncIterator[Any], maxsize: int = 64):
+        self._source = source
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        try:
+            async for event in self._source:
+                await self._queue.put(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put(_Failure(e))
+            return
+        await self._queue.put(_DONE)
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Next event, or `EventPump.DONE` once the source is exhausted.
+        Raises asyncio.TimeoutError if nothing arrives within `timeout`.
+        """
+        self.start()
+        if not self._queue.empty():
+            item = self._queue.get_nowait()
+        elif timeout is None:
+            item = await self._queue.get()
+        else:
+            item = await asyncio.wait_for(self._queue.get(), timeout)
+        if isinstance(item, _Failure):
+            raise item.exc
+        return item
+
+    async def events(
+        self,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        check_interval: float = 0.25,
+        coalesce_window: float = 0.0,
+        coalesce_max_bytes: int = 4096,
+    ):
+        """
+        Iterate the source, checking `is_disconnected` at most once per
+        `check_interval` seconds (also while waiting on a silent upstream).
+        Raises ClientDisconnected as soon as a disconnect is seen.
+
+        With `coalesce_window` > 0, consecutive TextDeltaEvents are merged
+        into one event that is released when the window (measured from the
+        first buffered delta) elapses, the buffered text reaches
+        `coalesce_max_bytes` (UTF-8), or any other event arrives, so ordering
+        relative to artifact events is preserved.
+        """
+        loop = asyncio.get_running_loop()
+        last_check = loop.time()
+        pending = []
+        pending_bytes = 0
+        flush_at = None
+
+        def merged():
+            return TextDeltaEvent.model_construct(
+                type="text_delta", content="".join(pending)
+            )
+
+        while True:
+            timeout = None
+            if is_disconnected is not None:
+                timeout = max(0.0, last_check + check_interval - loop.time())
+            if flush_at is not None:
+                remaining = max(0.0, flush_at - loop.time())
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            try:
+                item = await self.get(timeout=timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            now = loop.time()
+            if is_disconnected is not None and now - last_check >= check_interval:
+                last_check = now
+                if await is_disconnected():
+                    raise ClientDisconnected("".join(pending))
+
+            if item is None:
+                if flush_at is not None and now >= flush_at:
+                    yield merged()
+                    pending, pending_bytes, flush_at = [], 0, None
+                continue
+
+            if coalesce_window > 0 and isinstance(item, TextDeltaEvent):
+                pending.append(item.content)
+                pending_bytes += len(item.content.encode("utf-8"))
+                if flush_at is None:
+                    flush_at = now + coalesce_window
+                if pending_bytes >= coalesce_max_bytes or now >= flush_at:
+                    yield merged()
+                    pending, pending_bytes, flush_at = [], 0, None
+                continue
+
+            if pending:
+                yield merged()
+                pending, pending_bytes, flush_at = [], 0, None
+            if item is _DONE:
+                return
+            yield item
+
+    async def aclose(self) -> None:
+        """Cancel the upstream (if still running) and release it."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        elif self._task is None and hasattr(self._source, "aclose"):
+            await self._source.aclose()
+
+
+EventPump.DONE = _DONE
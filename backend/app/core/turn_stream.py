@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.config import get_settings
+from app.core.stream_log import StreamLog, TurnFrames, get_stream_log
+
+logger = logging.getLogger(__name__)
+
+# Builds the turn's SSE frames; receives the broker's "abandoned" check
+TurnProducer = Callable[[Callable[[], Awaitable[bool]]], AsyncIterator[str]]
+# Called with (turn_id, seq, frame) for every frame the producer appends
+FrameListener = Callable[[str, int, str], None]
+
+
+class TurnNotFound(LookupError):
+    """Unknown, expired or foreign turn."""
+
+
+class TurnWindowLost(LookupError):
+    """The frames after the requested event id are no longer retained."""
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """`<turn_id>:<seq>` as sent in the SSE `id:` field, or None."""
+    if not value:
+        return None
+    turn_id, _, seq = value.strip().rpartition(":")
+    if not turn_id or not seq.isdigit():
+        return None
+    return turn_id, int(seq)
+
+
+class _LiveTurn:
+    def __init__(self, turn_id: str, owner: Optional[int]):
+        self.id = turn_id
+        self.owner = owner
+        self.seq = 0
+        self.consumers = 0
+        self.detached_at = asyncio.get_running_loop().time()
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.on_frame: Optional[FrameListener] = None
+        self.on_close: Optional[Callable[[str], None]] = None
+
+
+class TurnStreamBroker:
+    """
+    Decouples a streaming turn from the HTTP response that started it.
+
+    The producer runs in its own task and appends every frame to the stream
+    log under a dense sequence number; responses attach as consumers and
+    replay from any sequence number, so a client that lost its connection
+    reconnects with `Last-Event-ID` instead of re-running the turn. When no
+    consumer has been attached for `grace_seconds`, the producer is told the
+    client is gone and the disconnect policy applies.
+    """
+
+    def __init__(
+        self,
+        log: StreamLog,
+        grace_seconds: float,
+        poll_interval: float = 0.25,
+    ):
+        self.log = log
+        self.grace_seconds = grace_seconds
+        self.poll_interval = poll_interval
+        self._live: Dict[str, _LiveTurn] = {}
+
+    async def start(
+        self,
+        owner: Optional[int],
+        produce: TurnProducer,
+        on_frame: Optional[FrameListener] = None,
+        on_close: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Run `produce` in its own task and return the turn id. `on_frame` and
+        `on_close` observe the turn without counting as consumers, so they do
+        not keep an abandoned turn alive.
+        """
+        turn = _LiveTurn(str(uuid.uuid4()), owner)
+        turn.on_frame, turn.on_close = on_frame, on_close
+        await self.log.create(turn.id, owner)
+        self._live[turn.id] = turn
+        turn.task = asyncio.ensure_future(self._produce(turn, produce))
+        return turn.id
+
+    async def _abandoned(self, turn: _LiveTurn) -> bool:
+        if turn.consumers:
+            return False
+        loop = asyncio.get_running_loop()
+        return loop.time() - turn.detached_at >= self.grace_seconds
+
+    async def _produce(self, turn: _LiveTurn, produce: TurnProducer) -> None:
+        try:
+            async for frame in produce(lambda: self._abandoned(turn)):
+                turn.seq += 1
+                await self.log.append(turn.id, turn.seq, frame)
+                turn.changed.set()
+                self._notify(turn, frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Streaming turn {turn.id} failed")
+            turn.seq += 1
+            error = {"type": "error", "message": str(e)}
+            frame = f"data: {json.dumps(error)}\n\n"
+            await self.log.append(turn.id, turn.seq, frame)
+            self._notify(turn, frame)
+        finally:
+            self._live.pop(turn.id, None)
+            try:
+                await self.log.close(turn.id)
+            finally:
+                turn.changed.set()
+                if turn.on_close is not None:
+                    turn.on_close(turn.id)
+
+    def _notify(self, turn: _LiveTurn, frame: str) -> None:
+        if turn.on_frame is None:
+            return
+        try:
+            turn.on_frame(turn.id, turn.seq, frame)
+        except Exception:
+            # A broken observer must not fail the turn
+            logger.exception(f"Frame listener of turn {turn.id} failed")
+
+    async def open(
+        self, turn_id: str, owner: Optional[int], after_seq: int = 0
+    ) -> TurnFrames:
+        """
+        Validate a (re)attach before the response starts. Raises TurnNotFound
+        or TurnWindowLost.
+        """
+        frames = await self.log.read(turn_id, after_seq)
+        if frames is None or frames.owner != owner:
+            raise TurnNotFound(turn_id)
+        if after_seq + 1 < frames.first_seq:
+            raise TurnWindowLost(turn_id)
+        return frames
+
+    async def attach(
+        self,
+        turn_id: str,
+        owner: Optional[int],
+        after_seq: int = 0,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Validate, then return an iterator of SSE frames (with `id:` fields)
+        after `after_seq` until the turn ends.
+        """
+        frames = await self.open(turn_id, owner, after_seq)
+        return self._follow(turn_id, after_seq, frames, is_disconnected)
+
+    async def _follow(
+        self,
+        turn_id: str,
+        after_seq: int,
+        frames: TurnFrames,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+    ) -> AsyncIterator[str]:
+        turn = self._live.get(turn_id)
+        if turn is not None:
+            turn.consumers += 1
+        try:
+            while True:
+                for seq, frame in frames.frames:
+                    yield f"id: {turn_id}:{seq}\n{frame}"
+                    after_seq = seq
+                if frames.closed:
+                    return
+
+                if turn is not None:
+                    turn.changed.clear()
+                frames = await self.log.read(turn_id, after_seq)
+                if frames is None:
+                    return
+                if frames.frames or frames.closed:
+                    continue
+
+                # Nothing new: wait for the producer, or poll a log that
+                # another worker process writes
+                if turn is not None:
+                    try:
+                        await asyncio.wait_for(turn.changed.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(self.poll_interval)
+
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                frames = await self.log.read(turn_id, after_seq)
+                if frames is None:
+                    return
+        finally:
+            if turn is not None:
+                turn.consumers -= 1
+                turn.detached_at = asyncio.get_running_loop().time()
+
+    async def aclose(self) -> None:
+        tasks = [t.task for t in self._live.values() if t.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "live_turns": len(self._live),
+            "consumers": sum(t.consumers for t in self._live.values()),
+        }
+        stats["log"] = self.log.stats()
+        return stats
+
+
+_broker: Optional[TurnStreamBroker] = None
+
+
+def get_turn_broker() -> TurnStreamBroker:
+    global _broker
+    if _broker is None:
+        _broker = TurnStreamBroker(
+            get_stream_log(), get_settings().STREAM_RESUME_GRACE_SECONDS
+        )
+    return _broker
+
+
+async def shutdown_turn_broker() -> None:
+    global _broker
+    if _broker is not None:
+        await _broker.aclose()
+        await _broker.log.aclose()
+        _broker = None
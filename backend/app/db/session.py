@@ -32,3 +32,22 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def begin_write(db: AsyncSession) -> None:
+    """
+    Start the session's transaction as a write transaction now. SQLite's
+    driver only begins one before the first write, so a SAVEPOINT issued
+    earlier is not nested in it and its RELEASE commits.
+    """
+    connection = await db.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    raw = await connection.get_raw_connection()
+    if not raw.driver_connection.in_transaction:
+        await connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Session factory for work that outlives the request (background jobs)."""
+    return AsyncSessionLocal
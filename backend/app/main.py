@@ -13,20 +13,56 @@
 # interaction patterns), may not be used, redistributed, or adapted
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import math
 
 from app.api.v1.api import api_router
 from app.core.config import get_settings
 from app.core.logging import setup_logging
-from app.db.session import engine
+from app.db.session import AsyncSessionLocal, engine
 from app.db.base_class import Base
+from app.core.metrics import get_metrics_registry
+from app.core.stream_metrics import get_stream_metrics
+from app.core.resilience import CircuitOpenError, upstream_stats
+from app.core.ghost_store import get_ghost_store
+from app.core.artifact.prefetch import get_context_artifact_cache
+from app.core.artifact.caching import CachingArtifactStore
+from app.core.artifact.factory import get_artifact_store
+from app.core.artifact.versions import get_version_cache
+from app.core.cache.factory import get_result_cache
+from app.core.events import get_event_bus
+from app.core.jobs import get_job_manager, shutdown_job_manager
+from app.core.admission import get_admission_controller
+from app.core.sandbox import get_sandbox_pool, shutdown_sandbox_pool
+from app.core.turn_stream import get_turn_broker, shutdown_turn_broker
+from app.services.artifact_service import ArtifactService
+from app.services.llm_providers import init_llm_provider, shutdown_llm_provider
 import app.models  # Ensure all models are registered
 
 settings = get_settings()
 
 setup_logging()
+logger = logging.getLogger(__name__)
+
+
+async def sweep_recycle_bin(interval: float) -> None:
+    """Purge expired recycled ghosts now, then every `interval` seconds."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                purged = await ArtifactService.sweep_recycle_bin(session)
+            if purged:
+                logger.info(f"Recycle bin: purged {purged} expired ghosts")
+        except Exception:
+            logger.exception("Recycle bin sweep failed")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
 
 
 @asynccontextmanager
@@ -36,14 +72,72 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
 
     # Initialize default user and workspace
-    from app.db.session import AsyncSessionLocal
     from app.services.user_service import UserService
 
     async with AsyncSessionLocal() as session:
         await UserService.initialize_defaults(session)
 
+    # Shared LLM provider (and its connection pool) for the app lifetime
+    provider = init_llm_provider()
+    get_metrics_registry().register_collector("llm_provider", provider.stats)
+    result_cache = get_result_cache()
+    get_metrics_registry().register_collector("result_cache", result_cache.stats)
+    job_manager = get_job_manager()
+    job_manager.start()
+    get_metrics_registry().register_collector("jobs", job_manager.stats)
+    get_metrics_registry().register_collector("events", get_event_bus().stats)
+    get_metrics_registry().register_collector(
+        "admission", get_admission_controller().stats
+    )
+    # Pre-warm the /run worker processes
+    if settings.SANDBOX_ENABLED:
+        sandbox = get_sandbox_pool()
+        await sandbox.start()
+        get_metrics_registry().register_collector("sandbox", sandbox.stats)
+    get_metrics_registry().register_collector("turn_streams", get_turn_broker().stats)
+    get_metrics_registry().register_collector("llm_latency", get_stream_metrics().stats)
+    get_metrics_registry().register_collector("upstreams", upstream_stats)
+    get_metrics_registry().register_collector("ghosts", get_ghost_store().stats)
+    get_metrics_registry().register_collector(
+        "context_artifacts", get_context_artifact_cache().stats
+    )
+    get_metrics_registry().register_collector("versions", get_version_cache().stats)
+    artifact_store = get_artifact_store()
+    if isinstance(artifact_store, CachingArtifactStore):
+        get_metrics_registry().register_collector(
+            "artifact_store_cache", artifact_store.stats
+        )
+    recycle_bin_sweeper = asyncio.ensure_future(
+        sweep_recycle_bin(settings.GHOST_RECYCLE_BIN_SWEEP_SECONDS)
+    )
+
     yield
-    # Shutdown logic (if any)
+
+    # Shutdown: close pooled connections
+    for name in (
+        "llm_provider",
+        "result_cache",
+        "jobs",
+        "events",
+        "admission",
+        "sandbox",
+        "turn_streams",
+        "llm_latency",
+        "upstreams",
+        "ghosts",
+        "context_artifacts",
+        "artifact_store_cache",
+        "versions",
+    ):
+        get_metrics_registry().unregister_collector(name)
+    recycle_bin_sweeper.cancel()
+    await asyncio.gather(recycle_bin_sweeper, return_exceptions=True)
+    # In-flight work first, then the resources it uses
+    await shutdown_turn_broker()
+    await shutdown_job_manager()
+    await shutdown_sandbox_pool()
+    await shutdown_llm_provider()
+    await result_cache.aclose()
 
 
 app = FastAPI(
@@ -65,6 +159,16 @@ app.add_middleware(
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    # An upstream is failing; tell the client when its breaker may close
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 @app.get("/api/v1/health")
 async def health_check():
     return {"status": "healthy"}
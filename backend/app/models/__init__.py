@@ -1,7 +1,7 @@
 from app.models.user import User, WorkspaceMember
 from app.models.workspace import Workspace
 from app.models.chat import ChatSession, ChatMessage, message_artifacts
-from app.models.artifact import Artifact, MutationRecord
+from app.models.artifact import Artifact, MutationRecord, PayloadBlob
 from app.models.archived_pane import ArchivedPane
 
 __all__ = [
@@ -13,5 +13,6 @@ __all__ = [
     "message_artifacts",
     "Artifact",
     "MutationRecord",
+    "PayloadBlob",
     "ArchivedPane",
 ]
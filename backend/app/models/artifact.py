@@ -13,10 +13,26 @@
 # interaction patterns), may not be used, redistributed, or adapted
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, String, ForeignKey, DateTime, JSON, UniqueConstraint, event, select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, deferred, object_session, relationship
 from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
 from app.db.base_class import Base
+from app.core.artifact.blobs import payload_digest
+from app.core.artifact.deltas import apply
+from app.core.artifact.versions import (
+    MISSING,
+    VersionNotLoaded,
+    encode_delta,
+    get_version_cache,
+)
+from app.core.config import get_settings
+
+_UNSET = object()
 
 
 class Artifact(Base):
@@ -30,6 +46,8 @@ class Artifact(Base):
     artifact_metadata = Column(JSON, default=dict)
     session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # N of the latest committed version "vN"; see ArtifactService.allocate_version
+    head_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     session = relationship("ChatSession", back_populates="artifacts")
     messages = relationship(
@@ -47,8 +65,25 @@ class Artifact(Base):
         return (self.artifact_metadata or {}).get("name", "Untitled")
 
 
+class PayloadBlob(Base):
+    """
+    A version payload stored once by content, however many versions (of
+    however many artifacts) share it.
+    """
+
+    __tablename__ = "payload_blobs"
+
+    checksum = Column(String, primary_key=True)  # SHA-256 of the canonical JSON
+    payload = Column(JSON, nullable=False)
+    size = Column(Integer, nullable=False)  # Bytes of the canonical JSON
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+
 class MutationRecord(Base):
     __tablename__ = "mutation_records"
+    __table_args__ = (
+        UniqueConstraint("artifact_id", "version_id", name="uq_mutation_records_version"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     artifact_id = Column(String, ForeignKey("artifacts.id"), nullable=False)
@@ -59,8 +94,186 @@ class MutationRecord(Base):
         JSON, nullable=False
     )  # {type, sessionId, prompt, triggeringCommand}
     change_summary = Column(String, nullable=True)
-    payload = Column(JSON, nullable=False)
-    checksum = Column(String, nullable=True)
+    # Pre-blob rows keep their payload inline; newer rows hold JSON null here.
+    # Payload columns are deferred: listing history loads headers only.
+    inline_payload = deferred(Column("payload", JSON, nullable=False))
+    # SHA-256 of the full payload, whichever way the version is stored
+    checksum = Column(String, nullable=True, index=True)
+    # The blob holding the payload; set for "full" versions only
+    blob_checksum = Column(
+        String, ForeignKey("payload_blobs.checksum"), nullable=True, index=True
+    )
     status = Column(String, default="committed")
+    # "full" (keyframe: blob or inline payload), "delta" (from base_id) or
+    # "external" (in the artifact store under storage_key)
+    encoding = Column(String, default="full", server_default="full", nullable=False)
+    storage_key = Column(String, nullable=True)
+    delta = deferred(Column(JSON, nullable=True))
+    base_id = Column(Integer, nullable=True)  # MutationRecord.id the delta applies to
+    chain_length = Column(Integer, default=0, server_default="0", nullable=False)  # Deltas since the keyframe
 
     artifact = relationship("Artifact", back_populates="mutations")
+    blob = relationship("PayloadBlob")
+
+    @property
+    def payload(self) -> Any:
+        """
+        The full payload. Loads whatever is not loaded yet (blob, deferred
+        columns, delta bases), so async code must read it through
+        ArtifactService.load_version_payload.
+        """
+        pending = self.__dict__.get("_payload", _UNSET)
+        if pending is not _UNSET:
+            return pending
+        if self.encoding == "external":
+            raise VersionNotLoaded(self.artifact_id, self.version_id)
+        if self.encoding == "delta":
+            return self._materialize()
+        if self.blob_checksum is not None:
+            blob = self.blob
+            if blob is not None:
+                return blob.payload
+        return self.inline_payload
+
+    @payload.setter
+    def payload(self, value: Any) -> None:
+        # Stored on flush, as a blob or a delta, see _store_payloads
+        self.__dict__["_payload"] = value
+        self.__dict__["_payload_pending"] = True
+        self.checksum, self.__dict__["_payload_size"] = payload_digest(value)
+        self.blob_checksum = self.checksum
+        self.inline_payload = None
+        self.encoding = "full"
+        self.delta = None
+        self.base_id = None
+        self.chain_length = 0
+        self.storage_key = None
+
+    def offload(self, storage_key: str) -> None:
+        """
+        Keep the new payload out of the database: it is already in the
+        artifact store under `storage_key`, a key no later save of the
+        artifact reuses (ArtifactStore.save_revision). Only its checksum is
+        recorded.
+        """
+        for key in ("_payload", "_payload_pending", "_payload_size"):
+            self.__dict__.pop(key, None)
+        self.encoding = "external"
+        self.blob_checksum = None
+        self.storage_key = storage_key
+
+    def _materialize(self) -> Any:
+        cache = get_version_cache()
+        payload = cache.get(self.checksum)
+        if payload is MISSING:
+            session = object_session(self)
+            base = session.get(MutationRecord, self.base_id) if session is not None else None
+            if base is None:
+                raise VersionNotLoaded(self.artifact_id, self.version_id)
+            payload = apply(base.payload, self.delta)
+            cache.set(self.checksum, payload)
+        return payload
+
+
+def _delta_base(record: MutationRecord) -> Optional[MutationRecord]:
+    """The stored parent version a new version can be delta-encoded against."""
+    if record.parent_id is None or record.status not in (None, "committed"):
+        return None
+    artifact = record.__dict__.get("artifact")
+    siblings = artifact.__dict__.get("mutations") if artifact is not None else None
+    candidates = [
+        m for m in siblings or []
+        if m.version_id == record.parent_id and m.id is not None and m.status == "committed"
+    ]
+    return max(candidates, key=lambda m: m.id) if candidates else None
+
+
+def _encode_as_delta(record: MutationRecord, keyframe_interval: int) -> bool:
+    base = _delta_base(record)
+    if base is None or base.chain_length + 1 >= keyframe_interval:
+        return False
+    try:
+        base_payload = base.payload
+    except VersionNotLoaded:
+        return False
+    delta = encode_delta(
+        base_payload,
+        record.__dict__["_payload"],
+        record.checksum,
+        record.__dict__["_payload_size"],
+    )
+    if delta is None:
+        return False
+    record.encoding = "delta"
+    record.blob_checksum = None
+    record.delta = delta
+    record.base_id = base.id
+    record.chain_length = base.chain_length + 1
+    return True
+
+
+def _insert_blobs(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert blobs, skipping any another transaction stored concurrently."""
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        session.execute(insert(PayloadBlob).on_conflict_do_nothing(), rows)
+        return
+    connection = session.connection()
+    for row in rows:
+        try:
+            with connection.begin_nested():
+                connection.execute(PayloadBlob.__table__.insert(), row)
+        except IntegrityError:
+            pass  # Same checksum, same content
+
+
+@event.listens_for(Session, "before_flush")
+def _store_payloads(session: Session, flush_context, instances) -> None:
+    """
+    Store the payloads of new versions: a reference to an existing blob when
+    the content is already stored, else (in delta mode) a delta from the
+    parent version, else a new blob.
+    """
+    records = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, MutationRecord) and obj.__dict__.pop("_payload_pending", False)
+    ]
+    if not records:
+        return
+
+    stored = set(
+        session.execute(
+            select(PayloadBlob.checksum).where(
+                PayloadBlob.checksum.in_({r.checksum for r in records})
+            )
+        ).scalars()
+    )
+    settings = get_settings()
+    delta_mode = settings.VERSION_STORAGE_MODE.lower() == "delta"
+    blobs = {}
+    for record in records:
+        if (
+            record.checksum not in stored
+            and delta_mode
+            and _encode_as_delta(record, settings.VERSION_KEYFRAME_INTERVAL)
+        ):
+            continue
+        # Stored blobs too (a no-op on conflict): a recycle-bin purge may
+        # delete one between the lookup above and this insert
+        blobs.setdefault(record.checksum, record)
+    if not blobs:
+        return
+
+    _insert_blobs(
+        session,
+        [
+            {
+                "checksum": checksum,
+                "payload": record.__dict__["_payload"],
+                "size": record.__dict__["_payload_size"],
+                "created_at": datetime.now(UTC),
+            }
+            for checksum, record in blobs.items()
+        ],
+    )
@@ -20,6 +20,7 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     DateTime,
+    Index,
     Table,
 )
 from sqlalchemy.orm import relationship
@@ -56,11 +57,14 @@ class ChatSession(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    # History is read per session in id order (see LLMContextService)
+    __table_args__ = (Index("ix_chat_messages_session_id_id", "session_id", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
     role = Column(String, nullable=False)
     content = Column(String, nullable=False)
+    is_truncated = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
 
     session = relationship("ChatSession", back_populates="messages")
@@ -25,7 +25,9 @@ class MutationOrigin(BaseModel):
     triggeringCommand: Optional[str] = None
 
 
-class MutationRecord(BaseModel):
+class MutationHeader(BaseModel):
+    """A version without its payload, as listed in an artifact's history."""
+
     id: int
     artifact_id: str
     version_id: str
@@ -33,13 +35,58 @@ class MutationRecord(BaseModel):
     timestamp: datetime
     origin: MutationOrigin
     change_summary: Optional[str] = None
-    payload: Any
     checksum: Optional[str] = None
     status: str
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class MutationRecord(MutationHeader):
+    payload: Any
+
+
+class MutationPage(BaseModel):
+    items: List[MutationHeader]
+    total: int
+    offset: int
+    limit: int
+
+
+class GhostCreate(BaseModel):
+    payload: Any
+    origin: Optional[MutationOrigin] = None
+    change_summary: Optional[str] = None
+
+
+class GhostMutation(BaseModel):
+    """An uncommitted ghost iteration; it only exists in the ghost store."""
+
+    id: str
+    artifact_id: str
+    parent_id: Optional[str] = None
+    created_at: datetime
+    origin: MutationOrigin
+    change_summary: Optional[str] = None
+    payload: Any
+    status: str = "ghost"
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GhostDiscardResult(BaseModel):
+    discarded: int
+    recycled: int
+
+
+class ArtifactPrefetchRequest(BaseModel):
+    artifact_ids: List[str] = Field(max_length=64)
+
+
+class ArtifactPrefetchResult(BaseModel):
+    # Per requested id: "cached" (already warm), "loaded" or "missing"
+    artifacts: Dict[str, str]
+
+
 # Artifact Structured Payloads
 class ArtifactCreate(BaseModel):
     id: Optional[str] = None
@@ -70,6 +117,26 @@ class Artifact(BaseModel):
     )
     session_id: str
     created_at: Optional[datetime] = None
-    mutations: List[MutationRecord] = []
+    mutations: List[MutationHeader] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ArtifactBatchGetRequest(BaseModel):
+    artifact_ids: List[str] = Field(max_length=100)
+
+
+class ArtifactBatchUpsertRequest(BaseModel):
+    artifacts: List[ArtifactCreate] = Field(max_length=100)
+
+
+class ArtifactBatchItem(BaseModel):
+    id: str
+    # batch-get: "ok", "missing" or "error"; batch-upsert: "created", "updated" or "error"
+    status: str
+    artifact: Optional[Artifact] = None
+    error: Optional[str] = None
+
+
+class ArtifactBatchResult(BaseModel):
+    items: List[ArtifactBatchItem]
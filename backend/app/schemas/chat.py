@@ -32,6 +32,7 @@ class ChatMessageCreate(ChatMessageBase):
 class ChatMessage(ChatMessageBase):
     id: int
     session_id: str
+    is_truncated: bool = False
     created_at: datetime
     artifacts: List[Artifact] = []
 
@@ -70,6 +71,11 @@ class ExecutionRequest(BaseModel):
     context_artifacts: Optional[Dict[str, Artifact]] = None
     referenced_artifact_ids: Optional[List[str]] = []
     stream: bool = False
+    coalesce: bool = True  # Batch text deltas into fewer SSE frames
+    # Forward upstream text deltas unchanged (not coalesced); uncached turns only
+    passthrough: bool = False
+    bypass_cache: bool = False  # Skip the result cache lookup (result is re-cached)
+    background: bool = False  # Run as a job; the endpoint answers 202 with a job id
 
 
 class ExecutionResult(BaseModel):
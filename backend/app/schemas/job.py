@@ -0,0 +1,40 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional
+from datetime import datetime
+from app.schemas.base import BaseResponse
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    session_id: Optional[str] = None
+    progress: Optional[float] = None
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobAccepted(BaseResponse):
+    job_id: str
+    status: str = "queued"
@@ -14,21 +14,77 @@
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, exists, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
-from typing import Optional, Union
-import random
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from datetime import UTC, datetime, timedelta
+from collections import Counter
+import asyncio
+import logging
 import uuid
-from app.models.artifact import Artifact, MutationRecord
-from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.models.artifact import Artifact, MutationRecord, PayloadBlob
+from app.schemas.artifact import (
+    Artifact as ArtifactSchema,
+    ArtifactBatchItem,
+    ArtifactCreate,
+    ArtifactUpdate,
+)
 
 
 from app.core.config import get_settings
+from app.core.artifact.blobs import payload_digest
 from app.core.artifact.factory import get_artifact_store
+from app.core.artifact.versions import VersionNotLoaded
+from app.core.ghost_store import GhostIteration, get_ghost_store
+from app.db.session import begin_write
+
+logger = logging.getLogger(__name__)
 
 
 class ArtifactService:
+    @staticmethod
+    async def allocate_version(db: AsyncSession, artifact: Artifact) -> Tuple[Optional[str], str]:
+        """
+        (parent version, next version) of a stored artifact. Bumps its head
+        counter in the current transaction, so the version is committed (or
+        rolled back) together with the mutation that uses it.
+        """
+        head = (
+            await db.execute(
+                update(Artifact)
+                .where(Artifact.id == artifact.id)
+                .values(head_version=Artifact.head_version + 1)
+                .returning(Artifact.head_version)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalar_one()
+        set_committed_value(artifact, "head_version", head)
+        return (f"v{head - 1}" if head > 1 else None), f"v{head}"
+
+    @staticmethod
+    async def _store_payload(
+        artifact: Artifact,
+        payload: Any,
+        token: Optional[str] = None,
+        storage_key: Optional[str] = None,
+        save: bool = True,
+    ) -> None:
+        """
+        Save `payload` to the store, unless `storage_key` says it already is
+        or, with `save=False`, the caller saves it and sets the key later.
+        """
+        settings = get_settings()
+        if storage_key is None and save:
+            storage_key = await get_artifact_store().save_revision(artifact.id, payload, token=token)
+        artifact.storage_key = storage_key
+        artifact.storage_backend = settings.ARTIFACT_STORAGE_BACKEND
+        if settings.ARTIFACT_STORAGE_BACKEND == "db":
+            artifact.payload = payload
+        else:
+            artifact.payload = None  # Offloaded
+
     @staticmethod
     async def get_artifact(db: AsyncSession, artifact_id: str, token: Optional[str] = None) -> Optional[Artifact]:
         stmt = (
@@ -53,32 +109,19 @@ class ArtifactService:
         return artifact
 
     @staticmethod
-    async def _update_artifact_logic(
+    async def _stage_update(
         db: AsyncSession,
         existing: Artifact,
         artifact_in: Union[ArtifactCreate, ArtifactUpdate],
-        token: Optional[str] = None
-    ) -> Artifact:
-        new_version_id = "v1"
-        parent_id = None
-
-        # Resolve versioning
-        mut_stmt = (
-            select(MutationRecord)
-            .where(MutationRecord.artifact_id == existing.id)
-            .order_by(MutationRecord.timestamp.desc())
-        )
-        mut_result = await db.execute(mut_stmt)
-        latest_mut = mut_result.scalars().first()
-
-        if latest_mut:
-            parent_id = latest_mut.version_id
-            try:
-                v_num = int(parent_id.replace("v", "")) + 1
-                new_version_id = f"v{v_num}"
-            except (ValueError, AttributeError):
-                new_version_id = f"v{random.randint(2, 999)}"
-
+        token: Optional[str] = None,
+        storage_key: Optional[str] = None,
+        save: bool = True,
+    ) -> Any:
+        """
+        Apply `artifact_in` to `existing` and add its new version (if the
+        payload changed) to the session, without committing. Returns the
+        artifact's payload.
+        """
         # Prepare metadata
         metadata = existing.artifact_metadata or {}
         if artifact_in.metadata:
@@ -92,17 +135,10 @@ class ArtifactService:
             payload = artifact_in.payload
 
         # Only update storage if payload changed
-        settings = get_settings()
-        storage_key = existing.storage_key
         if artifact_in.payload is not None:
-            store = get_artifact_store()
-            storage_key = await store.save(existing.id, payload, token=token)
-            existing.storage_backend = settings.ARTIFACT_STORAGE_BACKEND
-            existing.storage_key = storage_key
-            if settings.ARTIFACT_STORAGE_BACKEND == "db":
-                existing.payload = payload
-            else:
-                existing.payload = None  # Offloaded
+            await ArtifactService._store_payload(
+                existing, payload, token=token, storage_key=storage_key, save=save
+            )
 
         # Update handle
         if hasattr(artifact_in, "type") and artifact_in.type:
@@ -115,6 +151,7 @@ class ArtifactService:
 
         # Create mutation
         if artifact_in.payload is not None:
+            parent_id, new_version_id = await ArtifactService.allocate_version(db, existing)
             mutation = MutationRecord(
                 artifact_id=existing.id,
                 version_id=new_version_id,
@@ -131,6 +168,16 @@ class ArtifactService:
             db.add(mutation)
 
         db.add(existing)
+        return payload
+
+    @staticmethod
+    async def _update_artifact_logic(
+        db: AsyncSession,
+        existing: Artifact,
+        artifact_in: Union[ArtifactCreate, ArtifactUpdate],
+        token: Optional[str] = None
+    ) -> Artifact:
+        payload = await ArtifactService._stage_update(db, existing, artifact_in, token=token)
         await db.commit()
         await db.refresh(existing, ["mutations"])
 
@@ -140,6 +187,42 @@ class ArtifactService:
 
         return existing
 
+    @staticmethod
+    def _stage_create(
+        db: AsyncSession, artifact_id: str, artifact_in: ArtifactCreate, storage_key: str
+    ) -> Artifact:
+        """Add a new artifact and its v1 to the session, without committing."""
+        settings = get_settings()
+        metadata = artifact_in.metadata or {}
+        metadata["name"] = artifact_in.name
+
+        artifact_obj = Artifact(
+            id=artifact_id,
+            type=artifact_in.type,
+            artifact_metadata=metadata,
+            session_id=artifact_in.session_id or "default_session",
+            head_version=1,
+            storage_backend=settings.ARTIFACT_STORAGE_BACKEND,
+            storage_key=storage_key,
+            payload=artifact_in.payload
+            if settings.ARTIFACT_STORAGE_BACKEND == "db"
+            else None,
+        )
+        db.add(artifact_obj)
+
+        mutation = MutationRecord(
+            artifact_id=artifact_id,
+            version_id="v1",
+            parent_id=None,
+            origin={"type": "manual_edit", "sessionId": artifact_in.session_id},
+            change_summary="Initial upload/creation",
+            payload=artifact_in.payload,
+            status="committed",
+        )
+        artifact_obj.mutations.append(mutation)
+        db.add(mutation)
+        return artifact_obj
+
     @staticmethod
     async def create_or_update_artifact(
         db: AsyncSession, artifact_in: ArtifactCreate, token: Optional[str] = None
@@ -154,41 +237,12 @@ class ArtifactService:
         # Generate ID if missing
         new_id = artifact_in.id or str(uuid.uuid4())
 
-        # Prepare metadata
-        metadata = artifact_in.metadata or {}
-        metadata["name"] = artifact_in.name
-
         # Handle external storage
         store = get_artifact_store()
-        storage_key = await store.save(new_id, artifact_in.payload, token=token)
-        settings = get_settings()
+        storage_key = await store.save_revision(new_id, artifact_in.payload, token=token)
 
         try:
-            artifact_obj = Artifact(
-                id=new_id,
-                type=artifact_in.type,
-                artifact_metadata=metadata,
-                session_id=artifact_in.session_id or "default_session",
-                storage_backend=settings.ARTIFACT_STORAGE_BACKEND,
-                storage_key=storage_key,
-                payload=artifact_in.payload
-                if settings.ARTIFACT_STORAGE_BACKEND == "db"
-                else None,
-            )
-            db.add(artifact_obj)
-
-            mutation = MutationRecord(
-                artifact_id=new_id,
-                version_id="v1",
-                parent_id=None,
-                origin={"type": "manual_edit", "sessionId": artifact_in.session_id},
-                change_summary="Initial upload/creation",
-                payload=artifact_in.payload,
-                status="committed",
-            )
-            artifact_obj.mutations.append(mutation)
-            db.add(mutation)
-
+            artifact_obj = ArtifactService._stage_create(db, new_id, artifact_in, storage_key)
             await db.commit()
             await db.refresh(artifact_obj, ["mutations"])
 
@@ -215,24 +269,391 @@ class ArtifactService:
         return await ArtifactService._update_artifact_logic(db, existing, artifact_in, token=token)
 
     @staticmethod
-    async def create_adhoc_mutation(
+    async def _bounded_gather(calls: Sequence[Callable[[], Awaitable[Any]]]) -> List[Any]:
+        """Run `calls` concurrently, ARTIFACT_BATCH_CONCURRENCY at a time; errors are returned."""
+        limit = asyncio.Semaphore(max(1, get_settings().ARTIFACT_BATCH_CONCURRENCY))
+
+        async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+            async with limit:
+                return await call()
+
+        return await asyncio.gather(*(run(c) for c in calls), return_exceptions=True)
+
+    @staticmethod
+    def _batch_item(
+        artifact_id: str, status: str, artifact: Artifact, payload: Any = None
+    ) -> ArtifactBatchItem:
+        schema = ArtifactSchema.model_validate(artifact)
+        if schema.payload is None:
+            schema.payload = payload  # Offloaded; without writing it back to the row
+        return ArtifactBatchItem(id=artifact_id, status=status, artifact=schema)
+
+    @staticmethod
+    async def batch_get(
+        db: AsyncSession, artifact_ids: Sequence[str], token: Optional[str] = None
+    ) -> List[ArtifactBatchItem]:
+        """
+        Many artifacts in one query, with offloaded payloads loaded from the
+        store concurrently. One item per distinct id, in request order.
+        """
+        artifact_ids = list(dict.fromkeys(artifact_ids))
+        result = await db.execute(select(Artifact).where(Artifact.id.in_(artifact_ids)))
+        found = {a.id: a for a in result.scalars()}
+
+        offloaded = [
+            a for a in found.values() if a.storage_backend != "db" and a.storage_key
+        ]
+        store = get_artifact_store()
+        loaded = await ArtifactService._bounded_gather(
+            [
+                lambda a=a: store.load(a.id, a.storage_key, token=token)
+                for a in offloaded
+            ]
+        )
+        payloads = dict(zip((a.id for a in offloaded), loaded))
+
+        items = []
+        for artifact_id in artifact_ids:
+            artifact = found.get(artifact_id)
+            payload = payloads.get(artifact_id)
+            if artifact is None:
+                items.append(ArtifactBatchItem(id=artifact_id, status="missing"))
+            elif isinstance(payload, Exception):
+                logger.warning(f"Could not load payload of artifact {artifact_id}: {payload}")
+                items.append(
+                    ArtifactBatchItem(
+                        id=artifact_id, status="error", error="Payload could not be loaded"
+                    )
+                )
+            else:
+                items.append(ArtifactService._batch_item(artifact_id, "ok", artifact, payload))
+        return items
+
+    @staticmethod
+    async def _stage_batch(
         db: AsyncSession,
+        entries: Sequence[Tuple[int, str, ArtifactCreate]],
+        storage_keys: Dict[str, str],
+        items: Dict[int, ArtifactBatchItem],
+        token: Optional[str] = None,
+    ) -> List[Tuple[int, str, str, Artifact, Any]]:
+        """
+        Stage each (index, id, artifact) entry under its own savepoint,
+        recording failures in `items`. Payloads are staged with their key
+        from `storage_keys`; the others are left for the caller to save.
+        Returns (index, id, status, artifact, payload) per staged entry.
+        """
+        await begin_write(db)
+        result = await db.execute(
+            select(Artifact).where(Artifact.id.in_([i for _, i, _ in entries]))
+        )
+        existing = {a.id: a for a in result.scalars()}
+        staged = []
+        for index, artifact_id, artifact_in in entries:
+            storage_key = storage_keys.get(artifact_id)
+            try:
+                async with db.begin_nested():
+                    if artifact_id in existing:
+                        artifact = existing[artifact_id]
+                        payload = await ArtifactService._stage_update(
+                            db, artifact, artifact_in, token=token,
+                            storage_key=storage_key, save=False,
+                        )
+                        status = "updated"
+                    else:
+                        artifact = ArtifactService._stage_create(
+                            db, artifact_id, artifact_in, storage_key
+                        )
+                        payload = artifact_in.payload
+                        status = "created"
+            except IntegrityError:
+                # e.g. created by a concurrent request since it was looked up
+                items[index] = ArtifactBatchItem(
+                    id=artifact_id, status="error", error="Conflicting write"
+                )
+                continue
+            staged.append((index, artifact_id, status, artifact, payload))
+        return staged
+
+    @staticmethod
+    async def batch_upsert(
+        db: AsyncSession, artifacts_in: Sequence[ArtifactCreate], token: Optional[str] = None
+    ) -> List[ArtifactBatchItem]:
+        """
+        Create or update many artifacts, with their new versions, in one
+        transaction. Each item is staged under its own savepoint, so a
+        failing item is reported without rolling back the others; only then
+        are the staged payloads saved to the store, concurrently. If some
+        saves fail, the transaction is staged again without those items.
+        """
+        entries = [(a.id or str(uuid.uuid4()), a) for a in artifacts_in]
+        counts = Counter(artifact_id for artifact_id, _ in entries)
+        items = {}
+        pending = []
+        for index, (artifact_id, artifact_in) in enumerate(entries):
+            if counts[artifact_id] > 1:
+                items[index] = ArtifactBatchItem(
+                    id=artifact_id, status="error", error="Duplicate id in batch"
+                )
+            else:
+                pending.append((index, artifact_id, artifact_in))
+
+        staged = await ArtifactService._stage_batch(db, pending, {}, items, token=token)
+
+        # Updates without a payload keep their stored one
+        inputs = {index: artifact_in for index, _, artifact_in in pending}
+        to_save = [
+            (artifact_id, artifact, inputs[index])
+            for index, artifact_id, status, artifact, _ in staged
+            if inputs[index].payload is not None or status == "created"
+        ]
+        store = get_artifact_store()
+        saved = await ArtifactService._bounded_gather(
+            [
+                lambda i=artifact_id, a=artifact_in: store.save_revision(i, a.payload, token=token)
+                for artifact_id, _, artifact_in in to_save
+            ]
+        )
+        failed = set()
+        storage_keys = {}
+        for (artifact_id, artifact, _), storage_key in zip(to_save, saved):
+            if isinstance(storage_key, Exception):
+                logger.warning(f"Could not store payload of artifact {artifact_id}: {storage_key}")
+                failed.add(artifact_id)
+            else:
+                storage_keys[artifact_id] = storage_key
+                artifact.storage_key = storage_key
+
+        if failed:
+            # Drop the staged rows of those items, then stage the rest again
+            # with the keys their payloads were saved under
+            await db.rollback()
+            for index, artifact_id, _ in pending:
+                if artifact_id in failed:
+                    items[index] = ArtifactBatchItem(
+                        id=artifact_id, status="error", error="Payload could not be stored"
+                    )
+            staged = await ArtifactService._stage_batch(
+                db, [p for p in pending if p[0] not in items], storage_keys, items, token=token
+            )
+
+        await db.commit()
+        for index, artifact_id, status, artifact, payload in staged:
+            items[index] = ArtifactService._batch_item(artifact_id, status, artifact, payload)
+        return [items[index] for index in range(len(entries))]
+
+    @staticmethod
+    def head_version(artifact: Artifact) -> Optional[str]:
+        """The artifact's latest committed version id."""
+        return f"v{artifact.head_version}" if artifact.head_version else None
+
+    @staticmethod
+    async def load_version_payload(
+        db: AsyncSession, mutation: MutationRecord, token: Optional[str] = None
+    ) -> Any:
+        """
+        Payload of `mutation`, loading its blob or deferred columns and, for
+        a delta, any base versions its chain needs. Offloaded versions are
+        read from the artifact store, under the per-revision key they were
+        saved with; raises VersionNotLoaded if the store no longer holds that
+        version (one offloaded before revision keys, since overwritten).
+        """
+        if mutation.encoding == "external":
+            payload = await get_artifact_store().load(
+                mutation.artifact_id, mutation.storage_key, token=token
+            )
+            if payload is None or payload_digest(payload)[0] != mutation.checksum:
+                raise VersionNotLoaded(mutation.artifact_id, mutation.version_id)
+            return payload
+        return await db.run_sync(lambda _: mutation.payload)
+
+    @staticmethod
+    async def list_versions(
+        db: AsyncSession, artifact_id: str, offset: int = 0, limit: int = 50
+    ) -> Optional[Tuple[List[MutationRecord], int]]:
+        """
+        A page of the artifact's version headers, oldest first, and the total
+        count; None if the artifact does not exist.
+        """
+        if not await db.scalar(select(exists().where(Artifact.id == artifact_id))):
+            return None
+        total = await db.scalar(
+            select(func.count()).select_from(MutationRecord).where(
+                MutationRecord.artifact_id == artifact_id
+            )
+        )
+        result = await db.execute(
+            select(MutationRecord)
+            .where(MutationRecord.artifact_id == artifact_id)
+            .order_by(MutationRecord.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.scalars()), total
+
+    @staticmethod
+    async def get_version(
+        db: AsyncSession, artifact_id: str, version_id: str
+    ) -> Optional[MutationRecord]:
+        """The artifact's latest record of `version_id`, without its payload loaded."""
+        result = await db.execute(
+            select(MutationRecord)
+            .where(
+                MutationRecord.artifact_id == artifact_id,
+                MutationRecord.version_id == version_id,
+            )
+            .order_by(MutationRecord.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def create_adhoc_mutation(
         artifact_id: str,
-        payload: any,
+        payload: Any,
         origin: dict,
-        version_id: str,
         parent_id: Optional[str] = None,
-    ) -> MutationRecord:
+        owner: Optional[int] = None,
+        change_summary: str = "AI Optimization (Ghost Preview)",
+    ) -> GhostIteration:
+        """
+        Record a ghost iteration. Ghosts live in the ephemeral ghost store
+        and only reach the database when accepted (or recycled on discard).
+        """
+        return get_ghost_store().add(
+            owner, artifact_id, parent_id, payload, origin, change_summary
+        )
+
+    @staticmethod
+    def _recycle_ghosts(
+        db: AsyncSession, artifact: Artifact, ghosts: List[GhostIteration]
+    ) -> int:
+        """Stage discarded ghosts for the recycle bin, if one is configured."""
+        if get_settings().GHOST_RECYCLE_BIN_SECONDS <= 0:
+            return 0
+        for ghost in ghosts:
+            mutation = MutationRecord(
+                artifact_id=artifact.id,
+                version_id=f"ghost-{ghost.id[:12]}",
+                parent_id=ghost.parent_id,
+                timestamp=ghost.created_at,
+                origin=ghost.origin,
+                change_summary=ghost.change_summary,
+                payload=ghost.payload,
+                status="discarded",
+            )
+            artifact.mutations.append(mutation)
+            db.add(mutation)
+        return len(ghosts)
+
+    @staticmethod
+    async def _purge_recycle_bin(
+        db: AsyncSession, artifact_id: Optional[str] = None
+    ) -> int:
+        """
+        Delete recycled ghosts older than the window, of one artifact or of
+        all of them, and the blobs only they used. Returns how many.
+        """
+        window = get_settings().GHOST_RECYCLE_BIN_SECONDS
+        cutoff = datetime.now(UTC) - timedelta(seconds=window)
+        conditions = [
+            MutationRecord.status == "discarded",
+            MutationRecord.timestamp < cutoff,
+        ]
+        if artifact_id is not None:
+            conditions.append(MutationRecord.artifact_id == artifact_id)
+        purged = await db.execute(
+            delete(MutationRecord).where(*conditions)
+            .returning(MutationRecord.blob_checksum)
+            # Callers refresh the artifact's mutations after committing
+            .execution_options(synchronize_session=False)
+        )
+        checksums = purged.scalars().all()
+        orphans = {c for c in checksums if c is not None}
+        if orphans:
+            # Blobs that no remaining version refers to. A version flushed
+            # concurrently re-inserts its blob (see _store_payloads); one
+            # that already references it fails this delete, and the blob is
+            # left for the next sweep.
+            try:
+                async with db.begin_nested():
+                    await db.execute(
+                        delete(PayloadBlob).where(
+                            PayloadBlob.checksum.in_(orphans),
+                            ~exists().where(
+                                MutationRecord.blob_checksum == PayloadBlob.checksum
+                            ),
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+            except IntegrityError:
+                logger.info("Recycle bin: blobs still referenced, kept for the next sweep")
+        return len(checksums)
+
+    @staticmethod
+    async def sweep_recycle_bin(db: AsyncSession) -> int:
+        """
+        Purge expired recycled ghosts of every artifact, including those
+        nobody accepts or discards ghosts of again. Returns how many.
+        """
+        purged = await ArtifactService._purge_recycle_bin(db)
+        await db.commit()
+        return purged
+
+    @staticmethod
+    async def accept_ghost(
+        db: AsyncSession,
+        artifact: Artifact,
+        ghost_id: str,
+        owner: Optional[int] = None,
+        token: Optional[str] = None,
+    ) -> Optional[Artifact]:
+        """
+        Commit a ghost as the artifact's next version; the session's other
+        ghosts are discarded. Everything is written in one commit. Returns
+        None if the ghost is unknown (or expired).
+        """
+        store = get_ghost_store()
+        ghosts = store.list(owner, artifact.id)
+        ghost = next((g for g in ghosts if g.id == ghost_id), None)
+        if ghost is None:
+            return None
+
+        parent_id, version_id = await ArtifactService.allocate_version(db, artifact)
+        await ArtifactService._store_payload(artifact, ghost.payload, token=token)
         mutation = MutationRecord(
-            artifact_id=artifact_id,
+            artifact_id=artifact.id,
             version_id=version_id,
             parent_id=parent_id,
-            origin=origin,
-            change_summary="AI Optimization (Ghost Preview)",
-            payload=payload,
-            status="ghost",
+            origin=ghost.origin,
+            change_summary=ghost.change_summary,
+            payload=ghost.payload,
+            status="committed",
         )
+        artifact.mutations.append(mutation)
         db.add(mutation)
+        ArtifactService._recycle_ghosts(
+            db, artifact, [g for g in ghosts if g is not ghost]
+        )
+        await ArtifactService._purge_recycle_bin(db, artifact.id)
+
         await db.commit()
-        await db.refresh(mutation)
-        return mutation
+        store.clear(owner, artifact.id)
+        await db.refresh(artifact, ["mutations"])
+        if artifact.payload is None:
+            artifact.payload = ghost.payload
+        return artifact
+
+    @staticmethod
+    async def discard_ghosts(
+        db: AsyncSession, artifact: Artifact, owner: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Drop the session's ghosts; returns (discarded, recycled)."""
+        store = get_ghost_store()
+        ghosts = store.list(owner, artifact.id)
+        recycled = ArtifactService._recycle_ghosts(db, artifact, ghosts)
+        if recycled:
+            await ArtifactService._purge_recycle_bin(db, artifact.id)
+            await db.commit()
+        store.clear(owner, artifact.id)
+        return len(ghosts), recycled
@@ -6,6 +6,7 @@ from app.schemas.user import UserBase, User as UserSchema
 from app.services.auth.protocol import AuthServiceProtocol, AuthResult
 from app.services.user_service import UserService
 from app.core.config import get_settings
+from app.core.resilience import get_upstream
 from datetime import datetime, timezone, timedelta
 import jwt
 
@@ -16,6 +17,7 @@ class HttpAuthService(AuthServiceProtocol):
         self.settings = get_settings()
         self.url = self.settings.AUTH_SERVICE_URL
         self.api_key = self.settings.AUTH_API_KEY
+        self.upstream = get_upstream("auth", self.settings.AUTH_HTTP_TIMEOUT)
 
     async def authenticate(
         self, db: AsyncSession, username: str, password: Optional[str] = None
@@ -29,12 +31,11 @@ class HttpAuthService(AuthServiceProtocol):
         payload = {"username": username, "password": password}
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.url,
-                    data=payload,
-                    headers=headers,
-                    timeout=10.0
+            async with httpx.AsyncClient(timeout=self.upstream.timeout) as client:
+                # A login may open a session upstream: not retried once sent
+                response = await self.upstream.call(
+                    lambda: client.post(self.url, data=payload, headers=headers),
+                    idempotent=False,
                 )
 
                 if response.status_code == 200:
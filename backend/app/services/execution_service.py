@@ -13,99 +13,259 @@
 # interaction patterns), may not be used, redistributed, or adapted
 # without explicit, visible credit to Kyrylo Yatsenko as the original author.
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from typing import Dict, Any, Tuple, List, Optional
+from typing import (
+    Dict,
+    Any,
+    Tuple,
+    List,
+    Optional,
+    Set,
+    Callable,
+    Awaitable,
+    AsyncIterator,
+    Union,
+)
+import asyncio
+import hashlib
+import logging
 import random
 import json
+import time
 import uuid
+import anyio
 from app.models.artifact import Artifact, MutationRecord
-from app.schemas.chat import ExecutionRequest
-from app.services.session_service import SessionService
-from app.schemas.artifact import Artifact as ArtifactSchema
+from app.models.chat import ChatMessage
+from app.schemas.chat import ChatMessage as ChatMessageSchema, ExecutionRequest, ExecutionResponse
+from app.services.turn_writer import TurnWriter
+from app.services.llm_context import LLMContextService
+from app.services.result_cache import ResultCacheService
+from app.services.artifact_service import ArtifactService
 from app.core.llm_protocol import (
     LLMRequest,
     LLMMessage,
+    LLMEvent,
     TextDeltaEvent,
     ArtifactStartEvent,
     ArtifactChunkEvent,
     ArtifactEndEvent,
 )
 from app.services.llm_providers import get_llm_provider
+from app.core.artifact.assembler import ArtifactPayloadAssembler
+from app.core.artifact.factory import get_artifact_store
+from app.core.config import get_settings
+from app.core.streaming import EventPump, ClientDisconnected, TextTee
+from app.core.stream_metrics import StreamTiming
+from app.core.jobs import Job, get_job_manager
+from app.core.sandbox import SandboxError, get_sandbox_pool
+
+logger = logging.getLogger(__name__)
+
+
+ProgressCallback = Callable[[str], None]
 
 
 class ExecutionService:
     @staticmethod
-    async def execute(db: AsyncSession, req: ExecutionRequest, token: Optional[str] = None) -> Dict:
+    async def execute(
+        db: AsyncSession,
+        req: ExecutionRequest,
+        token: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict:
+        """Run `req`; `progress` is told what a chat turn is generating."""
         if req.type == "chat":
-            return await ExecutionService._execute_chat(db, req, token)
+            return await ExecutionService._execute_chat(db, req, token, progress)
         elif req.type == "command":
-            return await ExecutionService._execute_command(db, req)
+            executor = "sandbox" if req.command_name.lower() == "run" else "builtin"
+            timing = StreamTiming(executor, "command")
+            result = await ExecutionService._execute_command(db, req, token)
+            if result.get("success"):
+                outcome = result["result"]
+                outcome["metadata"]["timing"] = timing.finish(
+                    artifacts=bool(outcome.get("new_artifacts"))
+                )
+            return result
         return {"success": False, "message": "Unsupported execution type"}
 
+    @staticmethod
+    def submit_job(
+        session_factory: async_sessionmaker,
+        req: ExecutionRequest,
+        user_id: Optional[int] = None,
+        token: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue `req` on the background job manager. The job opens its own DB
+        session, reports progress as the turn streams (at most every
+        JOB_PROGRESS_INTERVAL_SECONDS) and stores the serialized
+        ExecutionResponse as its result. Raises JobQueueFull when the queue
+        is at capacity.
+        """
+        interval = get_settings().JOB_PROGRESS_INTERVAL_SECONDS
+
+        async def run(job: Job) -> Dict:
+            reported = None
+
+            def progress(message: str) -> None:
+                nonlocal reported
+                now = time.monotonic()
+                if reported is None or now - reported >= interval:
+                    reported = now
+                    job.report_progress(message=message)
+
+            async with session_factory() as db:
+                result = await ExecutionService.execute(
+                    db, req, token=token, progress=progress
+                )
+            if not result.get("success"):
+                raise RuntimeError(result.get("message", "Execution failed"))
+            return ExecutionResponse.model_validate(
+                result, from_attributes=True
+            ).model_dump(mode="json")
+
+        return get_job_manager().submit(
+            req.command_name or req.type, run, user_id=user_id, session_id=req.session_id
+        )
+
     @staticmethod
     async def _prepare_chat_context(
-        db: AsyncSession, req: ExecutionRequest
-    ) -> Tuple[Any, List[ArtifactSchema]]:
-        # Resolve or create session
-        db_session = await SessionService.get_session(db, req.session_id)
-        if not db_session:
-            db_session = await SessionService.create_session(
-                db, req.session_id, f"Chat {req.session_id[:8]}"
-            )
+        db: AsyncSession, req: ExecutionRequest, token: Optional[str] = None
+    ) -> Tuple[TurnWriter, LLMRequest, Dict[str, Any], Optional[str]]:
+        # Resolve or stage session
+        writer = TurnWriter(db, req.session_id)
+        await writer.ensure_session(f"Chat {req.session_id[:8]}")
+
+        # Resolve existing artifacts (head payload only, no history)
+        artifacts, heads = await LLMContextService.load_referenced_artifacts(
+            db, req.referenced_artifact_ids or []
+        )
 
-        # Resolve existing artifacts
-        artifacts = []
-        if req.referenced_artifact_ids:
-            art_stmt = (
-                select(Artifact)
-                .where(Artifact.id.in_(req.referenced_artifact_ids))
-                .options(selectinload(Artifact.mutations))
+        # Lean projection for the LLM Protocol; prefetched artifacts are
+        # served from the context artifact cache
+        llm_artifacts, artifact_outcomes = (
+            await LLMContextService.build_context_artifacts(artifacts, heads, token)
+        )
+
+        # Session history under the token budget, then the new user message
+        messages, fragments, context_stats = (
+            await LLMContextService.assemble_messages(
+                db,
+                req.session_id,
+                LLMMessage(
+                    role="user",
+                    content=req.action or "",
+                    artifact_ids=[a.id for a in llm_artifacts],
+                ),
             )
-            art_result = await db.execute(art_stmt)
-            artifacts = art_result.scalars().all()
-
-        # Save user message
-        await SessionService.save_message(
-            db,
-            req.session_id,
-            "user",
-            req.action or "",
-            artifacts=artifacts,
         )
 
-        # Convert artifacts to Pydantic models for the LLM Protocol
-        pydantic_artifacts = [ArtifactSchema.model_validate(a) for a in artifacts]
+        context_stats["prefetched_artifacts"] = sum(
+            1 for outcome in artifact_outcomes.values() if outcome == "cached"
+        )
+
+        # Construct LLMRequest
+        llm_req = LLMRequest(
+            session_id=req.session_id,
+            messages=messages,
+            context_artifacts=llm_artifacts,
+            api_key=token,
+        )
+        llm_req.set_message_fragments(fragments)
+
+        # The reply also depends on the history it was generated against
+        cache_key = None
+        if ResultCacheService.enabled_for("chat"):
+            history = hashlib.sha256("".join(fragments[:-1]).encode("utf-8"))
+            cache_key = ResultCacheService.build_key(
+                "chat", "chat", req.action, artifacts, heads, history.hexdigest()
+            )
+
+        # Stage user message; it is committed together with the reply
+        writer.add_message("user", req.action or "", artifacts=artifacts)
 
-        return db_session, pydantic_artifacts
+        return writer, llm_req, context_stats, cache_key
+
+    @staticmethod
+    async def _open_chat_source(
+        req: ExecutionRequest,
+        llm_req: LLMRequest,
+        cache_key: Optional[str],
+        recorded: List[Dict[str, Any]],
+        passthrough: bool = False,
+    ) -> Tuple[AsyncIterator[Union[str, LLMEvent]], Optional[str], StreamTiming]:
+        """
+        Event source for a chat turn: a replay of a cached result, or the
+        provider stream (recorded into `recorded` when caching is enabled).
+        Also returns the cache status reported in the turn metadata and the
+        timing that the source marks as events arrive.
+
+        With `passthrough`, an uncached provider stream may yield raw
+        text_delta lines (str) to forward as-is; cached turns record and
+        replay decoded events only.
+        """
+        provider = get_llm_provider()
+        if cache_key is None:
+            timing = StreamTiming(provider.name, req.type)
+            if passthrough:
+                return timing.track(provider.generate_frames(llm_req)), None, timing
+            return timing.track(provider.generate_stream(llm_req)), None, timing
+        if not req.bypass_cache:
+            cached = await ResultCacheService.get(cache_key)
+            if cached is not None:
+                timing = StreamTiming("cache", req.type)
+                source = ResultCacheService.replay_events(cached["events"])
+                return timing.track(source), "hit", timing
+        timing = StreamTiming(provider.name, req.type)
+        source = ResultCacheService.record_events(
+            timing.track(provider.generate_stream(llm_req)), recorded
+        )
+        return source, "bypass" if req.bypass_cache else "miss", timing
 
     @staticmethod
     async def _process_generated_artifacts(
-        db: AsyncSession,
-        session_id: str,
-        new_artifacts_map: Dict,
+        writer: TurnWriter,
+        new_artifacts_map: Dict[str, ArtifactPayloadAssembler],
         req: ExecutionRequest,
-    ) -> List[Artifact]:
+        token: Optional[str] = None,
+    ) -> Tuple[List[Artifact], Dict[str, Any]]:
+        settings = get_settings()
         new_artifact_models = []
-        for art_id, data in new_artifacts_map.items():
-            payload_str = "".join(data["payload_chunks"])
+        payloads = {}
+        for art_id, assembler in new_artifacts_map.items():
             try:
-                payload = json.loads(payload_str)
-            except json.JSONDecodeError:
-                payload = {"raw_content": payload_str}
+                payload = assembler.result()
+            finally:
+                assembler.close()
+            payloads[art_id] = payload
 
-            metadata = data["metadata"] or {}
+            metadata = assembler.metadata or {}
             if "name" not in metadata:
-                metadata["name"] = f"Generated {data['type'].capitalize()}"
+                metadata["name"] = f"Generated {assembler.artifact_type.capitalize()}"
 
             new_art = Artifact(
                 id=art_id,
-                type=data["type"],
+                type=assembler.artifact_type,
                 payload=payload,
                 artifact_metadata=metadata,
-                session_id=session_id,
+                session_id=writer.session_id,
+                head_version=1,
+            )
+
+            # Oversized payloads go straight to the configured store
+            offloaded = (
+                settings.ARTIFACT_STORAGE_BACKEND != "db"
+                and assembler.size > settings.ARTIFACT_OFFLOAD_THRESHOLD_BYTES
             )
+            if offloaded:
+                # Under its own key: v1 must survive the artifact's later saves
+                store = get_artifact_store()
+                new_art.storage_key = await store.save_revision(art_id, payload, token=token)
+                new_art.storage_backend = settings.ARTIFACT_STORAGE_BACKEND
+                new_art.payload = None
+
             new_artifact_models.append(new_art)
 
             # Create mutation record
@@ -120,82 +280,181 @@ class ExecutionService:
                     "triggeringCommand": "chat",
                 },
                 change_summary="Generated by LLM",
-                payload=new_art.payload,
+                payload=payload,
                 status="committed",
             )
+            if offloaded:
+                mutation.offload(new_art.storage_key)  # Not copied into payload_blobs
             new_art.mutations.append(mutation)
-            db.add(new_art)
-            db.add(mutation)
+            writer.add_artifact(new_art)
 
-        return new_artifact_models
+        return new_artifact_models, payloads
 
     @staticmethod
-    async def execute_stream(db: AsyncSession, req: ExecutionRequest, token: Optional[str] = None):
-        db_session, pydantic_artifacts = await ExecutionService._prepare_chat_context(
-            db, req
+    def _message_dto(msg: ChatMessage, payloads: Dict[str, Any]) -> ChatMessageSchema:
+        """
+        `msg` as a response DTO, with the payloads of offloaded artifacts
+        filled in. The mapped objects are left alone, so a later flush never
+        writes those payloads back into their rows.
+        """
+        dto = ChatMessageSchema.model_validate(msg)
+        for artifact in dto.artifacts:
+            if artifact.payload is None and artifact.id in payloads:
+                artifact.payload = payloads[artifact.id]
+        return dto
+
+    @staticmethod
+    def _start_artifact(event: ArtifactStartEvent) -> ArtifactPayloadAssembler:
+        return ArtifactPayloadAssembler(
+            event.artifact_id,
+            event.artifact_type,
+            metadata=event.artifact_metadata,
+            spool_bytes=get_settings().ARTIFACT_STREAM_SPOOL_BYTES,
         )
 
-        # Construct LLMRequest
-        llm_messages = [
-            LLMMessage(
-                role="user", content=req.action or "", artifacts=pydantic_artifacts
-            )
-        ]
+    @staticmethod
+    def _discard_artifacts(new_artifacts_map: Dict[str, ArtifactPayloadAssembler]):
+        for assembler in new_artifacts_map.values():
+            assembler.close()
 
-        llm_req = LLMRequest(
-            session_id=req.session_id,
-            messages=llm_messages,
-            context_artifacts=pydantic_artifacts,
-            api_key=token,
+    @staticmethod
+    async def _persist_disconnected_turn(
+        writer: TurnWriter,
+        req: ExecutionRequest,
+        full_text: str,
+        new_artifacts_map: Dict[str, ArtifactPayloadAssembler],
+        completed_ids: Set[str],
+        token: Optional[str] = None,
+    ) -> None:
+        policy = get_settings().STREAM_DISCONNECT_POLICY
+        if policy != "save_partial":
+            ExecutionService._discard_artifacts(new_artifacts_map)
+            await writer.rollback()
+            logger.info(f"Client disconnected; dropped turn for session {req.session_id}")
+            return
+
+        # Keep fully streamed artifacts, drop the ones cut off mid-payload
+        finished = {}
+        for art_id, assembler in new_artifacts_map.items():
+            if art_id in completed_ids:
+                finished[art_id] = assembler
+            else:
+                assembler.close()
+
+        new_artifact_models, _ = await ExecutionService._process_generated_artifacts(
+            writer, finished, req, token=token
+        )
+        writer.add_message(
+            "assistant", full_text, artifacts=new_artifact_models, is_truncated=True
+        )
+        await writer.commit()
+        logger.info(
+            f"Client disconnected; saved truncated reply for session {req.session_id}"
         )
 
-        provider = get_llm_provider()
+    @staticmethod
+    async def execute_stream(
+        db: AsyncSession,
+        req: ExecutionRequest,
+        token: Optional[str] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ):
+        writer, llm_req, context_stats, cache_key = (
+            await ExecutionService._prepare_chat_context(db, req, token=token)
+        )
 
-        full_text = ""
-        new_artifacts_map = {}  # id -> {type, metadata, chunks}
+        settings = get_settings()
+        recorded = []
+        source, cache_status, timing = await ExecutionService._open_chat_source(
+            req, llm_req, cache_key, recorded, passthrough=req.passthrough
+        )
 
-        # Consume the stream
-        async for event in provider.generate_stream(llm_req):
-            payload = None
-            if isinstance(event, TextDeltaEvent):
-                full_text += event.content
-                payload = {"type": "text_delta", "content": event.content}
-            elif isinstance(event, ArtifactStartEvent):
-                new_artifacts_map[event.artifact_id] = {
-                    "type": event.artifact_type,
-                    "metadata": event.artifact_metadata or {},
-                    "payload_chunks": [],
-                }
-                payload = {
-                    "type": "artifact_start",
-                    "artifact_id": event.artifact_id,
-                    "artifact_type": event.artifact_type,
-                    "metadata": event.artifact_metadata,
-                }
-            elif isinstance(event, ArtifactChunkEvent):
-                if event.artifact_id in new_artifacts_map:
-                    new_artifacts_map[event.artifact_id]["payload_chunks"].append(
-                        event.chunk
-                    )
-                payload = {
-                    "type": "artifact_chunk",
-                    "artifact_id": event.artifact_id,
-                    "chunk": event.chunk,
-                }
-            elif isinstance(event, ArtifactEndEvent):
-                payload = {"type": "artifact_end", "artifact_id": event.artifact_id}
+        text = TextTee()
+        new_artifacts_map = {}  # id -> ArtifactPayloadAssembler
+        completed_ids = set()
+        coalesce_window = (
+            settings.STREAM_COALESCE_WINDOW_MS / 1000 if req.coalesce else 0.0
+        )
 
-            if payload:
-                yield f"data: {json.dumps(payload)}\n\n"
+        # The upstream runs in its own task so it can be cancelled on disconnect
+        pump = EventPump(source)
+        try:
+            async for event in pump.events(
+                is_disconnected,
+                settings.STREAM_DISCONNECT_CHECK_INTERVAL,
+                coalesce_window=coalesce_window,
+                coalesce_max_bytes=settings.STREAM_COALESCE_MAX_BYTES,
+            ):
+                payload = None
+                if isinstance(event, str):
+                    # Raw text_delta line from a pass-through source
+                    text.add_raw(event)
+                    yield f"data: {event}\n\n"
+                    continue
+                if isinstance(event, TextDeltaEvent):
+                    text.add(event.content)
+                    payload = {"type": "text_delta", "content": event.content}
+                elif isinstance(event, ArtifactStartEvent):
+                    new_artifacts_map[event.artifact_id] = (
+                        ExecutionService._start_artifact(event)
+                    )
+                    payload = {
+                        "type": "artifact_start",
+                        "artifact_id": event.artifact_id,
+                        "artifact_type": event.artifact_type,
+                        "metadata": event.artifact_metadata,
+                    }
+                elif isinstance(event, ArtifactChunkEvent):
+                    if event.artifact_id in new_artifacts_map:
+                        new_artifacts_map[event.artifact_id].feed(event.chunk)
+                    payload = {
+                        "type": "artifact_chunk",
+                        "artifact_id": event.artifact_id,
+                        "chunk": event.chunk,
+                    }
+                elif isinstance(event, ArtifactEndEvent):
+                    completed_ids.add(event.artifact_id)
+                    payload = {"type": "artifact_end", "artifact_id": event.artifact_id}
+
+                if payload:
+                    yield f"data: {json.dumps(payload)}\n\n"
+        except ClientDisconnected as e:
+            text.add(e.unflushed_text)
+            await pump.aclose()
+            timing.finish(artifacts=bool(new_artifacts_map))
+            await ExecutionService._persist_disconnected_turn(
+                writer, req, text.value(), new_artifacts_map, completed_ids, token=token
+            )
+            return
+        except (asyncio.CancelledError, GeneratorExit):
+            # The server noticed the disconnect first and is tearing us down
+            with anyio.CancelScope(shield=True):
+                await pump.aclose()
+                timing.finish(artifacts=bool(new_artifacts_map))
+                await ExecutionService._persist_disconnected_turn(
+                    writer, req, text.value(), new_artifacts_map, completed_ids, token=token
+                )
+            raise
+        except BaseException:
+            ExecutionService._discard_artifacts(new_artifacts_map)
+            raise
+        finally:
+            await pump.aclose()
+        timing_stats = timing.finish(artifacts=bool(new_artifacts_map))
 
         # Process generated artifacts and save to DB
-        new_artifact_models = await ExecutionService._process_generated_artifacts(
-            db, db_session.id, new_artifacts_map, req
+        new_artifact_models, payloads = (
+            await ExecutionService._process_generated_artifacts(
+                writer, new_artifacts_map, req, token=token
+            )
         )
 
-        assistant_msg = await SessionService.save_message(
-            db, req.session_id, "assistant", full_text, artifacts=new_artifact_models
+        assistant_msg = writer.add_message(
+            "assistant", text.value(), artifacts=new_artifact_models
         )
+        await writer.commit()
+        if cache_status in ("miss", "bypass"):
+            await ResultCacheService.put(cache_key, {"events": recorded})
 
         # Serialize the final message properly
         final_msg_dict = {
@@ -210,7 +469,7 @@ class ExecutionService:
                 {
                     "id": a.id,
                     "type": a.type,
-                    "payload": a.payload,
+                    "payload": payloads.get(a.id),
                     "metadata": a.artifact_metadata,
                     "session_id": a.session_id,
                     "created_at": a.created_at.isoformat() if a.created_at else None,
@@ -220,153 +479,355 @@ class ExecutionService:
             ],
         }
 
-        yield f"data: {json.dumps({'type': 'final_message', 'message': final_msg_dict})}\n\n"
+        final_frame = {
+            "type": "final_message",
+            "message": final_msg_dict,
+            "metadata": {
+                "context": context_stats,
+                "cache": cache_status,
+                "timing": timing_stats,
+            },
+        }
+        yield f"data: {json.dumps(final_frame)}\n\n"
 
     @staticmethod
-    async def _execute_chat(db: AsyncSession, req: ExecutionRequest, token: Optional[str] = None) -> Dict:
-        db_session, pydantic_artifacts = await ExecutionService._prepare_chat_context(
-            db, req
-        )
-
-        # Construct LLMRequest
-        llm_messages = [
-            LLMMessage(
-                role="user", content=req.action or "", artifacts=pydantic_artifacts
-            )
-        ]
+    async def execute_stream_detached(
+        session_factory: async_sessionmaker,
+        req: ExecutionRequest,
+        token: Optional[str] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ):
+        """`execute_stream` on its own DB session, for producers that outlive the request."""
+        async with session_factory() as db:
+            async for frame in ExecutionService.execute_stream(
+                db, req, token=token, is_disconnected=is_disconnected
+            ):
+                yield frame
 
-        llm_req = LLMRequest(
-            session_id=req.session_id,
-            messages=llm_messages,
-            context_artifacts=pydantic_artifacts,
-            api_key=token,
+    @staticmethod
+    async def _execute_chat(
+        db: AsyncSession,
+        req: ExecutionRequest,
+        token: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict:
+        writer, llm_req, context_stats, cache_key = (
+            await ExecutionService._prepare_chat_context(db, req, token=token)
         )
 
-        provider = get_llm_provider()
+        recorded = []
+        source, cache_status, timing = await ExecutionService._open_chat_source(
+            req, llm_req, cache_key, recorded
+        )
 
         full_text = ""
-        new_artifacts_map = {}  # id -> {type, metadata, chunks}
+        new_artifacts_map = {}  # id -> ArtifactPayloadAssembler
 
         # Consume the stream
-        async for event in provider.generate_stream(llm_req):
-            if isinstance(event, TextDeltaEvent):
-                full_text += event.content
-            elif isinstance(event, ArtifactStartEvent):
-                new_artifacts_map[event.artifact_id] = {
-                    "type": event.artifact_type,
-                    "metadata": event.artifact_metadata or {},
-                    "payload_chunks": [],
-                }
-            elif isinstance(event, ArtifactChunkEvent):
-                if event.artifact_id in new_artifacts_map:
-                    new_artifacts_map[event.artifact_id]["payload_chunks"].append(
-                        event.chunk
+        try:
+            async for event in source:
+                if isinstance(event, TextDeltaEvent):
+                    full_text += event.content
+                    if progress is not None:
+                        progress(f"Generated {len(full_text)} characters of the reply")
+                elif isinstance(event, ArtifactStartEvent):
+                    new_artifacts_map[event.artifact_id] = (
+                        ExecutionService._start_artifact(event)
                     )
-            elif isinstance(event, ArtifactEndEvent):
-                pass
+                elif isinstance(event, ArtifactChunkEvent):
+                    assembler = new_artifacts_map.get(event.artifact_id)
+                    if assembler is not None:
+                        assembler.feed(event.chunk)
+                        if progress is not None:
+                            progress(
+                                f"Generated {assembler.size} bytes of artifact "
+                                f"{event.artifact_id}"
+                            )
+                elif isinstance(event, ArtifactEndEvent):
+                    pass
+        except BaseException:
+            ExecutionService._discard_artifacts(new_artifacts_map)
+            raise
+        timing_stats = timing.finish(artifacts=bool(new_artifacts_map))
 
         # Process generated artifacts
-        new_artifact_models = await ExecutionService._process_generated_artifacts(
-            db, db_session.id, new_artifacts_map, req
+        new_artifact_models, payloads = (
+            await ExecutionService._process_generated_artifacts(
+                writer, new_artifacts_map, req, token=token
+            )
         )
 
-        assistant_msg = await SessionService.save_message(
-            db, req.session_id, "assistant", full_text, artifacts=new_artifact_models
+        assistant_msg = writer.add_message(
+            "assistant", full_text, artifacts=new_artifact_models
         )
+        await writer.commit()
+        if cache_status in ("miss", "bypass"):
+            await ResultCacheService.put(cache_key, {"events": recorded})
 
         return {
             "success": True,
             "result": {
-                "output_message": assistant_msg,
+                "output_message": ExecutionService._message_dto(assistant_msg, payloads),
                 "status": "success",
-                "metadata": {"session_id": req.session_id},
+                "metadata": {
+                    "session_id": req.session_id,
+                    "context": context_stats,
+                    "cache": cache_status,
+                    "timing": timing_stats,
+                },
             },
         }
 
     @staticmethod
-    async def _execute_command(db: AsyncSession, req: ExecutionRequest) -> Dict:
-        # Ensure session exists
-        db_session = await SessionService.get_session(db, req.session_id)
-        if not db_session:
-            db_session = await SessionService.create_session(
-                db, req.session_id, f"Cmd {req.session_id[:8]}"
-            )
-
-        cmd = req.command_name.lower()
-        new_artifact_models = []
+    def _run_command(cmd: str, req: ExecutionRequest) -> Tuple[str, str, List[Dict]]:
+        """
+        Generate a command result as (status, message text, artifact specs).
+        Specs are plain dicts (type, payload, metadata) so results can be
+        cached and replayed.
+        """
         status = "success"
         output_msg_text = f"Command {cmd} executed successfully."
+        specs = []
 
         # Mock generation logic
         if cmd == "plot":
-            new_art = Artifact(
-                id=str(uuid.uuid4()),
-                type="visual",
-                payload={
-                    "format": "svg",
-                    "url": f"data:image/svg+xml,<svg>Mock plot</svg>",
-                    "alt": "Plot",
-                },
-                artifact_metadata={"name": "Plot Result"},
-                session_id=db_session.id,
-            )
-            new_artifact_models.append(new_art)
-        elif cmd == "run":
-            new_art = Artifact(
-                id=str(uuid.uuid4()),
-                type="code",
-                payload={
-                    "language": "python",
-                    "source": f"Executed code: {req.action[:50] if req.action else ''}...",
-                },
-                artifact_metadata={"name": "Code Execution"},
-                session_id=db_session.id,
+            specs.append(
+                {
+                    "type": "visual",
+                    "payload": {
+                        "format": "svg",
+                        "url": f"data:image/svg+xml,<svg>Mock plot</svg>",
+                        "alt": "Plot",
+                    },
+                    "metadata": {"name": "Plot Result"},
+                }
             )
-            new_artifact_models.append(new_art)
         elif cmd == "optimize":
-            new_art = Artifact(
-                id=str(uuid.uuid4()),
-                type="code",
-                payload={
-                    "language": "python",
-                    "source": "# Optimized Code\nprint('Hello Optimized World')",
-                },
-                artifact_metadata={"name": "Optimized Code"},
-                session_id=db_session.id,
+            specs.append(
+                {
+                    "type": "code",
+                    "payload": {
+                        "language": "python",
+                        "source": "# Optimized Code\nprint('Hello Optimized World')",
+                    },
+                    "metadata": {"name": "Optimized Code"},
+                }
             )
-            new_artifact_models.append(new_art)
         # ... other commands (diff, summarize) can be added similarly
         else:
             status = "error"
             output_msg_text = f"Unknown command: {cmd}"
 
-        # Persist and create mutations
-        for art in new_artifact_models:
-            db.add(art)
+        return status, output_msg_text, specs
+
+    @staticmethod
+    def _initial_mutation(art: Artifact, req: ExecutionRequest, status: str = "committed") -> MutationRecord:
+        return MutationRecord(
+            artifact_id=art.id,
+            version_id="v1",
+            parent_id=None,
+            origin={
+                "type": "adhoc_command",
+                "sessionId": req.session_id,
+                "prompt": req.action,
+                "triggeringCommand": f"/{req.command_name}",
+            },
+            change_summary="Initial creation",
+            payload=art.payload,
+            status=status,
+        )
+
+    @staticmethod
+    async def _execute_run(
+        db: AsyncSession,
+        req: ExecutionRequest,
+        writer: TurnWriter,
+        token: Optional[str] = None,
+    ) -> Dict:
+        """
+        `/run P1 "python logic"`: run the code in the sandbox with P1's head
+        payload bound to `data`. A `result` the code assigns becomes a new
+        version of P1; payloads passed to `emit()` become new artifacts.
+        """
+        args = req.args or []
+        target_id = (req.referenced_artifact_ids or args[:1] or [None])[0]
+        code = req.action or " ".join(args[1:])
+
+        target = None
+        payload = None
+        head = None
+        if target_id:
+            stmt = (
+                select(Artifact)
+                .where(Artifact.id == target_id)
+                .options(selectinload(Artifact.mutations))
+            )
+            target = (await db.execute(stmt)).scalar_one_or_none()
+        if target is not None:
+            payload = target.payload
+            if payload is None and target.storage_key:
+                payload = await get_artifact_store().load(
+                    target.id, target.storage_key, token=token
+                )
+            head = ArtifactService.head_version(target)
+
+        try:
+            outcome = await get_sandbox_pool().run(
+                code,
+                payload,
+                payload_key=f"{target.id}:{head}" if target is not None else None,
+            )
+        except SandboxError as e:
+            outcome = {"stdout": "", "result": None, "artifacts": [], "error": str(e)}
+
+        changed = []
+        result = outcome["result"]
+        if target is not None and result is not None:
+            parent_id, new_version = await ArtifactService.allocate_version(db, target)
             mutation = MutationRecord(
-                artifact_id=art.id,
-                version_id="v1",
-                parent_id=None,
+                artifact_id=target.id,
+                version_id=new_version,
+                parent_id=parent_id,
                 origin={
                     "type": "adhoc_command",
                     "sessionId": req.session_id,
-                    "prompt": req.action,
-                    "triggeringCommand": f"/{req.command_name}",
+                    "prompt": code,
+                    "triggeringCommand": "/run",
                 },
-                change_summary="Initial creation",
-                payload=art.payload,
+                change_summary="Result of /run",
+                payload=result,
+                status="committed",
+            )
+            settings = get_settings()
+            if settings.ARTIFACT_STORAGE_BACKEND == "db":
+                target.payload = result
+            else:
+                target.storage_key = await get_artifact_store().save_revision(
+                    target.id, result, token=token
+                )
+                target.storage_backend = settings.ARTIFACT_STORAGE_BACKEND
+                target.payload = None
+            target.mutations.append(mutation)
+            writer.add_artifact(target)
+            changed.append(target)
+
+        for emitted in outcome["artifacts"]:
+            art = Artifact(
+                id=str(uuid.uuid4()),
+                type=emitted["type"],
+                payload=emitted["payload"],
+                artifact_metadata={"name": emitted["name"] or "Run Output"},
+                session_id=req.session_id,
+                head_version=1,
+            )
+            art.mutations.append(ExecutionService._initial_mutation(art, req))
+            writer.add_artifact(art)
+            changed.append(art)
+
+        status = "error" if outcome["error"] else "success"
+        text = outcome["stdout"] or "Run completed with no output."
+        if outcome["error"]:
+            text = f"{outcome['stdout']}Error: {outcome['error']}"
+
+        msg = writer.add_message(
+            "assistant" if status == "success" else "system", text, artifacts=changed
+        )
+        await writer.commit()
+
+        payloads = {target.id: result} if target is not None and result is not None else {}
+        output = ExecutionService._message_dto(msg, payloads)
+        return {
+            "success": True,
+            "result": {
+                "output_message": output,
+                "new_artifacts": output.artifacts,
+                "status": status,
+                "metadata": {"session_id": req.session_id},
+            },
+        }
+
+    @staticmethod
+    async def _execute_command(
+        db: AsyncSession, req: ExecutionRequest, token: Optional[str] = None
+    ) -> Dict:
+        # Ensure session exists
+        writer = TurnWriter(db, req.session_id)
+        await writer.ensure_session(f"Cmd {req.session_id[:8]}")
+
+        cmd = req.command_name.lower()
+        if cmd == "run":
+            if not get_settings().SANDBOX_ENABLED:
+                msg = writer.add_message("system", "/run is disabled on this server.")
+                await writer.commit()
+                return {
+                    "success": True,
+                    "result": {
+                        "output_message": msg,
+                        "new_artifacts": [],
+                        "status": "error",
+                        "metadata": {"session_id": req.session_id},
+                    },
+                }
+            return await ExecutionService._execute_run(db, req, writer, token=token)
+
+        cache_key = None
+        cache_status = None
+        if ResultCacheService.enabled_for("command", cmd):
+            artifacts, heads = await LLMContextService.load_referenced_artifacts(
+                db, req.referenced_artifact_ids or []
+            )
+            cache_key = ResultCacheService.build_key(
+                "command", cmd, req.action, artifacts, heads
+            )
+
+        cached = None
+        if cache_key is not None and not req.bypass_cache:
+            cached = await ResultCacheService.get(cache_key)
+        if cached is not None:
+            cache_status = "hit"
+            status, output_msg_text, specs = (
+                cached["status"],
+                cached["text"],
+                cached["artifacts"],
+            )
+        else:
+            status, output_msg_text, specs = ExecutionService._run_command(cmd, req)
+            if cache_key is not None:
+                cache_status = "bypass" if req.bypass_cache else "miss"
+
+        new_artifact_models = [
+            Artifact(
+                id=str(uuid.uuid4()),
+                type=spec["type"],
+                payload=spec["payload"],
+                artifact_metadata=spec["metadata"],
+                session_id=req.session_id,
+                head_version=1,
+            )
+            for spec in specs
+        ]
+
+        # Persist and create mutations
+        for art in new_artifact_models:
+            mutation = ExecutionService._initial_mutation(
+                art,
+                req,
                 status="committed" if cmd != "optimize" else "ghost",  # Logic for ghost
             )
             art.mutations.append(mutation)  # Link in memory
-            db.add(mutation)
+            writer.add_artifact(art)
 
-        msg = await SessionService.save_message(
-            db,
-            req.session_id,
+        msg = writer.add_message(
             "assistant" if status == "success" else "system",
             output_msg_text,
             artifacts=new_artifact_models,
         )
+        await writer.commit()
+        if cache_status in ("miss", "bypass") and status == "success":
+            await ResultCacheService.put(
+                cache_key,
+                {"status": status, "text": output_msg_text, "artifacts": specs},
+            )
 
         return {
             "success": True,
@@ -374,6 +835,6 @@ class ExecutionService:
                 "output_message": msg,
                 "new_artifacts": msg.artifacts,
                 "status": status,
-                "metadata": {"session_id": req.session_id},
+                "metadata": {"session_id": req.session_id, "cache": cache_status},
             },
         }
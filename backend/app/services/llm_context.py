@@ -0,0 +1,410 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.orm import raiseload
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+from app.models.artifact import Artifact
+from app.models.chat import ChatMessage, message_artifacts
+from app.core.llm_protocol import LLMArtifact, LLMMessage
+from app.core.artifact.factory import get_artifact_store
+from app.core.artifact.prefetch import get_context_artifact_cache
+from app.core.config import get_settings
+from app.services.artifact_service import ArtifactService
+
+logger = logging.getLogger(__name__)
+
+
+class _SessionHistory:
+    """
+    Already-serialized history of one session, oldest first. Messages older
+    than the token budget can reach are trimmed (see `trim`).
+    """
+
+    __slots__ = ("last_message_id", "messages", "fragments", "trimmed", "trimmed_size")
+
+    def __init__(self):
+        self.last_message_id = 0
+        self.messages: List[LLMMessage] = []
+        self.fragments: List[str] = []
+        self.trimmed = 0  # Messages dropped from the front
+        self.trimmed_size = 0  # Fragment length of the newest of those
+
+    def window(self, used: int, budget: Optional[int]) -> Tuple[int, int]:
+        """
+        Index of the oldest message that still fits `budget` after `used`
+        characters, newest first, and the characters used then.
+        """
+        start = len(self.fragments)
+        while start > 0:
+            size = len(self.fragments[start - 1])
+            if budget is not None and used + size > budget:
+                break
+            used += size
+            start -= 1
+        return start, used
+
+    def trim(self, budget: int) -> None:
+        """
+        Drop messages that do not fit `budget` even with no current message:
+        later turns only add newer ones, so they cannot reach them either.
+        """
+        start, _ = self.window(0, budget)
+        if start:
+            self.trimmed += start
+            self.trimmed_size = len(self.fragments[start - 1])
+            del self.messages[:start]
+            del self.fragments[:start]
+
+    def reaches_trimmed(self, start: int, used: int, budget: Optional[int]) -> bool:
+        """Whether a window starting at `start` would have used trimmed messages."""
+        return (
+            start == 0
+            and self.trimmed > 0
+            and (budget is None or used + self.trimmed_size <= budget)
+        )
+
+
+class _HistoryCache:
+    """
+    Small LRU of per-session histories, bounded by session count; each
+    history only keeps the messages its token budget can use.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, _SessionHistory]" = OrderedDict()
+
+    def get(self, session_id: str) -> _SessionHistory:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._entries[session_id] = _SessionHistory()
+        self._entries.move_to_end(session_id)
+        limit = max(1, get_settings().LLM_CONTEXT_CACHE_SESSIONS)
+        while len(self._entries) > limit:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, session_id: Optional[str] = None) -> None:
+        if session_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(session_id, None)
+
+
+_history_cache = _HistoryCache()
+
+
+class LLMContextService:
+    @staticmethod
+    async def load_referenced_artifacts(
+        db: AsyncSession, artifact_ids: Sequence[str]
+    ) -> Tuple[List[Artifact], Dict[str, str]]:
+        """
+        Load referenced artifacts without their mutation history, plus the
+        head version id of each, read from its head counter.
+        """
+        if not artifact_ids:
+            return [], {}
+
+        art_stmt = (
+            select(Artifact)
+            .where(Artifact.id.in_(artifact_ids))
+            .options(raiseload(Artifact.mutations))
+        )
+        art_result = await db.execute(art_stmt)
+        artifacts = art_result.scalars().all()
+
+        heads = {}
+        for artifact in artifacts:
+            head = ArtifactService.head_version(artifact)
+            if head is not None:
+                heads[artifact.id] = head
+
+        return artifacts, heads
+
+    @staticmethod
+    def project_artifact(
+        artifact: Artifact,
+        version_id: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        payload: Any = None,
+    ) -> LLMArtifact:
+        """Project `artifact`; `payload` overrides an offloaded (None) payload."""
+        if max_bytes is None:
+            max_bytes = get_settings().LLM_ARTIFACT_PAYLOAD_MAX_BYTES
+
+        if payload is None:
+            payload = artifact.payload
+        preview = None
+        truncated = False
+        if max_bytes and payload is not None:
+            encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            if len(encoded) > max_bytes:
+                truncated = True
+                # A character cut in half at the limit is dropped
+                preview = encoded[:max_bytes].decode("utf-8", errors="ignore")
+                payload = None
+
+        return LLMArtifact.model_construct(
+            id=artifact.id,
+            type=artifact.type,
+            name=artifact.name,
+            version_id=version_id,
+            metadata=artifact.artifact_metadata,
+            payload=payload,
+            payload_truncated=truncated,
+            payload_preview=preview,
+        )
+
+    @staticmethod
+    def project_artifacts(
+        artifacts: Sequence[Artifact],
+        heads: Dict[str, str],
+        payloads: Optional[Dict[str, Any]] = None,
+    ) -> List[LLMArtifact]:
+        max_bytes = get_settings().LLM_ARTIFACT_PAYLOAD_MAX_BYTES
+        payloads = payloads or {}
+        return [
+            LLMContextService.project_artifact(
+                a, heads.get(a.id), max_bytes, payloads.get(a.id)
+            )
+            for a in artifacts
+        ]
+
+    @staticmethod
+    async def load_external_payloads(
+        artifacts: Sequence[Artifact], token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Load the payloads of offloaded artifacts from the artifact store,
+        concurrently. The ORM objects are left untouched so the payloads are
+        never flushed back into the artifacts table. Failed loads are logged
+        and left out.
+        """
+        offloaded = [
+            a for a in artifacts
+            if a.payload is None and a.storage_backend != "db" and a.storage_key
+        ]
+        if not offloaded:
+            return {}
+
+        store = get_artifact_store()
+        limit = asyncio.Semaphore(max(1, get_settings().ARTIFACT_PREFETCH_CONCURRENCY))
+
+        async def load(artifact: Artifact) -> Any:
+            async with limit:
+                return await store.load(artifact.id, artifact.storage_key, token=token)
+
+        results = await asyncio.gather(
+            *(load(a) for a in offloaded), return_exceptions=True
+        )
+        payloads = {}
+        for artifact, result in zip(offloaded, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not load payload of artifact {artifact.id}: {result}")
+            else:
+                payloads[artifact.id] = result
+        return payloads
+
+    @staticmethod
+    async def build_context_artifacts(
+        artifacts: Sequence[Artifact],
+        heads: Dict[str, str],
+        token: Optional[str] = None,
+    ) -> Tuple[List[LLMArtifact], Dict[str, str]]:
+        """
+        Projections of `artifacts` for an LLM request, served from the context
+        artifact cache (warmed by the prefetch endpoint) where possible; misses
+        are projected, with offloaded payloads loaded from the store, and
+        cached. Also returns each artifact's outcome: "cached" or "loaded".
+        """
+        cache = get_context_artifact_cache()
+        projected: Dict[str, LLMArtifact] = {}
+        outcomes: Dict[str, str] = {}
+        missing = []
+        for artifact in artifacts:
+            version_id = heads.get(artifact.id)
+            hit = cache.get(artifact.id, version_id) if version_id else None
+            # Metadata edits do not create a version
+            if hit is not None and hit.metadata == artifact.artifact_metadata:
+                projected[artifact.id] = hit
+                outcomes[artifact.id] = "cached"
+            else:
+                missing.append(artifact)
+
+        payloads = await LLMContextService.load_external_payloads(missing, token)
+        for artifact, item in zip(
+            missing, LLMContextService.project_artifacts(missing, heads, payloads)
+        ):
+            projected[artifact.id] = item
+            outcomes[artifact.id] = "loaded"
+            offloaded = artifact.payload is None and artifact.storage_key
+            if item.version_id and (not offloaded or artifact.id in payloads):
+                cache.set(artifact.id, item.version_id, item)
+
+        return [projected[a.id] for a in artifacts], outcomes
+
+    @staticmethod
+    async def prefetch_artifacts(
+        db: AsyncSession, artifact_ids: Sequence[str], token: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Warm the context artifact cache for artifacts a turn is about to
+        reference. Returns "cached", "loaded" or "missing" per requested id.
+        """
+        artifacts, heads = await LLMContextService.load_referenced_artifacts(
+            db, artifact_ids
+        )
+        _, outcomes = await LLMContextService.build_context_artifacts(
+            artifacts, heads, token
+        )
+        return {i: outcomes.get(i, "missing") for i in artifact_ids}
+
+    @staticmethod
+    async def _load_history_tail(
+        db: AsyncSession, session_id: str, after_id: int
+    ) -> List[Tuple[int, LLMMessage]]:
+        msg_stmt = (
+            select(ChatMessage.id, ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == session_id, ChatMessage.id > after_id)
+            .order_by(ChatMessage.id)
+        )
+        rows = (await db.execute(msg_stmt)).all()
+        if not rows:
+            return []
+
+        link_stmt = select(
+            message_artifacts.c.message_id, message_artifacts.c.artifact_id
+        ).where(message_artifacts.c.message_id.in_([r.id for r in rows]))
+        links: Dict[int, List[str]] = {}
+        for message_id, artifact_id in await db.execute(link_stmt):
+            links.setdefault(message_id, []).append(artifact_id)
+
+        return [
+            (
+                r.id,
+                LLMMessage.model_construct(
+                    role=r.role,
+                    content=r.content,
+                    artifact_ids=links.get(r.id, []),
+                ),
+            )
+            for r in rows
+        ]
+
+    @staticmethod
+    async def _history_intact(
+        db: AsyncSession, session_id: str, entry: _SessionHistory
+    ) -> bool:
+        """
+        Whether the database still holds exactly the messages `entry` has
+        seen. Ids can commit out of order, so a message below
+        `last_message_id` may appear after the entry moved past it; a
+        deleted one leaves the count short.
+        """
+        last_message_id = entry.last_message_id
+        if not last_message_id:
+            return True
+        seen = entry.trimmed + len(entry.messages)
+        stored = (
+            await db.execute(
+                select(func.count()).where(
+                    ChatMessage.session_id == session_id,
+                    ChatMessage.id <= last_message_id,
+                )
+            )
+        ).scalar_one()
+        return stored == seen
+
+    @staticmethod
+    async def _extend_history(
+        db: AsyncSession, session_id: str, entry: _SessionHistory
+    ) -> List[Tuple[int, LLMMessage]]:
+        """Append messages persisted since `entry` was last extended."""
+        tail = await LLMContextService._load_history_tail(
+            db, session_id, entry.last_message_id
+        )
+        # Another turn may have extended the entry while we were querying
+        for message_id, message in tail:
+            if message_id <= entry.last_message_id:
+                continue
+            entry.messages.append(message)
+            entry.fragments.append(message.model_dump_json())
+            entry.last_message_id = message_id
+        return tail
+
+    @staticmethod
+    async def assemble_messages(
+        db: AsyncSession,
+        session_id: str,
+        current: LLMMessage,
+        max_tokens: Optional[int] = None,
+    ) -> Tuple[List[LLMMessage], List[str], Dict[str, Any]]:
+        """
+        Build the message list for a turn: the most recent contiguous slice of
+        persisted history that fits the token budget, followed by `current`.
+
+        Serialized history is cached per session, so each turn only loads and
+        serializes messages persisted since the previous one; it is rebuilt
+        when the stored message count no longer matches it, and dropped
+        through `invalidate_history` when a session is changed. Returns the
+        messages, their JSON fragments (for LLMRequest.set_message_fragments)
+        and size stats for the turn metadata.
+        """
+        settings = get_settings()
+        if max_tokens is None:
+            max_tokens = settings.LLM_CONTEXT_MAX_TOKENS
+        chars_per_token = max(1, settings.LLM_CONTEXT_CHARS_PER_TOKEN)
+
+        current_fragment = current.model_dump_json()
+        budget = max_tokens * chars_per_token if max_tokens else None
+
+        entry = _history_cache.get(session_id)
+        if not await LLMContextService._history_intact(db, session_id, entry):
+            _history_cache.invalidate(session_id)
+            entry = _history_cache.get(session_id)
+        tail = await LLMContextService._extend_history(db, session_id, entry)
+        start, used = entry.window(len(current_fragment), budget)
+        if entry.reaches_trimmed(start, used, budget):
+            # A larger budget than earlier turns had: reload the whole history
+            _history_cache.invalidate(session_id)
+            entry = _history_cache.get(session_id)
+            tail = await LLMContextService._extend_history(db, session_id, entry)
+            start, used = entry.window(len(current_fragment), budget)
+        dropped = entry.trimmed + start
+
+        messages = entry.messages[start:] + [current]
+        fragments = entry.fragments[start:] + [current_fragment]
+        if budget is not None:
+            entry.trim(budget)
+        stats = {
+            "messages": len(messages),
+            "history_messages": len(messages) - 1,
+            "dropped_messages": dropped,
+            "serialized_messages": len(tail) + 1,
+            "chars": used,
+            "estimated_tokens": used // chars_per_token,
+        }
+        return messages, fragments, stats
+
+    @staticmethod
+    def invalidate_history(session_id: Optional[str] = None) -> None:
+        """Forget cached history for one session (or all sessions)."""
+        _history_cache.invalidate(session_id)
@@ -3,7 +3,8 @@ import random
 import json
 import httpx
 import uuid
-from typing import AsyncGenerator
+import logging
+from typing import AsyncGenerator, Any, Dict, Optional, Union
 from app.core.llm_protocol import (
     LLMProvider,
     LLMRequest,
@@ -12,9 +13,17 @@ from app.core.llm_protocol import (
     ArtifactStartEvent,
     ArtifactChunkEvent,
     ArtifactEndEvent,
+    decode_event,
+    is_raw_text_delta,
 )
+from app.core.config import get_settings
+from app.core.resilience import get_upstream
+
+logger = logging.getLogger(__name__)
 
 class MockLLMProvider(LLMProvider):
+    name = "mock"
+
     async def generate_stream(self, request: LLMRequest) -> AsyncGenerator[LLMEvent, None]:
         # Mocking context awareness
         if request.context_artifacts:
@@ -59,43 +68,140 @@ class MockLLMProvider(LLMProvider):
 
              yield ArtifactEndEvent(artifact_id=art_id)
 
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": "mock"}
+
 
 class HttpLLMProvider(LLMProvider):
-    def __init__(self):
+    name = "http"
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.url = os.getenv("LLM_SERVICE_URL", "http://localhost:8001/generate")
         self.api_key = os.getenv("LLM_API_KEY", "")
+        # A shared client keeps connections to the LLM service alive across turns
+        self._client = client
+        self._http2 = False
+        self._requests_total = 0
+        self._active_streams = 0
+        self.upstream = get_upstream("llm", get_settings().LLM_HTTP_TIMEOUT)
 
-    async def generate_stream(self, request: LLMRequest) -> AsyncGenerator[LLMEvent, None]:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        settings = get_settings()
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+        self._http2 = settings.LLM_HTTP2
+        if self._http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.error("LLM_HTTP2 is enabled but `h2` is not installed; using HTTP/1.1.")
+                self._http2 = False
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=self._http2,
+            timeout=self.upstream.timeout,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        settings = get_settings()
+        stats = {
+            "provider": "http",
+            "url": self.url,
+            "http2": self._http2,
+            "max_connections": settings.LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "requests_total": self._requests_total,
+            "active_streams": self._active_streams,
+        }
+        # httpx does not expose pool state publicly; read it best-effort
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        return stats
+
+    async def _lines(self, request: LLMRequest) -> AsyncGenerator[str, None]:
         token = self.api_key if self.api_key else request.api_key
-        headers = {"Authorization": f"Bearer {token}"} if token else {}
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                self.url,
-                json=request.model_dump(mode="json"),
-                headers=headers,
-                timeout=60.0
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self._requests_total += 1
+        self._active_streams += 1
+        try:
+            # Generation is not idempotent: only retried if the service
+            # cannot have started it
+            async with self.upstream.stream(
+                lambda: self.client.stream(
+                    "POST",
+                    self.url,
+                    content=request.to_json(),
+                    headers=headers,
+                )
             ) as response:
                 response.raise_for_status()
                 async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        event_type = data.get("type")
-                        if event_type == "text_delta":
-                            yield TextDeltaEvent(**data)
-                        elif event_type == "artifact_start":
-                            yield ArtifactStartEvent(**data)
-                        elif event_type == "artifact_chunk":
-                            yield ArtifactChunkEvent(**data)
-                        elif event_type == "artifact_end":
-                            yield ArtifactEndEvent(**data)
-                    except json.JSONDecodeError:
-                        pass
+                    if line:
+                        yield line
+        finally:
+            self._active_streams -= 1
 
-def get_llm_provider() -> LLMProvider:
+    async def generate_stream(self, request: LLMRequest) -> AsyncGenerator[LLMEvent, None]:
+        async for line in self._lines(request):
+            event = decode_event(line)
+            if event is not None:
+                yield event
+
+    async def generate_frames(
+        self, request: LLMRequest
+    ) -> AsyncGenerator[Union[str, LLMEvent], None]:
+        async for line in self._lines(request):
+            if is_raw_text_delta(line):
+                yield line
+                continue
+            event = decode_event(line)
+            if event is not None:
+                yield event
+
+
+# Application-lifetime provider, created in the main.py lifespan
+_provider: Optional[LLMProvider] = None
+
+
+def create_llm_provider() -> LLMProvider:
     provider_type = os.getenv("LLM_PROVIDER", "mock").lower()
     if provider_type == "http":
         return HttpLLMProvider()
     return MockLLMProvider()
+
+
+def init_llm_provider() -> LLMProvider:
+    global _provider
+    if _provider is None:
+        _provider = create_llm_provider()
+    return _provider
+
+
+async def shutdown_llm_provider() -> None:
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+        _provider = None
+
+
+def get_llm_provider() -> LLMProvider:
+    return init_llm_provider()
@@ -0,0 +1,128 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+import hashlib
+import json
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from app.core.cache.factory import get_result_cache
+from app.core.config import get_settings
+from app.core.llm_protocol import (
+    LLMEvent,
+    TextDeltaEvent,
+    ArtifactStartEvent,
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+)
+from app.models.artifact import Artifact
+
+_EVENT_TYPES = {
+    "text_delta": TextDeltaEvent,
+    "artifact_start": ArtifactStartEvent,
+    "artifact_chunk": ArtifactChunkEvent,
+    "artifact_end": ArtifactEndEvent,
+}
+
+
+class ResultCacheService:
+    @staticmethod
+    def enabled_for(kind: str, name: Optional[str] = None) -> bool:
+        settings = get_settings()
+        if not settings.RESULT_CACHE_ENABLED:
+            return False
+        if kind == "chat":
+            return settings.RESULT_CACHE_CHAT
+        return (name or "").lower() in settings.RESULT_CACHE_COMMANDS
+
+    @staticmethod
+    def normalize_action(text: Optional[str]) -> str:
+        return " ".join((text or "").split())
+
+    @staticmethod
+    def artifact_checksum(artifact: Artifact, version_id: Optional[str]) -> str:
+        if artifact.payload is None and artifact.storage_key:
+            content = f"{artifact.storage_backend}:{artifact.storage_key}"
+        else:
+            content = json.dumps(artifact.payload, sort_keys=True, default=str)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{version_id or 'v0'}:{digest}"
+
+    @staticmethod
+    def build_key(
+        kind: str,
+        name: str,
+        action: Optional[str],
+        artifacts: Sequence[Artifact],
+        heads: Dict[str, str],
+        extra: Optional[str] = None,
+    ) -> str:
+        """
+        Key for a result: the command (or "chat"), the normalized action text,
+        and the checksum of each referenced artifact's head version. `extra`
+        folds in anything else the result depends on (e.g. chat history).
+        """
+        parts = {
+            "kind": kind,
+            "name": name.lower(),
+            "action": ResultCacheService.normalize_action(action),
+            "artifacts": sorted(
+                (a.id, ResultCacheService.artifact_checksum(a, heads.get(a.id)))
+                for a in artifacts
+            ),
+            "extra": extra,
+        }
+        encoded = json.dumps(parts, sort_keys=True).encode("utf-8")
+        return f"{kind}:{hashlib.sha256(encoded).hexdigest()}"
+
+    @staticmethod
+    async def get(key: str) -> Optional[Any]:
+        return await get_result_cache().get(key)
+
+    @staticmethod
+    async def put(key: str, value: Any) -> None:
+        await get_result_cache().set(key, value)
+
+    @staticmethod
+    async def record_events(
+        source: AsyncIterator[LLMEvent], sink: List[Dict[str, Any]]
+    ) -> AsyncIterator[LLMEvent]:
+        """Pass events through while appending them (text merged) to `sink`."""
+        async for event in source:
+            if (
+                isinstance(event, TextDeltaEvent)
+                and sink
+                and sink[-1]["type"] == "text_delta"
+            ):
+                sink[-1]["content"] += event.content
+            else:
+                sink.append(event.model_dump())
+            yield event
+
+    @staticmethod
+    async def replay_events(events: List[Dict[str, Any]]) -> AsyncIterator[LLMEvent]:
+        """
+        Re-emit recorded events. Generated artifacts get fresh ids, since the
+        replayed turn persists its own copies.
+        """
+        ids: Dict[str, str] = {}
+        for data in events:
+            data = dict(data)
+            if "artifact_id" in data:
+                data["artifact_id"] = ids.setdefault(
+                    data["artifact_id"], str(uuid.uuid4())
+                )
+            event_cls = _EVENT_TYPES.get(data.get("type"))
+            if event_cls is not None:
+                yield event_cls(**data)
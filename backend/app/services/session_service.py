@@ -19,6 +19,7 @@ from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from app.models.chat import ChatSession, ChatMessage
 from app.models.artifact import Artifact
+from app.services.llm_context import LLMContextService
 
 
 class SessionService:
@@ -50,6 +51,13 @@ class SessionService:
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_workspace_id(db: AsyncSession, session_id: str) -> Optional[str]:
+        """The session's workspace, without loading its history."""
+        stmt = select(ChatSession.workspace_id).where(ChatSession.id == session_id)
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def create_session(
         db: AsyncSession,
@@ -110,5 +118,6 @@ class SessionService:
             db_obj.is_active = is_active
 
         await db.commit()
+        LLMContextService.invalidate_history(session_id)
         await db.refresh(db_obj)
         return db_obj
@@ -0,0 +1,88 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.models.chat import ChatSession, ChatMessage
+from app.models.artifact import Artifact
+
+
+class TurnWriter:
+    """
+    Unit of work for a single execution turn.
+
+    Everything a turn produces (the session if it is new, the user message,
+    generated artifacts with their mutation records and the reply) is staged
+    in memory and written in one transaction by `commit()`. Objects are only
+    added to the AsyncSession at commit time, so reads made while the turn
+    streams never autoflush and open a write transaction early. The staged
+    ORM objects are returned to the caller as-is, so building the response
+    needs no re-query (sessions use expire_on_commit=False).
+    """
+
+    def __init__(self, db: AsyncSession, session_id: str):
+        self.db = db
+        self.session_id = session_id
+        self.session: Optional[ChatSession] = None
+        self._pending: List = []
+
+    async def ensure_session(
+        self, name: str, workspace_id: str = "default_workspace"
+    ) -> None:
+        # Existence check only; the full message history is not needed here
+        stmt = select(ChatSession.id).where(ChatSession.id == self.session_id)
+        result = await self.db.execute(stmt)
+        if result.scalar_one_or_none() is None:
+            self.session = ChatSession(
+                id=self.session_id, name=name, workspace_id=workspace_id
+            )
+            self._pending.append(self.session)
+
+    def add_message(
+        self,
+        role: str,
+        content: str,
+        artifacts: List[Artifact] = None,
+        is_truncated: bool = False,
+    ) -> ChatMessage:
+        db_obj = ChatMessage(
+            session_id=self.session_id,
+            role=role,
+            content=content,
+            is_truncated=is_truncated,
+        )
+        # Always initialise the collection so it never lazy-loads after commit
+        db_obj.artifacts = list(artifacts or [])
+        self._pending.append(db_obj)
+        return db_obj
+
+    def add_artifact(self, artifact: Artifact) -> None:
+        self._pending.append(artifact)
+        self._pending.extend(artifact.mutations)
+
+    async def commit(self) -> None:
+        self.db.add_all(self._pending)
+        self._pending = []
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def rollback(self) -> None:
+        """Discard everything staged for this turn."""
+        self._pending = []
+        await self.db.rollback()
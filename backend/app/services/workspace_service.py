@@ -173,6 +173,7 @@ class WorkspaceService:
             type="chat",
             artifact_metadata={"name": "Chat"},
             session_id=session_id,
+            head_version=1,
             storage_backend="db",
             payload={"messages": []}
         )
@@ -41,7 +41,7 @@ except ImportError as e:
     class LLMMessage(BaseModel):
         role: str
         content: str
-        artifacts: list = []
+        artifact_ids: list = []
     class LLMRequest(BaseModel):
         session_id: str
         messages: list[LLMMessage]
@@ -15,6 +15,9 @@
 
 import sqlite3
 import os
+import json
+import re
+from app.core.artifact.blobs import canonical_json, payload_digest
 
 
 def migrate():
@@ -62,7 +65,19 @@ def migrate():
             cursor.execute("ALTER TABLE artifacts ADD COLUMN storage_key TEXT")
             print("✓ storage_key column added.")
 
-        # 3. Create archived_panes table
+        # 3. Update chat_messages table
+        print("Ensuring chat_messages table has is_truncated column...")
+        cursor.execute("PRAGMA table_info(chat_messages)")
+        message_cols = [col[1] for col in cursor.fetchall()]
+
+        if "is_truncated" not in message_cols:
+            print("Adding is_truncated column to chat_messages table...")
+            cursor.execute(
+                "ALTER TABLE chat_messages ADD COLUMN is_truncated BOOLEAN DEFAULT 0 NOT NULL"
+            )
+            print("✓ is_truncated column added.")
+
+        # 4. Create archived_panes table
         print("Ensuring archived_panes table exists...")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS archived_panes (
@@ -77,6 +92,122 @@ def migrate():
         """)
         print("✓ archived_panes table verified.")
 
+        # 5. Move version payloads into content-addressed blobs
+        print("Ensuring payload_blobs table exists...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS payload_blobs (
+                checksum TEXT PRIMARY KEY,
+                payload JSON NOT NULL,
+                size INTEGER NOT NULL,
+                created_at DATETIME
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mutation_records_checksum "
+            "ON mutation_records (checksum)"
+        )
+        cursor.execute(
+            "SELECT id, payload FROM mutation_records "
+            "WHERE checksum IS NULL AND payload IS NOT NULL"
+        )
+        rows = cursor.fetchall()
+        for mutation_id, encoded in rows:
+            payload = json.loads(encoded)
+            checksum, size = payload_digest(payload)
+            cursor.execute(
+                "INSERT OR IGNORE INTO payload_blobs (checksum, payload, size, created_at) "
+                "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+                (checksum, canonical_json(payload), size),
+            )
+            cursor.execute(
+                "UPDATE mutation_records SET checksum = ?, payload = 'null' WHERE id = ?",
+                (checksum, mutation_id),
+            )
+        print(f"✓ {len(rows)} mutation payloads moved to payload_blobs.")
+
+        # 6. Version storage encoding (see migrate_version_deltas.py)
+        print("Ensuring mutation_records has version encoding columns...")
+        cursor.execute("PRAGMA table_info(mutation_records)")
+        mutation_cols = [col[1] for col in cursor.fetchall()]
+        for name, ddl in (
+            ("encoding", "TEXT DEFAULT 'full' NOT NULL"),
+            ("delta", "JSON"),
+            ("base_id", "INTEGER"),
+            ("chain_length", "INTEGER DEFAULT 0 NOT NULL"),
+        ):
+            if name not in mutation_cols:
+                cursor.execute(f"ALTER TABLE mutation_records ADD COLUMN {name} {ddl}")
+                print(f"✓ {name} column added.")
+
+        # 7. Version allocation through a per-artifact head counter
+        print("Ensuring artifacts.head_version and unique version ids...")
+        cursor.execute("PRAGMA table_info(artifacts)")
+        if "head_version" not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute(
+                "ALTER TABLE artifacts ADD COLUMN head_version INTEGER DEFAULT 0 NOT NULL"
+            )
+            print("✓ head_version column added.")
+        # Concurrent edits could allocate the same version id; keep the first
+        cursor.execute("""
+            UPDATE mutation_records SET version_id = version_id || '-dup' || id
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM mutation_records GROUP BY artifact_id, version_id
+            )
+        """)
+        if cursor.rowcount:
+            print(f"✓ {cursor.rowcount} duplicate version ids renamed.")
+        cursor.execute("SELECT artifact_id, version_id FROM mutation_records")
+        heads = {}
+        for artifact_id, version_id in cursor.fetchall():
+            match = re.fullmatch(r"v(\d+)", version_id or "")
+            if match:
+                heads[artifact_id] = max(heads.get(artifact_id, 0), int(match.group(1)))
+        cursor.executemany(
+            "UPDATE artifacts SET head_version = MAX(head_version, ?) WHERE id = ?",
+            [(head, artifact_id) for artifact_id, head in heads.items()],
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_mutation_records_version "
+            "ON mutation_records (artifact_id, version_id)"
+        )
+        print(f"✓ Head versions set for {len(heads)} artifacts.")
+
+        # 8. Versions whose payload lives in the artifact store
+        print("Ensuring mutation_records.storage_key exists...")
+        cursor.execute("PRAGMA table_info(mutation_records)")
+        if "storage_key" not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE mutation_records ADD COLUMN storage_key TEXT")
+            print("✓ storage_key column added.")
+
+        # 9. Only keyframes reference a blob; checksum stays on every version.
+        # Tables created before this step keep REFERENCES on checksum in
+        # their DDL, which SQLite does not enforce without PRAGMA foreign_keys.
+        print("Ensuring mutation_records.blob_checksum exists...")
+        cursor.execute("PRAGMA table_info(mutation_records)")
+        if "blob_checksum" not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute(
+                "ALTER TABLE mutation_records ADD COLUMN blob_checksum TEXT "
+                "REFERENCES payload_blobs (checksum)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ix_mutation_records_blob_checksum "
+                "ON mutation_records (blob_checksum)"
+            )
+            cursor.execute("""
+                UPDATE mutation_records SET blob_checksum = checksum
+                WHERE encoding = 'full'
+                  AND checksum IN (SELECT checksum FROM payload_blobs)
+            """)
+            print(f"✓ blob_checksum column added ({cursor.rowcount} keyframes linked).")
+
+        # 10. Session history is read (and counted) per session in id order
+        print("Ensuring ix_chat_messages_session_id_id exists...")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id_id "
+            "ON chat_messages (session_id, id)"
+        )
+        print("✓ chat_messages history index ensured.")
+
         conn.commit()
         print("\nMigration completed successfully.")
     except Exception as e:
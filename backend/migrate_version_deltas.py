@@ -0,0 +1,112 @@
+# PROJECT: EoS
+# AUTHOR: Kyrylo Yatsenko
+# YEAR: 2026
+# * COPYRIGHT NOTICE:
+# © 2026 Kyrylo Yatsenko. All rights reserved.
+#
+# This work represents a proprietary methodology for Human-Machine Interaction (HMI).
+# All source code, logic structures, and User Experience (UX) frameworks
+# contained herein are the sole intellectual property of Kyrylo Yatsenko.
+#
+# ATTRIBUTION REQUIREMENT:
+# Any use of this program, or any portion thereof (including code snippets and
+# interaction patterns), may not be used, redistributed, or adapted
+# without explicit, visible credit to Kyrylo Yatsenko as the original author.
+
+"""
+Convert full-copy version histories to delta chains with keyframes.
+
+Run migrate_db.py first. Each committed version whose parent is stored is
+rewritten as a delta from it, with a full keyframe at least every
+--keyframe-interval versions; blobs that only those versions used are
+deleted. Already converted versions are left as they are, so the tool can be
+re-run. Set VERSION_STORAGE_MODE=delta to keep new versions encoded this way.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from app.core.artifact.blobs import payload_digest
+from app.core.artifact.deltas import apply
+from app.core.artifact.versions import encode_delta
+
+
+def convert(db_path: str, keyframe_interval: int) -> None:
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    converted = 0
+    try:
+        artifact_ids = [
+            row[0] for row in cursor.execute("SELECT DISTINCT artifact_id FROM mutation_records")
+        ]
+        for artifact_id in artifact_ids:
+            rows = cursor.execute(
+                "SELECT m.id, m.version_id, m.parent_id, m.status, m.checksum, "
+                "m.payload, b.payload, m.encoding, m.delta, m.base_id, m.chain_length "
+                "FROM mutation_records m "
+                "LEFT JOIN payload_blobs b ON b.checksum = m.blob_checksum "
+                "WHERE m.artifact_id = ? ORDER BY m.id",
+                (artifact_id,),
+            ).fetchall()
+
+            by_id = {}  # id -> (payload, chain_length)
+            heads = {}  # committed version_id -> id
+            for (
+                mutation_id, version_id, parent_id, status, checksum,
+                inline, blob, encoding, delta, base_id, chain_length,
+            ) in rows:
+                if encoding == "delta":
+                    payload = apply(by_id[base_id][0], json.loads(delta))
+                    by_id[mutation_id] = (payload, chain_length)
+                    heads[version_id] = mutation_id
+                    continue
+
+                payload = json.loads(blob if blob is not None else inline)
+                checksum, size = payload_digest(payload)
+                by_id[mutation_id] = (payload, 0)
+                if status != "committed":
+                    continue
+
+                parent = heads.get(parent_id)
+                heads[version_id] = mutation_id
+                if parent is None or by_id[parent][1] + 1 >= keyframe_interval:
+                    continue
+                base_payload, base_chain = by_id[parent]
+                encoded = encode_delta(base_payload, payload, checksum, size)
+                if encoded is None:
+                    continue
+                cursor.execute(
+                    "UPDATE mutation_records SET encoding = 'delta', delta = ?, "
+                    "base_id = ?, chain_length = ?, checksum = ?, blob_checksum = NULL, "
+                    "payload = 'null' "
+                    "WHERE id = ?",
+                    (json.dumps(encoded), parent, base_chain + 1, checksum, mutation_id),
+                )
+                by_id[mutation_id] = (payload, base_chain + 1)
+                converted += 1
+
+        # Blobs no keyframe refers to any more
+        cursor.execute(
+            "DELETE FROM payload_blobs WHERE checksum NOT IN ("
+            "SELECT blob_checksum FROM mutation_records WHERE blob_checksum IS NOT NULL)"
+        )
+        dropped = cursor.rowcount
+        conn.commit()
+        print(f"✓ {converted} versions delta-encoded, {dropped} blobs dropped.")
+    except Exception as e:
+        print(f"Conversion failed: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="eos.db")
+    parser.add_argument("--keyframe-interval", type=int, default=16)
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"Database {args.db} not found.")
+    else:
+        convert(args.db, args.keyframe_interval)
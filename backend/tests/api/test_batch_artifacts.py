@@ -0,0 +1,161 @@
+import pytest
+from unittest.mock import patch
+from httpx import AsyncClient
+from sqlalchemy.exc import IntegrityError
+from app.core.artifact.store import ArtifactStore
+from app.services.artifact_service import ArtifactService
+
+
+async def get_auth_headers(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": "batch_user", "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class _MemoryStore(ArtifactStore):
+    def __init__(self, failing=()):
+        self.saved = {}
+        self.failing = set(failing)
+
+    async def save(self, artifact_id, content, token=None):
+        if artifact_id.split("@")[0] in self.failing:
+            raise IOError("store unavailable")
+        self.saved[f"mem/{artifact_id}"] = content
+        return f"mem/{artifact_id}"
+
+    async def load(self, artifact_id, storage_key, token=None):
+        if artifact_id in self.failing:
+            raise IOError("store unavailable")
+        return self.saved[storage_key]
+
+
+@pytest.mark.asyncio
+async def test_batch_upsert_then_get(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/artifacts/batch-upsert",
+        json={
+            "artifacts": [
+                {"id": "batch_a", "type": "doc", "name": "A", "payload": {"n": 1},
+                 "session_id": "batch_session"},
+                {"id": "batch_b", "type": "data", "name": "B", "payload": [1, 2],
+                 "session_id": "batch_session"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [(i["id"], i["status"]) for i in response.json()["items"]] == [
+        ("batch_a", "created"), ("batch_b", "created")
+    ]
+
+    response = await client.post(
+        "/api/v1/artifacts/batch-upsert",
+        json={
+            "artifacts": [
+                {"id": "batch_a", "type": "doc", "name": "A", "payload": {"n": 2}},
+                {"id": "batch_c", "type": "doc", "name": "C", "payload": {"n": 1},
+                 "session_id": "batch_session"},
+                {"id": "batch_c", "type": "doc", "name": "C2", "payload": {"n": 2}},
+            ]
+        },
+        headers=headers,
+    )
+    items = response.json()["items"]
+    assert [(i["id"], i["status"]) for i in items] == [
+        ("batch_a", "updated"), ("batch_c", "error"), ("batch_c", "error")
+    ]
+    assert items[0]["artifact"]["payload"] == {"n": 2}
+    assert [m["version_id"] for m in items[0]["artifact"]["mutations"]] == ["v1", "v2"]
+
+    response = await client.post(
+        "/api/v1/artifacts/batch-get",
+        json={"artifact_ids": ["batch_b", "batch_a", "batch_nope", "batch_b"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(i["id"], i["status"]) for i in items] == [
+        ("batch_b", "ok"), ("batch_a", "ok"), ("batch_nope", "missing")
+    ]
+    assert items[0]["artifact"]["payload"] == [1, 2]
+    assert items[1]["artifact"]["payload"] == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_store_failures_per_item(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    store = _MemoryStore(failing={"batch_ext_bad"})
+    with patch("app.services.artifact_service.get_artifact_store", return_value=store), \
+            patch("app.services.artifact_service.get_settings") as settings:
+        settings.return_value.ARTIFACT_STORAGE_BACKEND = "memory"
+        settings.return_value.ARTIFACT_BATCH_CONCURRENCY = 2
+        response = await client.post(
+            "/api/v1/artifacts/batch-upsert",
+            json={
+                "artifacts": [
+                    {"id": f"batch_ext_{n}", "type": "doc", "name": n, "payload": {"n": n},
+                     "session_id": "batch_session"}
+                    for n in ("1", "bad", "2")
+                ]
+            },
+            headers=headers,
+        )
+        assert [i["status"] for i in response.json()["items"]] == ["created", "error", "created"]
+        assert response.json()["items"][0]["artifact"]["payload"] == {"n": "1"}
+
+        store.failing = {"batch_ext_2"}
+        response = await client.post(
+            "/api/v1/artifacts/batch-get",
+            json={"artifact_ids": ["batch_ext_1", "batch_ext_2", "batch_ext_bad"]},
+            headers=headers,
+        )
+    items = response.json()["items"]
+    assert [i["status"] for i in items] == ["ok", "error", "missing"]
+    assert items[0]["artifact"]["payload"] == {"n": "1"}
+
+
+@pytest.mark.asyncio
+async def test_batch_saves_payloads_only_of_staged_items(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    store = _MemoryStore()
+    stage_create = ArtifactService._stage_create
+
+    def conflicting(db, artifact_id, artifact_in, storage_key):
+        if artifact_id == "batch_race_taken":
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        return stage_create(db, artifact_id, artifact_in, storage_key)
+
+    with patch("app.services.artifact_service.get_artifact_store", return_value=store), \
+            patch("app.services.artifact_service.get_settings") as settings, \
+            patch.object(ArtifactService, "_stage_create", side_effect=conflicting):
+        settings.return_value.ARTIFACT_STORAGE_BACKEND = "memory"
+        settings.return_value.ARTIFACT_BATCH_CONCURRENCY = 2
+        response = await client.post(
+            "/api/v1/artifacts/batch-upsert",
+            json={
+                "artifacts": [
+                    {"id": f"batch_race_{n}", "type": "doc", "name": n, "payload": {"n": n},
+                     "session_id": "batch_session"}
+                    for n in ("ok", "taken")
+                ]
+            },
+            headers=headers,
+        )
+        items = response.json()["items"]
+        assert [(i["status"], i["error"]) for i in items] == [
+            ("created", None), ("error", "Conflicting write")
+        ]
+        # The rolled-back item's payload never reached the store
+        assert [key.split("@")[0] for key in store.saved] == ["mem/batch_race_ok"]
+
+        response = await client.post(
+            "/api/v1/artifacts/batch-get",
+            json={"artifact_ids": ["batch_race_ok", "batch_race_taken"]},
+            headers=headers,
+        )
+    items = response.json()["items"]
+    assert [i["status"] for i in items] == ["ok", "missing"]
+    assert items[0]["artifact"]["payload"] == {"n": "ok"}
@@ -0,0 +1,202 @@
+import json
+import pytest
+from unittest.mock import patch
+from httpx import AsyncClient
+from app.core.admission import AdmissionController
+from app.core.resilience import CircuitOpenError
+from app.services.llm_providers import MockLLMProvider
+
+
+async def get_auth_headers(client: AsyncClient, username="execute_user"):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": username, "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_execute_chat_persists_turn(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    with patch(
+        "app.services.execution_service.get_llm_provider",
+        return_value=MockLLMProvider(),
+    ):
+        response = await client.post(
+            "/api/v1/sessions/execute",
+            json={"type": "chat", "session_id": "exec_chat_session", "action": "Hi"},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    message = response.json()["result"]["output_message"]
+    assert message["id"] is not None
+    assert message["role"] == "assistant"
+
+    response = await client.get("/api/v1/sessions/exec_chat_session", headers=headers)
+    assert response.status_code == 200
+    roles = [m["role"] for m in response.json()["messages"]]
+    assert roles == ["user", "assistant"]
+
+
+@pytest.mark.asyncio
+async def test_execute_chat_stream_final_message(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    with patch(
+        "app.services.execution_service.get_llm_provider",
+        return_value=MockLLMProvider(),
+    ):
+        async with client.stream(
+            "POST",
+            "/api/v1/sessions/execute",
+            json={
+                "type": "chat",
+                "session_id": "exec_stream_session",
+                "action": "Stream me",
+                "stream": True,
+            },
+            headers=headers,
+        ) as response:
+            assert response.status_code == 200
+            events = [
+                json.loads(line[6:])
+                async for line in response.aiter_lines()
+                if line.startswith("data: ")
+            ]
+
+    assert events[-1]["type"] == "final_message"
+    assert events[-1]["message"]["id"] is not None
+
+
+@pytest.mark.asyncio
+async def test_execute_command_returns_new_artifacts(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/sessions/execute",
+        json={
+            "type": "command",
+            "session_id": "exec_cmd_session",
+            "command_name": "plot",
+            "action": "sales",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    result = response.json()["result"]
+    assert len(result["new_artifacts"]) == 1
+    assert result["new_artifacts"][0]["mutations"][0]["version_id"] == "v1"
+
+
+@pytest.mark.asyncio
+async def test_execute_rejects_over_limit_with_retry_after(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    controller = AdmissionController(
+        max_concurrent=1,
+        max_per_user=1,
+        queue_size=0,
+        queue_per_user=0,
+        queue_timeout=1.0,
+        retry_after=7,
+    )
+    held = await controller.acquire(1)
+    with patch(
+        "app.api.v1.endpoints.sessions.get_admission_controller",
+        return_value=controller,
+    ):
+        response = await client.post(
+            "/api/v1/sessions/execute",
+            json={
+                "type": "command",
+                "session_id": "exec_admission_session",
+                "command_name": "plot",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "7"
+
+        held.release()
+        response = await client.post(
+            "/api/v1/sessions/execute",
+            json={
+                "type": "command",
+                "session_id": "exec_admission_session",
+                "command_name": "plot",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+    assert controller.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_from_last_event_id(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    body = {
+        "type": "chat",
+        "session_id": "exec_resume_session",
+        "action": "Stream me",
+        "stream": True,
+    }
+    provider = MockLLMProvider()
+    with patch(
+        "app.services.execution_service.get_llm_provider", return_value=provider
+    ):
+        async with client.stream(
+            "POST", "/api/v1/sessions/execute", json=body, headers=headers
+        ) as response:
+            assert response.status_code == 200
+            turn_id = response.headers["X-Turn-Id"]
+            lines = [line async for line in response.aiter_lines()]
+
+        ids = [line[4:] for line in lines if line.startswith("id: ")]
+        data = [line for line in lines if line.startswith("data: ")]
+        assert len(ids) == len(data) > 1
+        assert ids[0] == f"{turn_id}:1"
+
+        # Reconnect after the first frame: only the rest is replayed
+        response = await client.get(
+            f"/api/v1/sessions/turns/{turn_id}/stream",
+            headers={**headers, "Last-Event-ID": ids[0]},
+        )
+        assert response.status_code == 200
+        replayed = [l for l in response.text.splitlines() if l.startswith("data: ")]
+        assert replayed == data[1:]
+
+        # Re-submitting with Last-Event-ID does not run the turn again
+        with patch(
+            "app.services.execution_service.ExecutionService.execute_stream_detached"
+        ) as rerun:
+            response = await client.post(
+                "/api/v1/sessions/execute",
+                json=body,
+                headers={**headers, "Last-Event-ID": ids[-2]},
+            )
+        assert response.status_code == 200
+        assert rerun.call_count == 0
+        assert [l for l in response.text.splitlines() if l.startswith("data: ")] == data[-1:]
+
+    other = await get_auth_headers(client, username="resume_other_user")
+    response = await client.get(f"/api/v1/sessions/turns/{turn_id}/stream", headers=other)
+    assert response.status_code == 404
+
+
+class _OpenCircuitProvider(MockLLMProvider):
+    async def generate_stream(self, request):
+        raise CircuitOpenError("llm", 2.2)
+        yield
+
+
+@pytest.mark.asyncio
+async def test_execute_fails_fast_while_llm_circuit_is_open(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    with patch(
+        "app.services.execution_service.get_llm_provider",
+        return_value=_OpenCircuitProvider(),
+    ):
+        response = await client.post(
+            "/api/v1/sessions/execute",
+            json={"type": "chat", "session_id": "exec_circuit_session", "action": "Hi"},
+            headers=headers,
+        )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
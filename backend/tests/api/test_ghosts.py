@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import patch
+from httpx import AsyncClient
+from app.core.config import get_settings
+
+
+async def get_auth_headers(client: AsyncClient, username="ghost_user"):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": username, "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _create_artifact(client, headers, artifact_id):
+    response = await client.post(
+        "/api/v1/artifacts/",
+        json={
+            "id": artifact_id,
+            "type": "code",
+            "name": "Script",
+            "payload": {"source": "v1"},
+            "session_id": "ghost_session",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+async def _iterate(client, headers, artifact_id, count):
+    ghosts = []
+    for i in range(count):
+        response = await client.post(
+            f"/api/v1/artifacts/{artifact_id}/ghosts",
+            json={"payload": {"source": f"ghost {i}"}, "change_summary": f"Try {i}"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        ghosts.append(response.json())
+    return ghosts
+
+
+@pytest.mark.asyncio
+async def test_iterations_stay_out_of_the_db_until_accepted(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    await _create_artifact(client, headers, "ghost_art")
+
+    ghosts = await _iterate(client, headers, "ghost_art", 3)
+    assert all(g["status"] == "ghost" and g["parent_id"] == "v1" for g in ghosts)
+
+    response = await client.get("/api/v1/artifacts/ghost_art", headers=headers)
+    assert [m["version_id"] for m in response.json()["mutations"]] == ["v1"]
+
+    # Ghost sessions are per user
+    other = await get_auth_headers(client, "ghost_other_user")
+    response = await client.get("/api/v1/artifacts/ghost_art/ghosts", headers=other)
+    assert response.json() == []
+    response = await client.post(
+        f"/api/v1/artifacts/ghost_art/ghosts/{ghosts[1]['id']}/accept", headers=other
+    )
+    assert response.status_code == 404
+
+    response = await client.post(
+        f"/api/v1/artifacts/ghost_art/ghosts/{ghosts[1]['id']}/accept", headers=headers
+    )
+    assert response.status_code == 200
+    artifact = response.json()
+    assert artifact["payload"] == {"source": "ghost 1"}
+    versions = {m["version_id"]: m for m in artifact["mutations"]}
+    assert set(versions) == {"v1", "v2"}
+    assert versions["v2"]["status"] == "committed"
+    assert versions["v2"]["change_summary"] == "Try 1"
+
+    response = await client.get("/api/v1/artifacts/ghost_art/ghosts", headers=headers)
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_discard_keeps_ghosts_in_recycle_bin_when_configured(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    await _create_artifact(client, headers, "ghost_bin_art")
+    await _iterate(client, headers, "ghost_bin_art", 2)
+
+    settings = get_settings().model_copy(update={"GHOST_RECYCLE_BIN_SECONDS": 86400})
+    with patch("app.services.artifact_service.get_settings", return_value=settings):
+        response = await client.post(
+            "/api/v1/artifacts/ghost_bin_art/ghosts/discard", headers=headers
+        )
+        assert response.json() == {"discarded": 2, "recycled": 2}
+
+        # Recycled ghosts do not count as versions
+        [ghost] = await _iterate(client, headers, "ghost_bin_art", 1)
+        assert ghost["parent_id"] == "v1"
+        response = await client.post(
+            f"/api/v1/artifacts/ghost_bin_art/ghosts/{ghost['id']}/accept", headers=headers
+        )
+
+    statuses = sorted(
+        (m["status"], m["version_id"][:6]) for m in response.json()["mutations"]
+    )
+    assert statuses == [
+        ("committed", "v1"),
+        ("committed", "v2"),
+        ("discarded", "ghost-"),
+        ("discarded", "ghost-"),
+    ]
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+
+async def get_auth_headers(client: AsyncClient, username="jobs_user"):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": username, "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_background_command_returns_job(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/sessions/execute",
+        json={
+            "type": "command",
+            "session_id": "jobs_session",
+            "command_name": "plot",
+            "action": "sales",
+            "background": True,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["location"].endswith(f"/jobs/{job_id}")
+
+    for _ in range(100):
+        response = await client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        if response.json()["status"] in ("succeeded", "failed"):
+            break
+        await asyncio.sleep(0.02)
+
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["result"]["new_artifacts"][0]["type"] == "visual"
+
+    # Jobs are private to the user who submitted them
+    other = await get_auth_headers(client, username="jobs_other_user")
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=other)
+    assert response.status_code == 404
@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def get_auth_headers(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": "prefetch_user", "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_prefetch_then_execute_uses_warm_artifact(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/artifacts/",
+        json={
+            "id": "prefetch_art",
+            "type": "data",
+            "name": "Warm",
+            "payload": {"rows": [1, 2, 3]},
+            "session_id": "prefetch_session",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/v1/artifacts/prefetch",
+        json={"artifact_ids": ["prefetch_art", "prefetch_art", "prefetch_nope"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["artifacts"] == {
+        "prefetch_art": "loaded",
+        "prefetch_nope": "missing",
+    }
+
+    response = await client.post(
+        "/api/v1/sessions/execute",
+        json={
+            "session_id": "prefetch_session",
+            "type": "chat",
+            "action": "sum @P1",
+            "referenced_artifact_ids": ["prefetch_art"],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["result"]["metadata"]["context"]["prefetched_artifacts"] == 1
@@ -0,0 +1,64 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def get_auth_headers(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": "versions_user", "password": "password"}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_history_is_headers_with_payloads_on_demand(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/artifacts/",
+        json={
+            "id": "versions_art",
+            "type": "doc",
+            "name": "Notes",
+            "payload": {"text": "draft 1"},
+            "session_id": "versions_session",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    for n in (2, 3, 4):
+        response = await client.patch(
+            "/api/v1/artifacts/versions_art",
+            json={"payload": {"text": f"draft {n}"}},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    response = await client.get("/api/v1/artifacts/versions_art", headers=headers)
+    assert response.status_code == 200
+    artifact = response.json()
+    assert artifact["payload"] == {"text": "draft 4"}
+    assert [m["version_id"] for m in artifact["mutations"]] == ["v1", "v2", "v3", "v4"]
+    assert all("payload" not in m for m in artifact["mutations"])
+
+    response = await client.get(
+        "/api/v1/artifacts/versions_art/versions?offset=1&limit=2", headers=headers
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert (page["total"], page["offset"], page["limit"]) == (4, 1, 2)
+    assert [m["version_id"] for m in page["items"]] == ["v2", "v3"]
+    assert all("payload" not in m for m in page["items"])
+
+    response = await client.get("/api/v1/artifacts/versions_art/versions/v2", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["version_id"] == "v2"
+    assert response.json()["payload"] == {"text": "draft 2"}
+
+    response = await client.get("/api/v1/artifacts/versions_art/versions/v9", headers=headers)
+    assert response.status_code == 404
+    response = await client.get("/api/v1/artifacts/versions_nope/versions", headers=headers)
+    assert response.status_code == 404
+    response = await client.get(
+        "/api/v1/artifacts/versions_art/versions?limit=0", headers=headers
+    )
+    assert response.status_code == 422
@@ -18,7 +18,7 @@ import asyncio
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.main import app
-from app.db.session import get_db
+from app.db.session import get_db, get_session_factory
 from app.db.base_class import Base
 
 # Test Database URL
@@ -38,6 +38,7 @@ async def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,74 @@
+import json
+from app.core.artifact.assembler import ArtifactPayloadAssembler, JSONStreamScanner
+
+
+def _feed(scanner, text, size=7):
+    for i in range(0, len(text), size):
+        scanner.feed(text[i:i + size])
+
+
+def test_scanner_accepts_chunked_document():
+    doc = json.dumps({"rows": [[1, "a}"], [2, 'b\\"]']], "svg": "<svg>{}</svg>"})
+    scanner = JSONStreamScanner()
+    _feed(scanner, doc)
+    assert not scanner.malformed
+    assert scanner.complete
+
+
+def test_scanner_flags_mismatched_closer_early():
+    scanner = JSONStreamScanner()
+    scanner.feed('{"a": [1, 2}')
+    assert scanner.malformed
+    # Further chunks are ignored once malformed
+    scanner.feed(']}')
+    assert scanner.malformed
+
+
+def test_scanner_flags_trailing_data_and_leading_text():
+    scanner = JSONStreamScanner()
+    _feed(scanner, '{"a": 1} extra')
+    assert scanner.malformed
+
+    scanner = JSONStreamScanner()
+    scanner.feed("def main():")
+    assert scanner.malformed
+
+
+def test_scanner_handles_escape_split_across_chunks():
+    scanner = JSONStreamScanner()
+    scanner.feed('{"a": "x\\')
+    scanner.feed('"y"}')
+    assert scanner.complete
+
+
+def test_scanner_leaves_scalars_to_parser():
+    scanner = JSONStreamScanner()
+    scanner.feed("12")
+    scanner.feed("3")
+    assert not scanner.malformed
+
+
+def test_assembler_parses_payload():
+    payload = {"format": "svg", "url": "data:image/svg+xml,<svg/>"}
+    assembler = ArtifactPayloadAssembler("a1", "visual")
+    _feed(assembler, json.dumps(payload), size=3)
+    assert assembler.result() == payload
+    assembler.close()
+
+
+def test_assembler_falls_back_to_raw_content():
+    assembler = ArtifactPayloadAssembler("a2", "code")
+    assembler.feed("print('hi')")
+    assert assembler.malformed
+    assert assembler.result() == {"raw_content": "print('hi')"}
+    assembler.close()
+
+
+def test_assembler_spills_large_payload_to_disk():
+    payload = {"rows": [[i, "x" * 20] for i in range(200)]}
+    assembler = ArtifactPayloadAssembler("a3", "data", spool_bytes=256)
+    _feed(assembler, json.dumps(payload), size=64)
+    assert assembler.spilled
+    assert assembler.size == len(json.dumps(payload))
+    assert assembler.result() == payload
+    assembler.close()
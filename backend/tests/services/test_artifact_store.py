@@ -5,6 +5,7 @@ from app.core.artifact.stores.database import DatabaseArtifactStore
 from app.core.artifact.stores.filesystem import FilesystemArtifactStore
 from app.core.artifact.stores.http import HTTPArtifactStore
 from app.core.artifact.factory import get_artifact_store
+from app.core.artifact.caching import CachingArtifactStore
 from app.services.artifact_service import ArtifactService
 from app.schemas.artifact import Artifact as ArtifactSchema
 
@@ -73,9 +74,19 @@ async def test_factory():
         # File
         mock_settings.return_value.ARTIFACT_STORAGE_BACKEND = "file"
         mock_settings.return_value.ARTIFACT_STORAGE_PATH = "/tmp"
+        mock_settings.return_value.ARTIFACT_CACHE_MAX_BYTES = 0
         get_artifact_store.cache_clear()
         assert isinstance(get_artifact_store(), FilesystemArtifactStore)
 
+        # External stores get the read-through cache in front
+        mock_settings.return_value.ARTIFACT_CACHE_MAX_BYTES = 1024
+        mock_settings.return_value.ARTIFACT_CACHE_TTL_SECONDS = 0
+        get_artifact_store.cache_clear()
+        store = get_artifact_store()
+        assert isinstance(store, CachingArtifactStore)
+        assert isinstance(store.inner, FilesystemArtifactStore)
+    get_artifact_store.cache_clear()
+
 
 @pytest.mark.asyncio
 async def test_service_integration_db(db_session):
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import pytest
+from typing import Any, Optional
+from app.core.artifact.caching import CachingArtifactStore
+from app.core.artifact.store import ArtifactStore
+
+
+class _SlowStore(ArtifactStore):
+    def __init__(self):
+        self.payloads = {}
+        self.loads = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def save(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
+        self.payloads[artifact_id] = content
+        return f"key-{artifact_id}"
+
+    async def load(self, artifact_id: str, storage_key: str, token: Optional[str] = None) -> Any:
+        self.loads += 1
+        snapshot = self.payloads.get(artifact_id)
+        await self.release.wait()
+        return snapshot
+
+
+@pytest.mark.asyncio
+async def test_hits_return_copies_and_save_invalidates():
+    inner = _SlowStore()
+    store = CachingArtifactStore(inner, max_bytes=1024)
+    key = await store.save("a", {"rows": [1]})
+
+    first = await store.load("a", key)
+    first["rows"].append(99)  # Callers may mutate what they get
+    assert await store.load("a", key) == {"rows": [1]}
+    assert inner.loads == 1
+
+    await store.save("a", {"rows": [2]})
+    assert await store.load("a", key) == {"rows": [2]}
+    assert inner.loads == 2
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_least_recently_used():
+    inner = _SlowStore()
+    size = len(json.dumps({"v": "x" * 40}))
+    store = CachingArtifactStore(inner, max_bytes=size * 2)
+    keys = {}
+    for name in "abc":
+        keys[name] = await inner.save(name, {"v": name * 40})
+
+    await store.load("a", keys["a"])
+    await store.load("b", keys["b"])
+    await store.load("a", keys["a"])  # "b" is now least recently used
+    await store.load("c", keys["c"])
+
+    stats = store.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= size * 2
+    assert stats["evictions"] == 1
+    loads = inner.loads
+    await store.load("a", keys["a"])
+    assert inner.loads == loads
+    await store.load("b", keys["b"])
+    assert inner.loads == loads + 1
+
+    # Payloads over the whole budget are passed through, not cached
+    big = await inner.save("big", {"v": "x" * size * 3})
+    await store.load("big", big)
+    await store.load("big", big)
+    assert inner.loads == loads + 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    inner = _SlowStore()
+    store = CachingArtifactStore(inner, max_bytes=1024)
+    key = await inner.save("a", {"rows": [1]})
+
+    inner.release.clear()
+    readers = [asyncio.create_task(store.load("a", key)) for _ in range(5)]
+    await asyncio.sleep(0)
+    inner.release.set()
+    assert await asyncio.gather(*readers) == [{"rows": [1]}] * 5
+    assert inner.loads == 1
+    assert store.stats()["coalesced"] == 4
+
+    # A cancelled leader hands the load over to a waiter
+    await store.save("a", {"rows": [2]})
+    inner.release.clear()
+    leader = asyncio.create_task(store.load("a", key))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(store.load("a", key))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    inner.release.set()
+    assert await waiter == {"rows": [2]}
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_load_racing_a_save_is_not_cached():
+    inner = _SlowStore()
+    store = CachingArtifactStore(inner, max_bytes=1024)
+    key = await inner.save("a", {"rows": [1]})
+
+    inner.release.clear()
+    reader = asyncio.create_task(store.load("a", key))
+    await asyncio.sleep(0)
+    await store.save("a", {"rows": [2]})
+    inner.release.set()
+    assert await reader == {"rows": [1]}  # Read before the save
+
+    assert await store.load("a", key) == {"rows": [2]}
+    assert inner.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    inner = _SlowStore()
+    store = CachingArtifactStore(inner, max_bytes=1024, ttl_seconds=0.05)
+    key = await inner.save("a", {"rows": [1]})
+    await store.load("a", key)
+    await store.load("a", key)
+    assert inner.loads == 1
+    await asyncio.sleep(0.06)
+    await store.load("a", key)
+    assert inner.loads == 2
+
+
+class _KeyedStore(ArtifactStore):
+    def __init__(self):
+        self.payloads = {}
+
+    async def save(self, artifact_id: str, content: Any, token: Optional[str] = None) -> str:
+        self.payloads[f"key-{artifact_id}"] = content
+        return f"key-{artifact_id}"
+
+    async def load(self, artifact_id: str, storage_key: str, token: Optional[str] = None) -> Any:
+        return self.payloads.get(storage_key)
+
+
+@pytest.mark.asyncio
+async def test_saves_from_another_process_are_not_served_stale():
+    inner = _KeyedStore()
+    writer = CachingArtifactStore(inner, max_bytes=1024)
+    reader = CachingArtifactStore(inner, max_bytes=1024)  # Another worker
+
+    old_key = await writer.save_revision("a", {"rows": [1]})
+    assert await reader.load("a", old_key) == {"rows": [1]}
+
+    new_key = await writer.save_revision("a", {"rows": [2]})
+    assert new_key != old_key
+    assert await reader.load("a", new_key) == {"rows": [2]}
+    assert await reader.load("a", old_key) == {"rows": [1]}  # Still readable
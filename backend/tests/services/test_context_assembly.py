@@ -0,0 +1,117 @@
+import json
+import pytest
+from sqlalchemy import func, select
+from unittest.mock import patch
+from app.core.config import get_settings
+from app.core.llm_protocol import LLMMessage, LLMRequest
+from app.models.chat import ChatMessage
+from app.services.llm_context import LLMContextService, _history_cache
+from app.services.turn_writer import TurnWriter
+
+
+async def _add_turns(db_session, session_id, count, size=40):
+    writer = TurnWriter(db_session, session_id)
+    await writer.ensure_session("History")
+    for i in range(count):
+        writer.add_message("user", f"q{i} " + "x" * size)
+        writer.add_message("assistant", f"a{i} " + "y" * size)
+    await writer.commit()
+
+
+@pytest.mark.asyncio
+async def test_history_is_serialized_once_per_message(db_session):
+    session_id = "ctx_incremental_session"
+    LLMContextService.invalidate_history(session_id)
+    await _add_turns(db_session, session_id, 2)
+
+    current = LLMMessage(role="user", content="next")
+    messages, fragments, stats = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=0
+    )
+    assert [m.content[:2] for m in messages] == ["q0", "a0", "q1", "a1", "ne"]
+    assert stats["serialized_messages"] == 5
+
+    await _add_turns(db_session, session_id, 1)
+    with patch.object(
+        LLMMessage, "model_dump_json", autospec=True, side_effect=LLMMessage.model_dump_json
+    ) as dump:
+        messages, fragments, stats = await LLMContextService.assemble_messages(
+            db_session, session_id, current, max_tokens=0
+        )
+    # Only the two new messages and the current one were serialized
+    assert dump.call_count == 3
+    assert stats["serialized_messages"] == 3
+    assert stats["history_messages"] == 6
+
+    request = LLMRequest(session_id=session_id, messages=messages)
+    request.set_message_fragments(fragments)
+    assert json.loads(request.to_json()) == json.loads(request.model_dump_json())
+
+
+@pytest.mark.asyncio
+async def test_history_respects_token_budget(db_session):
+    session_id = "ctx_budget_session"
+    LLMContextService.invalidate_history(session_id)
+    await _add_turns(db_session, session_id, 10, size=200)
+
+    chars_per_token = get_settings().LLM_CONTEXT_CHARS_PER_TOKEN
+    current = LLMMessage(role="user", content="latest")
+    messages, _, stats = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=200
+    )
+    window = messages
+    assert stats["chars"] <= 200 * chars_per_token
+    assert 0 < stats["history_messages"] < 20
+    assert stats["dropped_messages"] == 20 - stats["history_messages"]
+    # The newest history is kept, in order, with the current message last
+    assert messages[-2].content.startswith("a9")
+    assert messages[-1] is current
+    assert len(_history_cache.get(session_id).messages) < 20
+
+    # The current message is sent even when it alone exceeds the budget
+    messages, _, stats = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=1
+    )
+    assert messages == [current]
+    assert stats["dropped_messages"] == 20
+    # History no turn can reach is not kept in the cache
+    assert _history_cache.get(session_id).messages == []
+
+    # A larger budget reloads the trimmed history
+    messages, _, stats = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=200
+    )
+    assert messages == window
+    assert stats["dropped_messages"] == 20 - stats["history_messages"]
+
+
+@pytest.mark.asyncio
+async def test_history_rebuilds_when_the_database_disagrees(db_session):
+    session_id = "ctx_gap_session"
+    LLMContextService.invalidate_history(session_id)
+    await _add_turns(db_session, session_id, 0)
+    base = (await db_session.execute(select(func.max(ChatMessage.id)))).scalar() or 0
+    for offset, content in ((10, "first"), (11, "second")):
+        db_session.add(
+            ChatMessage(id=base + offset, session_id=session_id, role="user", content=content)
+        )
+    await db_session.commit()
+    current = LLMMessage(role="user", content="next")
+    await LLMContextService.assemble_messages(db_session, session_id, current, max_tokens=0)
+
+    # A turn that took a lower id commits after the cache moved past it
+    late = ChatMessage(id=base + 5, session_id=session_id, role="user", content="late")
+    db_session.add(late)
+    await db_session.commit()
+    messages, _, _ = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=0
+    )
+    assert [m.content for m in messages] == ["late", "first", "second", "next"]
+
+    # A deleted message is dropped from the cached history
+    await db_session.delete(late)
+    await db_session.commit()
+    messages, _, _ = await LLMContextService.assemble_messages(
+        db_session, session_id, current, max_tokens=0
+    )
+    assert [m.content for m in messages] == ["first", "second", "next"]
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from app.core.llm_protocol import (
+    TextDeltaEvent,
+    ArtifactStartEvent,
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+)
+from app.core.streaming import EventPump
+
+
+async def _token_stream(delay=0.0):
+    for i in range(50):
+        if delay:
+            await asyncio.sleep(delay)
+        yield TextDeltaEvent(content=f"t{i} ")
+    yield ArtifactStartEvent(artifact_id="a1", artifact_type="data")
+    yield ArtifactChunkEvent(artifact_id="a1", chunk="{}")
+    yield ArtifactEndEvent(artifact_id="a1")
+    for i in range(5):
+        yield TextDeltaEvent(content=f"u{i} ")
+
+
+async def _collect(source, **kwargs):
+    pump = EventPump(source)
+    try:
+        return [e async for e in pump.events(**kwargs)]
+    finally:
+        await pump.aclose()
+
+
+@pytest.mark.asyncio
+async def test_without_coalescing_every_delta_is_forwarded():
+    events = await _collect(_token_stream())
+    assert len(events) == 58
+
+
+@pytest.mark.asyncio
+async def test_coalescing_merges_deltas_and_keeps_artifact_order():
+    events = await _collect(_token_stream(), coalesce_window=0.5)
+    types = [e.type for e in events]
+    assert types == [
+        "text_delta",
+        "artifact_start",
+        "artifact_chunk",
+        "artifact_end",
+        "text_delta",
+    ]
+    assert events[0].content == "".join(f"t{i} " for i in range(50))
+    assert events[-1].content == "".join(f"u{i} " for i in range(5))
+
+
+@pytest.mark.asyncio
+async def test_coalescing_respects_size_limit():
+    events = await _collect(_token_stream(), coalesce_window=0.5, coalesce_max_bytes=40)
+    text_frames = [e for e in events if e.type == "text_delta"]
+    assert len(text_frames) > 2
+    assert all(len(e.content) < 50 for e in text_frames)
+
+
+@pytest.mark.asyncio
+async def test_coalescing_limit_counts_utf8_bytes():
+    async def accented():
+        for _ in range(8):
+            yield TextDeltaEvent(content="é" * 10)  # 20 bytes
+
+    events = await _collect(accented(), coalesce_window=0.5, coalesce_max_bytes=40)
+    assert [len(e.content.encode("utf-8")) for e in events] == [40] * 4
+
+
+@pytest.mark.asyncio
+async def test_coalescing_flushes_on_time_window():
+    # Deltas arrive every 10ms; a 25ms window yields several batches
+    events = await _collect(_token_stream(delay=0.01), coalesce_window=0.025)
+    text_frames = [e for e in events if e.type == "text_delta"]
+    assert 3 < len(text_frames) < 50
+    merged = "".join(e.content for e in text_frames)
+    assert merged.startswith("t0 t1 ")
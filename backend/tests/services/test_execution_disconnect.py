@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from sqlalchemy import select
+from app.core.config import get_settings
+from app.core.llm_protocol import LLMProvider, TextDeltaEvent
+from app.models.chat import ChatMessage
+from app.schemas.chat import ExecutionRequest
+from app.services.execution_service import ExecutionService
+
+
+class SlowProvider(LLMProvider):
+    def __init__(self):
+        self.closed = False
+        self.sent = 0
+
+    async def generate_stream(self, request):
+        try:
+            yield TextDeltaEvent(content="partial")
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                self.sent += 1
+                yield TextDeltaEvent(content=".")
+        finally:
+            self.closed = True
+
+
+async def _run_disconnected_turn(db_session, session_id, policy):
+    provider = SlowProvider()
+    settings = get_settings().model_copy(
+        update={
+            "STREAM_DISCONNECT_POLICY": policy,
+            "STREAM_DISCONNECT_CHECK_INTERVAL": 0.01,
+        }
+    )
+    frames = []
+
+    async def is_disconnected():
+        # The browser goes away after receiving the first frame
+        return len(frames) > 0
+
+    req = ExecutionRequest(type="chat", session_id=session_id, action="Hi", stream=True)
+    with (
+        patch("app.services.execution_service.get_llm_provider", return_value=provider),
+        patch("app.services.execution_service.get_settings", return_value=settings),
+    ):
+        async for frame in ExecutionService.execute_stream(
+            db_session, req, is_disconnected=is_disconnected
+        ):
+            frames.append(frame)
+
+    result = await db_session.execute(
+        select(ChatMessage).where(ChatMessage.session_id == session_id)
+    )
+    return provider, frames, result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_upstream_and_drops_turn(db_session):
+    provider, frames, messages = await _run_disconnected_turn(
+        db_session, "disconnect_drop_session", "drop"
+    )
+    assert provider.closed
+    assert provider.sent < 100
+    assert not any("final_message" in f for f in frames)
+    assert messages == []
+
+
+@pytest.mark.asyncio
+async def test_disconnect_saves_partial_reply(db_session):
+    provider, frames, messages = await _run_disconnected_turn(
+        db_session, "disconnect_partial_session", "save_partial"
+    )
+    assert provider.closed
+    assert [m.role for m in messages] == ["user", "assistant"]
+    assert messages[1].is_truncated is True
+    assert messages[1].content.startswith("partial")
+
+
+@pytest.mark.asyncio
+async def test_server_side_close_cancels_upstream(db_session):
+    provider = SlowProvider()
+    req = ExecutionRequest(
+        type="chat", session_id="disconnect_close_session", action="Hi", stream=True
+    )
+    with patch("app.services.execution_service.get_llm_provider", return_value=provider):
+        stream = ExecutionService.execute_stream(db_session, req)
+        first = await stream.__anext__()
+        assert "partial" in first
+        await stream.aclose()
+
+    assert provider.closed
+    assert provider.sent < 100
@@ -0,0 +1,24 @@
+import time
+from app.core.ghost_store import GhostStore
+
+
+def test_sessions_are_bounded_and_expire():
+    store = GhostStore(max_sessions=2, max_iterations=2, ttl_seconds=60)
+    first = store.add(1, "a", "v1", {"n": 0}, {"type": "adhoc_command"})
+    store.add(1, "a", "v1", {"n": 1}, {"type": "adhoc_command"})
+    store.add(1, "a", "v1", {"n": 2}, {"type": "adhoc_command"})
+    assert [g.payload["n"] for g in store.list(1, "a")] == [1, 2]
+    assert store.get(1, "a", first.id) is None
+
+    store.add(2, "a", "v1", {}, {"type": "adhoc_command"})
+    store.list(1, "a")  # Most recently used
+    store.add(3, "a", "v1", {}, {"type": "adhoc_command"})
+    assert store.list(2, "a") == []
+    assert len(store.list(1, "a")) == 2
+    assert store.stats()["evicted_sessions"] == 1
+
+    short = GhostStore(max_sessions=2, max_iterations=2, ttl_seconds=0.05)
+    short.add(1, "a", None, {}, {"type": "adhoc_command"})
+    time.sleep(0.1)
+    assert short.list(1, "a") == []
+    assert short.stats()["expired_sessions"] == 1
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+from app.core.config import get_settings
+from app.core.events import EventBus
+from app.core.jobs import JobManager
+from app.core.llm_protocol import (
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+    ArtifactStartEvent,
+    LLMProvider,
+    TextDeltaEvent,
+)
+from app.schemas.chat import ExecutionRequest
+from app.services.execution_service import ExecutionService
+
+
+class ArtifactProvider(LLMProvider):
+    def __init__(self, artifact_id):
+        self.artifact_id = artifact_id
+
+    async def generate_stream(self, request):
+        yield TextDeltaEvent(content="Here ")
+        yield TextDeltaEvent(content="it is")
+        yield ArtifactStartEvent(artifact_id=self.artifact_id, artifact_type="code")
+        for chunk in ('{"rows": ', "[1, 2, 3]", "}"):
+            yield ArtifactChunkEvent(artifact_id=self.artifact_id, chunk=chunk)
+        yield ArtifactEndEvent(artifact_id=self.artifact_id)
+
+
+async def _progress_of_chat_job(db_session, artifact_id, interval):
+    bus = EventBus()
+    subscription = bus.subscribe(user_id=1)
+    manager = JobManager(workers=1, queue_size=1, retention=10, bus=bus)
+    settings = get_settings().model_copy(
+        update={"JOB_PROGRESS_INTERVAL_SECONDS": interval}
+    )
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    req = ExecutionRequest(
+        type="chat", session_id=f"session_{artifact_id}", action="Code please"
+    )
+    provider = ArtifactProvider(artifact_id)
+    with (
+        patch("app.services.execution_service.get_llm_provider", return_value=provider),
+        patch("app.services.execution_service.get_settings", return_value=settings),
+        patch("app.services.execution_service.get_job_manager", return_value=manager),
+    ):
+        job = ExecutionService.submit_job(session_factory, req, user_id=1)
+        for _ in range(100):
+            if job.done:
+                break
+            await asyncio.sleep(0.01)
+    await manager.stop()
+
+    assert job.status == "succeeded", job.error
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return [e["message"] for e in events if e["type"] == "job_progress"]
+
+
+@pytest.mark.asyncio
+async def test_chat_job_reports_streaming_progress(db_session):
+    messages = await _progress_of_chat_job(db_session, "progress_art", interval=0)
+    assert messages == [
+        "Generated 5 characters of the reply",
+        "Generated 10 characters of the reply",
+        "Generated 9 bytes of artifact progress_art",
+        "Generated 18 bytes of artifact progress_art",
+        "Generated 19 bytes of artifact progress_art",
+    ]
+
+    # Throttled to one event per interval
+    assert len(await _progress_of_chat_job(db_session, "throttled_art", interval=60)) == 1
@@ -0,0 +1,137 @@
+import json
+import pytest
+from unittest.mock import patch
+from app.core.llm_protocol import LLMMessage, LLMRequest
+from app.models.artifact import Artifact, MutationRecord
+from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.services.artifact_service import ArtifactService
+from app.services.llm_context import LLMContextService
+
+
+@pytest.mark.asyncio
+async def test_projection_sends_head_payload_once(db_session):
+    created = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="llm_ctx_art",
+            type="data",
+            name="Sales",
+            payload={"rows": [1]},
+            session_id="llm_ctx_session",
+        ),
+    )
+    for i in range(2, 4):
+        await ArtifactService.update_artifact(
+            db_session, created, ArtifactUpdate(payload={"rows": list(range(i))})
+        )
+    # A later row that is not a committed version is not the head
+    db_session.add(
+        MutationRecord(
+            artifact_id="llm_ctx_art", version_id="ghost-1", origin={"type": "ghost"},
+            status="ghost", payload={"rows": []},
+        )
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+
+    artifacts, heads = await LLMContextService.load_referenced_artifacts(
+        db_session, ["llm_ctx_art"]
+    )
+    assert heads == {"llm_ctx_art": "v3"}
+
+    projected = LLMContextService.project_artifacts(artifacts, heads)
+    assert projected[0].payload == {"rows": [0, 1, 2]}
+    assert projected[0].version_id == "v3"
+    assert projected[0].name == "Sales"
+
+    request = LLMRequest(
+        session_id="llm_ctx_session",
+        messages=[LLMMessage(role="user", content="sum", artifact_ids=["llm_ctx_art"])],
+        context_artifacts=projected,
+    )
+    body = json.dumps(request.model_dump(mode="json"))
+    assert body.count('"rows"') == 1
+    assert "mutations" not in body
+
+
+def test_projection_caps_oversized_payload():
+    artifact = Artifact(
+        id="big",
+        type="data",
+        payload={"rows": ["x" * 100 for _ in range(100)]},
+        artifact_metadata={"name": "Big"},
+        session_id="s",
+    )
+    projected = LLMContextService.project_artifact(artifact, "v1", max_bytes=256)
+    assert projected.payload is None
+    assert projected.payload_truncated is True
+    assert len(projected.payload_preview) == 256
+
+    small = LLMContextService.project_artifact(artifact, "v1", max_bytes=0)
+    assert small.payload_truncated is False
+    assert small.payload == artifact.payload
+
+
+def test_projection_preview_is_capped_in_bytes():
+    artifact = Artifact(
+        id="wide",
+        type="doc",
+        payload={"text": "é" * 300},  # Two bytes per character
+        artifact_metadata={"name": "Wide"},
+        session_id="s",
+    )
+    projected = LLMContextService.project_artifact(artifact, "v1", max_bytes=257)
+    # '{"text": "' is 10 bytes; the next 'é' would straddle the limit
+    assert len(projected.payload_preview.encode("utf-8")) == 256
+    assert projected.payload_preview == '{"text": "' + "é" * 123
+
+
+class _CountingStore:
+    def __init__(self, content):
+        self.content = content
+        self.loads = 0
+
+    async def load(self, artifact_id, storage_key, token=None):
+        self.loads += 1
+        return self.content
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_offloaded_payload(db_session):
+    created = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="llm_ctx_remote",
+            type="data",
+            name="Remote",
+            payload={"rows": [1]},
+            session_id="llm_ctx_session",
+        ),
+    )
+    # As if the payload had been offloaded to an external store
+    created.payload = None
+    created.storage_backend = "http"
+    created.storage_key = "remote-key"
+    await db_session.commit()
+    db_session.expunge_all()
+
+    store = _CountingStore({"rows": [1, 2]})
+    with patch("app.services.llm_context.get_artifact_store", return_value=store):
+        outcomes = await LLMContextService.prefetch_artifacts(
+            db_session, ["llm_ctx_remote", "llm_ctx_nope"]
+        )
+        assert outcomes == {"llm_ctx_remote": "loaded", "llm_ctx_nope": "missing"}
+
+        artifacts, heads = await LLMContextService.load_referenced_artifacts(
+            db_session, ["llm_ctx_remote"]
+        )
+        projected, outcomes = await LLMContextService.build_context_artifacts(
+            artifacts, heads
+        )
+
+    assert outcomes == {"llm_ctx_remote": "cached"}
+    assert store.loads == 1
+    assert projected[0].payload == {"rows": [1, 2]}
+    assert projected[0].version_id == "v1"
+    # The loaded payload is not written back into the artifacts table
+    assert artifacts[0].payload is None
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import text
+from app.core.artifact.assembler import ArtifactPayloadAssembler
+from app.core.artifact.store import ArtifactStore
+from app.core.artifact.versions import VersionNotLoaded
+from app.core.config import get_settings
+from app.models.artifact import PayloadBlob
+from app.schemas.artifact import ArtifactUpdate
+from app.schemas.chat import ExecutionRequest
+from app.services.artifact_service import ArtifactService
+from app.services.execution_service import ExecutionService
+from app.services.turn_writer import TurnWriter
+
+
+class _MemoryStore(ArtifactStore):
+    def __init__(self):
+        self.saved = {}
+
+    async def save(self, artifact_id, content, token=None):
+        self.saved[f"mem/{artifact_id}"] = content
+        return f"mem/{artifact_id}"
+
+    async def load(self, artifact_id, storage_key, token=None):
+        return self.saved.get(storage_key)
+
+
+@pytest.mark.asyncio
+async def test_oversized_artifact_is_kept_out_of_the_database(db_session):
+    payload = {"rows": list(range(200))}
+    assembler = ArtifactPayloadAssembler("offload_art", "data")
+    assembler.feed('{"rows": [' + ", ".join(str(i) for i in range(200)) + "]}")
+
+    store = _MemoryStore()
+    settings = get_settings().model_copy(
+        update={"ARTIFACT_STORAGE_BACKEND": "file", "ARTIFACT_OFFLOAD_THRESHOLD_BYTES": 100}
+    )
+    req = ExecutionRequest(type="chat", session_id="offload_session", action="make rows")
+    writer = TurnWriter(db_session, "offload_session")
+    await writer.ensure_session("Offload")
+    with patch("app.services.execution_service.get_settings", return_value=settings), \
+            patch("app.services.execution_service.get_artifact_store", return_value=store), \
+            patch("app.services.artifact_service.get_artifact_store", return_value=store):
+        artifacts, payloads = await ExecutionService._process_generated_artifacts(
+            writer, {"offload_art": assembler}, req
+        )
+        msg = writer.add_message("assistant", "Here", artifacts=artifacts)
+        await writer.commit()
+
+        (artifact,) = artifacts
+        mutation = artifact.mutations[0]
+        assert mutation.encoding == "external"
+        assert mutation.storage_key.startswith("mem/offload_art@")
+        assert store.saved[mutation.storage_key] == payload
+        assert mutation.checksum is not None
+        assert await db_session.get(PayloadBlob, mutation.checksum) is None
+        row = (
+            await db_session.execute(
+                text("SELECT a.payload, m.payload FROM artifacts a "
+                     "JOIN mutation_records m ON m.artifact_id = a.id WHERE a.id = 'offload_art'")
+            )
+        ).one()
+        assert row == ("null", "null")  # JSON null in both rows
+
+        # The response carries the payload; the mapped objects do not
+        dto = ExecutionService._message_dto(msg, payloads)
+        assert dto.artifacts[0].payload == payload
+        assert artifact.payload is None
+        assert artifact not in db_session.dirty
+
+        assert await ArtifactService.load_version_payload(db_session, mutation) == payload
+
+        # A later edit saves elsewhere; v1 stays readable
+        await ArtifactService.update_artifact(
+            db_session, artifact, ArtifactUpdate(payload={"rows": []})
+        )
+        assert await ArtifactService.load_version_payload(db_session, mutation) == payload
+
+        store.saved[mutation.storage_key] = {"rows": []}  # Lost from the store
+        with pytest.raises(VersionNotLoaded):
+            await ArtifactService.load_version_payload(db_session, mutation)
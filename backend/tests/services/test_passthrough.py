@@ -0,0 +1,56 @@
+import json
+import pytest
+from unittest.mock import patch
+from sqlalchemy import select
+from app.core.llm_protocol import LLMProvider, decode_event, is_raw_text_delta
+from app.models.chat import ChatMessage
+from app.schemas.chat import ExecutionRequest
+from app.services.execution_service import ExecutionService
+
+UPSTREAM = [
+    '{"type": "text_delta", "content": "Hello"}',
+    '{"type":"text_delta","content":", \\"world\\""}',
+    '{"type": "text_delta", "content": }',  # Malformed: forwarded, but skipped when persisting
+    '{"content": "!", "type": "text_delta"}',  # Not recognised as raw: decoded
+    '{"type": "artifact_end", "artifact_id": "missing"}',
+]
+
+
+class RawLineProvider(LLMProvider):
+    async def generate_stream(self, request):
+        raise AssertionError("pass-through turns use generate_frames")
+        yield
+
+    async def generate_frames(self, request):
+        for line in UPSTREAM:
+            if is_raw_text_delta(line):
+                yield line
+            else:
+                yield decode_event(line)
+
+
+@pytest.mark.asyncio
+async def test_passthrough_forwards_raw_text_and_persists_it(db_session):
+    req = ExecutionRequest(
+        type="chat", session_id="passthrough_session", action="Hi", stream=True,
+        passthrough=True,
+    )
+    with patch(
+        "app.services.execution_service.get_llm_provider", return_value=RawLineProvider()
+    ):
+        frames = [f async for f in ExecutionService.execute_stream(db_session, req)]
+
+    # Raw lines reach the client byte for byte; the rest is re-encoded
+    assert frames[:3] == [f"data: {line}\n\n" for line in UPSTREAM[:3]]
+    assert json.loads(frames[3][6:]) == {"type": "text_delta", "content": "!"}
+    final = json.loads(frames[-1][6:])
+    assert final["type"] == "final_message"
+    assert final["message"]["content"] == 'Hello, "world"!'
+
+    result = await db_session.execute(
+        select(ChatMessage).where(
+            ChatMessage.session_id == "passthrough_session",
+            ChatMessage.role == "assistant",
+        )
+    )
+    assert result.scalar_one().content == 'Hello, "world"!'
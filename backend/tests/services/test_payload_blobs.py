@@ -0,0 +1,207 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.core.artifact.blobs import payload_digest
+from app.core.config import get_settings
+from app.core.ghost_store import get_ghost_store
+from app.db.base_class import Base
+from app.models.artifact import Artifact, MutationRecord, PayloadBlob, _insert_blobs
+from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.services.artifact_service import ArtifactService
+
+
+@pytest.mark.asyncio
+async def test_identical_payloads_are_stored_once(db_session):
+    payload = {"rows": [1, 2], "title": "Shared"}
+    first = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="blob_art_a", type="data", name="A", payload=payload,
+            session_id="blob_session",
+        ),
+    )
+    # Unchanged re-saves, and the same content in another artifact
+    for _ in range(3):
+        await ArtifactService.update_artifact(
+            db_session, first, ArtifactUpdate(payload=dict(payload))
+        )
+    await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="blob_art_b", type="data", name="B",
+            payload={"title": "Shared", "rows": [1, 2]},  # Key order differs
+            session_id="blob_session",
+        ),
+    )
+
+    checksum, size = payload_digest(payload)
+    rows = (
+        await db_session.execute(
+            select(MutationRecord.checksum).where(
+                MutationRecord.artifact_id.in_(["blob_art_a", "blob_art_b"])
+            )
+        )
+    ).scalars().all()
+    assert rows == [checksum] * 5
+    blobs = (
+        await db_session.execute(
+            select(func.count()).select_from(PayloadBlob).where(
+                PayloadBlob.checksum == checksum
+            )
+        )
+    ).scalar_one()
+    assert blobs == 1
+    # The inline column no longer carries a copy
+    inline = (
+        await db_session.execute(
+            text(
+                "SELECT DISTINCT payload FROM mutation_records "
+                "WHERE artifact_id IN ('blob_art_a', 'blob_art_b')"
+            )
+        )
+    ).scalars().all()
+    assert inline == ["null"]
+
+    db_session.expunge_all()
+    reloaded = await ArtifactService.get_artifact(db_session, "blob_art_a")
+    assert [
+        await ArtifactService.load_version_payload(db_session, m) for m in reloaded.mutations
+    ] == [payload] * 4
+    assert reloaded.mutations[0].blob.size == size
+
+
+@pytest.mark.asyncio
+async def test_legacy_inline_payloads_still_read(db_session):
+    artifact = Artifact(
+        id="blob_legacy", type="data", payload={"v": 1},
+        artifact_metadata={"name": "Legacy"}, session_id="blob_session",
+    )
+    db_session.add(artifact)
+    await db_session.flush()
+    await db_session.execute(
+        text(
+            "INSERT INTO mutation_records "
+            "(artifact_id, version_id, origin, payload, status, timestamp) "
+            "VALUES ('blob_legacy', 'v1', '{\"type\": \"manual_edit\"}', "
+            "'{\"v\": 1}', 'committed', '2026-01-01 00:00:00')"
+        )
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+
+    loaded = await ArtifactService.get_artifact(db_session, "blob_legacy")
+    assert loaded.mutations[0].checksum is None
+    assert await ArtifactService.load_version_payload(db_session, loaded.mutations[0]) == {"v": 1}
+
+
+@pytest.mark.asyncio
+async def test_purged_recycle_bin_drops_unreferenced_blobs(db_session):
+    artifact = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="blob_bin", type="code", name="Bin", payload={"src": "v1"},
+            session_id="blob_session",
+        ),
+    )
+    store = get_ghost_store()
+    store.add(None, "blob_bin", "v1", {"src": "ghost only"}, {"type": "adhoc_command"})
+    store.add(None, "blob_bin", "v1", {"src": "v1"}, {"type": "adhoc_command"})
+
+    settings = get_settings().model_copy(update={"GHOST_RECYCLE_BIN_SECONDS": 60})
+    with patch("app.services.artifact_service.get_settings", return_value=settings):
+        assert await ArtifactService.discard_ghosts(db_session, artifact) == (2, 2)
+        # Age the recycled rows past the window, then recycle another ghost
+        await db_session.execute(
+            text(
+                "UPDATE mutation_records SET timestamp = '2000-01-01 00:00:00' "
+                "WHERE artifact_id = 'blob_bin' AND status = 'discarded'"
+            )
+        )
+        store.add(None, "blob_bin", "v1", {"src": "latest"}, {"type": "adhoc_command"})
+        await ArtifactService.discard_ghosts(db_session, artifact)
+
+    stored = set(
+        (
+            await db_session.execute(
+                select(PayloadBlob.checksum).where(
+                    PayloadBlob.checksum.in_(
+                        [payload_digest({"src": s})[0] for s in ("v1", "ghost only", "latest")]
+                    )
+                )
+            )
+        ).scalars()
+    )
+    # v1 is still referenced by the committed version
+    assert stored == {payload_digest({"src": "v1"})[0], payload_digest({"src": "latest"})[0]}
+
+
+@pytest.mark.asyncio
+async def test_sweep_purges_every_artifacts_recycle_bin(db_session):
+    artifact = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="blob_sweep", type="code", name="Sweep", payload={"src": "v1"},
+            session_id="blob_session",
+        ),
+    )
+    store = get_ghost_store()
+    store.add(None, "blob_sweep", "v1", {"src": "swept"}, {"type": "adhoc_command"})
+    settings = get_settings().model_copy(update={"GHOST_RECYCLE_BIN_SECONDS": 60})
+    with patch("app.services.artifact_service.get_settings", return_value=settings):
+        await ArtifactService.discard_ghosts(db_session, artifact)
+        await db_session.execute(
+            text(
+                "UPDATE mutation_records SET timestamp = '2000-01-01 00:00:00' "
+                "WHERE artifact_id = 'blob_sweep' AND status = 'discarded'"
+            )
+        )
+        # No further ghost activity on the artifact
+        assert await ArtifactService.sweep_recycle_bin(db_session) >= 1
+
+    swept = payload_digest({"src": "swept"})[0]
+    assert await db_session.get(PayloadBlob, swept) is None
+    remaining = await db_session.scalar(
+        select(func.count()).select_from(MutationRecord).where(
+            MutationRecord.artifact_id == "blob_sweep",
+            MutationRecord.status == "discarded",
+        )
+    )
+    assert remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_stored_blobs_are_reinserted_on_flush(db_session):
+    # A purge can delete a blob after the flush found it stored
+    payload = {"src": "reverted"}
+    artifact = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="blob_race", type="code", name="Race", payload=payload,
+            session_id="blob_session",
+        ),
+    )
+    with patch("app.models.artifact._insert_blobs", wraps=_insert_blobs) as insert:
+        await ArtifactService.update_artifact(
+            db_session, artifact, ArtifactUpdate(payload=payload)
+        )
+    rows = insert.call_args.args[1]
+    assert [row["checksum"] for row in rows] == [payload_digest(payload)[0]]
+
+
+def test_blob_inserts_follow_the_dialect(tmp_path):
+    statement = postgresql.insert(PayloadBlob).on_conflict_do_nothing()
+    assert "ON CONFLICT DO NOTHING" in str(statement.compile(dialect=postgresql.dialect()))
+
+    # Dialects without ON CONFLICT insert row by row under savepoints
+    engine = create_engine(f"sqlite:///{tmp_path / 'blobs.db'}")
+    Base.metadata.create_all(engine)
+    engine.dialect.name = "generic"
+    checksum, size = payload_digest({"v": 1})
+    row = {"checksum": checksum, "payload": {"v": 1}, "size": size}
+    with Session(engine) as session:
+        _insert_blobs(session, [row])
+        _insert_blobs(session, [row, {**row, "checksum": "other"}])
+        session.commit()
+        assert session.scalar(select(func.count()).select_from(PayloadBlob)) == 2
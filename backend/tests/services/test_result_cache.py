@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from app.core.cache.backends.memory import MemoryResultCache
+from app.core.cache.backends.sqlite import SQLiteResultCache
+from app.core.config import get_settings
+from app.core.llm_protocol import (
+    LLMProvider,
+    TextDeltaEvent,
+    ArtifactStartEvent,
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+)
+from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.schemas.chat import ExecutionRequest
+from app.services.artifact_service import ArtifactService
+from app.services.execution_service import ExecutionService
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+@pytest.mark.asyncio
+async def test_backend_lru_and_ttl(backend, tmp_path):
+    if backend == "memory":
+        cache = MemoryResultCache(max_entries=2, ttl_seconds=60)
+    else:
+        cache = SQLiteResultCache(str(tmp_path / "cache.db"), max_entries=2, ttl_seconds=60)
+    try:
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        assert await cache.get("a") == {"v": 1}  # "a" is now most recent
+        await cache.set("c", {"v": 3})
+        assert await cache.get("b") is None
+        assert await cache.get("c") == {"v": 3}
+
+        await cache.set("short", {"v": 4}, ttl_seconds=0.05)
+        await asyncio.sleep(0.1)
+        assert await cache.get("short") is None
+
+        stats = cache.stats()
+        assert stats["backend"] == backend
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["evictions"] >= 1
+    finally:
+        await cache.aclose()
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_stream(self, request):
+        self.calls += 1
+        yield TextDeltaEvent(content="The total ")
+        yield TextDeltaEvent(content="is 6.")
+        yield ArtifactStartEvent(artifact_id="gen_total", artifact_type="data")
+        yield ArtifactChunkEvent(artifact_id="gen_total", chunk='{"total": 6}')
+        yield ArtifactEndEvent(artifact_id="gen_total")
+
+
+@contextmanager
+def _cache_enabled(provider=None):
+    settings = get_settings().model_copy(update={"RESULT_CACHE_ENABLED": True})
+    cache = MemoryResultCache(max_entries=16, ttl_seconds=60)
+    with (
+        patch("app.services.result_cache.get_settings", return_value=settings),
+        patch("app.services.result_cache.get_result_cache", return_value=cache),
+        patch("app.services.execution_service.get_llm_provider", return_value=provider),
+    ):
+        yield cache
+
+
+@pytest.mark.asyncio
+async def test_command_result_is_cached_per_artifact_version(db_session):
+    artifact = await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="cache_cmd_art",
+            type="data",
+            name="Sales",
+            payload={"rows": [1]},
+            session_id="cache_cmd_session",
+        ),
+    )
+
+    def request(action="plot  sales", **kwargs):
+        return ExecutionRequest(
+            type="command",
+            session_id="cache_cmd_session",
+            command_name="plot",
+            action=action,
+            referenced_artifact_ids=["cache_cmd_art"],
+            **kwargs,
+        )
+
+    with _cache_enabled() as cache:
+        first = await ExecutionService.execute(db_session, request())
+        second = await ExecutionService.execute(db_session, request(action=" plot sales "))
+        bypass = await ExecutionService.execute(db_session, request(bypass_cache=True))
+
+        await ArtifactService.update_artifact(
+            db_session, artifact, ArtifactUpdate(payload={"rows": [1, 2]})
+        )
+        changed = await ExecutionService.execute(db_session, request())
+
+    assert first["result"]["metadata"]["cache"] == "miss"
+    assert second["result"]["metadata"]["cache"] == "hit"
+    assert bypass["result"]["metadata"]["cache"] == "bypass"
+    assert changed["result"]["metadata"]["cache"] == "miss"
+    assert cache.hits == 1
+
+    # A hit still records its own message and artifact copies
+    hit_art = second["result"]["new_artifacts"][0]
+    first_art = first["result"]["new_artifacts"][0]
+    assert hit_art.id != first_art.id
+    assert hit_art.payload == first_art.payload
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_replays_cached_events(db_session):
+    provider = CountingProvider()
+    with _cache_enabled(provider):
+        first = await ExecutionService.execute(
+            db_session,
+            ExecutionRequest(type="chat", session_id="cache_chat_a", action="Sum it"),
+        )
+        # Same question in a fresh session: same (empty) history
+        frames = [
+            frame
+            async for frame in ExecutionService.execute_stream(
+                db_session,
+                ExecutionRequest(
+                    type="chat", session_id="cache_chat_b", action="Sum it", stream=True
+                ),
+            )
+        ]
+
+    assert provider.calls == 1
+    assert first["result"]["metadata"]["cache"] == "miss"
+    assert '"cache": "hit"' in frames[-1]
+    assert any("The total is 6." in f for f in frames)
+    assert '{\\"total\\": 6}' in "".join(frames)
+    assert "gen_total" not in frames[-1]
@@ -0,0 +1,115 @@
+import os
+import pytest
+from unittest.mock import patch
+from app.core.config import get_settings
+from app.core.sandbox import SandboxCrashed, SandboxPool
+from app.schemas.artifact import ArtifactCreate
+from app.schemas.chat import ExecutionRequest
+from app.services.artifact_service import ArtifactService
+from app.services.execution_service import ExecutionService
+
+
+@pytest.fixture
+async def pool():
+    pool = SandboxPool(
+        workers=1,
+        timeout=1.0,
+        cpu_seconds=1,
+        memory_bytes=256 * 1024 * 1024,
+        max_output=1000,
+        payload_cache_entries=2,
+    )
+    yield pool
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sandbox_limits_and_isolation(pool):
+    payload = {"rows": [1, 2, 3]}
+    outcome = await pool.run(
+        "print(len(data['rows'])); result = sum(data['rows'])", payload, "p:v1"
+    )
+    assert outcome == {"stdout": "3\n", "result": 6, "artifacts": [], "error": None}
+
+    # The payload segment is shared once and reused across calls
+    await pool.run("result = data", payload, "p:v1")
+    assert pool.stats()["cached_payloads"] == 1
+
+    outcome = await pool.run("while True:\n    pass")
+    assert outcome["error"] in ("Timed out", "CPU time limit exceeded")
+
+    outcome = await pool.run("blob = bytearray(10**9)")
+    assert outcome["error"].startswith("MemoryError")
+
+    outcome = await pool.run("result = object()")
+    assert "not JSON serializable" in outcome["error"]
+
+    with pytest.raises(SandboxCrashed):
+        await pool.run("import os\nos._exit(1)")
+    # The pool is rebuilt for the next call
+    outcome = await pool.run("print('alive')")
+    assert outcome["stdout"] == "alive\n"
+    assert pool.stats()["restarts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_workers_are_scrubbed_and_not_reused(pool):
+    with patch.dict(os.environ, {"SECRET_KEY": "server-signing-key"}):
+        outcome = await pool.run(
+            "import math, os\n"
+            "math.pi = 3\n"
+            "result = [os.environ.get('SECRET_KEY'), os.getpid()]"
+        )
+    secret, first_pid = outcome["result"]
+    assert secret is None
+
+    outcome = await pool.run("import math, os\nresult = [math.pi, os.getpid()]")
+    assert outcome["result"][0] > 3.14
+    assert outcome["result"][1] != first_pid
+
+
+@pytest.mark.asyncio
+async def test_run_command_versions_target_artifact(db_session, pool):
+    await ArtifactService.create_or_update_artifact(
+        db_session,
+        ArtifactCreate(
+            id="run_target",
+            type="data",
+            name="Numbers",
+            payload={"rows": [1, 2, 3]},
+            session_id="run_session",
+        ),
+    )
+    req = ExecutionRequest(
+        type="command",
+        session_id="run_session",
+        command_name="run",
+        action=(
+            "print('doubling')\n"
+            "result = {'rows': [r * 2 for r in data['rows']]}\n"
+            "emit({'total': sum(data['rows'])}, name='Total')"
+        ),
+        referenced_artifact_ids=["run_target"],
+    )
+    with patch("app.services.execution_service.get_sandbox_pool", return_value=pool):
+        response = await ExecutionService.execute(db_session, req)
+    # Off unless explicitly enabled
+    assert response["result"]["status"] == "error"
+    assert "disabled" in response["result"]["output_message"].content
+
+    settings = get_settings().model_copy(update={"SANDBOX_ENABLED": True})
+    with patch("app.services.execution_service.get_sandbox_pool", return_value=pool), \
+            patch("app.services.execution_service.get_settings", return_value=settings):
+        response = await ExecutionService.execute(db_session, req)
+
+    result = response["result"]
+    assert result["status"] == "success"
+    assert result["output_message"].content == "doubling\n"
+
+    target, total = result["new_artifacts"]
+    assert target.id == "run_target"
+    assert target.payload == {"rows": [2, 4, 6]}
+    versions = sorted(m.version_id for m in target.mutations)
+    assert versions == ["v1", "v2"]
+    assert total.payload == {"total": 6}
+    assert total.mutations[0].version_id == "v1"
@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from app.core.stream_log import MemoryStreamLog, SQLiteStreamLog
+from app.core.turn_stream import (
+    TurnNotFound,
+    TurnStreamBroker,
+    TurnWindowLost,
+    parse_event_id,
+)
+
+
+def _producer(count, delay=0.0, calls=None):
+    def produce(is_abandoned):
+        async def frames():
+            if calls is not None:
+                calls.append(1)
+            for i in range(count):
+                if delay:
+                    await asyncio.sleep(delay)
+                if await is_abandoned():
+                    yield "data: abandoned\n\n"
+                    return
+                yield f"data: {i}\n\n"
+
+        return frames()
+
+    return produce
+
+
+def _seqs(frames):
+    return [parse_event_id(f.split("\n", 1)[0][4:])[1] for f in frames]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+@pytest.mark.asyncio
+async def test_reconnect_resumes_without_rerunning(backend, tmp_path):
+    if backend == "memory":
+        log = MemoryStreamLog(max_turns=10, max_frames=100, ttl_seconds=60)
+    else:
+        log = SQLiteStreamLog(
+            str(tmp_path / "log.db"), 10, 100, 60, flush_interval=0.05, flush_frames=4
+        )
+    broker = TurnStreamBroker(log, grace_seconds=5, poll_interval=0.01)
+    calls = []
+    try:
+        turn_id = await broker.start(7, _producer(6, delay=0.01, calls=calls))
+
+        first = await broker.attach(turn_id, 7)
+        received = [await first.__anext__() for _ in range(2)]
+        await first.aclose()  # Network blip
+        assert _seqs(received) == [1, 2]
+
+        resumed = await broker.attach(turn_id, 7, after_seq=2)
+        rest = [frame async for frame in resumed]
+        assert _seqs(rest) == [3, 4, 5, 6]
+        assert rest[-1].endswith("data: 5\n\n")
+        assert len(calls) == 1
+
+        # Completed turns can still be replayed, but only by their owner
+        replay = await broker.attach(turn_id, 7, after_seq=4)
+        assert _seqs([f async for f in replay]) == [5, 6]
+        with pytest.raises(TurnNotFound):
+            await broker.attach(turn_id, 8)
+    finally:
+        await broker.aclose()
+        await log.aclose()
+
+
+@pytest.mark.asyncio
+async def test_producer_is_told_when_no_reader_returns():
+    log = MemoryStreamLog(max_turns=10, max_frames=100, ttl_seconds=60)
+    broker = TurnStreamBroker(log, grace_seconds=0.05, poll_interval=0.01)
+    turn_id = await broker.start(1, _producer(100, delay=0.01))
+    await asyncio.sleep(0.2)
+
+    frames = [f async for f in await broker.attach(turn_id, 1)]
+    assert frames[-1].endswith("data: abandoned\n\n")
+    assert len(frames) < 100
+
+
+@pytest.mark.asyncio
+async def test_log_window_and_ttl():
+    log = MemoryStreamLog(max_turns=10, max_frames=3, ttl_seconds=0.05)
+    broker = TurnStreamBroker(log, grace_seconds=5, poll_interval=0.01)
+    turn_id = await broker.start(1, _producer(5))
+    frames = [f async for f in await broker.attach(turn_id, 1, after_seq=2)]
+    assert _seqs(frames) == [3, 4, 5]
+
+    with pytest.raises(TurnWindowLost):
+        await broker.attach(turn_id, 1, after_seq=0)
+
+    await asyncio.sleep(0.1)
+    with pytest.raises(TurnNotFound):
+        await broker.attach(turn_id, 1, after_seq=3)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+@pytest.mark.asyncio
+async def test_log_byte_budgets(backend, tmp_path):
+    frame = "data: " + "é" * 46 + "\n\n"  # 100 bytes, 54 characters
+    if backend == "memory":
+        log = MemoryStreamLog(10, 100, 60, max_turn_bytes=300, max_bytes=650)
+    else:
+        log = SQLiteStreamLog(str(tmp_path / "log.db"), 10, 100, 60, 300, 650)
+    try:
+        await log.create("old", 1)
+        for seq in range(1, 4):
+            await log.append("old", seq, frame)
+        await log.close("old")
+
+        await log.create("big", 1)
+        for seq in range(1, 6):
+            await log.append("big", seq, frame)
+        # Each turn keeps its newest frames within its own budget
+        big = await log.read("big", 0)
+        assert [seq for seq, _ in big.frames] == [3, 4, 5]
+        assert big.first_seq == 3
+        assert [seq for seq, _ in (await log.read("old", 0)).frames] == [1, 2, 3]
+
+        # Over the global budget the finished turn goes first
+        await log.create("new", 1)
+        await log.append("new", 1, frame)
+        assert await log.read("old", 0) is None
+        assert await log.read("big", 2) is not None
+    finally:
+        await log.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_log_batches_commits(tmp_path):
+    path = str(tmp_path / "log.db")
+    log = SQLiteStreamLog(path, 10, 100, 60, flush_interval=0.05, flush_frames=8)
+    other = SQLiteStreamLog(path, 10, 100, 60)  # Another worker process
+    try:
+        await log.create("t", 1)
+        for seq in range(1, 11):
+            await log.append("t", seq, f"data: {seq}\n\n")
+        assert log.stats()["commits"] == 1
+        # Seen here at once, by other workers after the next commit
+        assert len((await log.read("t", 0)).frames) == 10
+        assert len((await other.read("t", 0)).frames) == 8
+        await asyncio.sleep(0.1)
+        assert len((await other.read("t", 0)).frames) == 10
+        assert log.stats()["commits"] == 2
+    finally:
+        await log.aclose()
+        await other.aclose()
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import select
+from app.models.artifact import Artifact, MutationRecord
+from app.models.chat import ChatSession, ChatMessage
+from app.services.turn_writer import TurnWriter
+
+
+@pytest.mark.asyncio
+async def test_turn_writer_persists_turn_in_one_commit(db_session):
+    writer = TurnWriter(db_session, "turn_writer_session")
+    await writer.ensure_session("Turn Writer")
+    assert writer.session is not None
+
+    user_msg = writer.add_message("user", "make a plot")
+
+    art = Artifact(
+        id="turn_writer_art",
+        type="visual",
+        payload={"format": "svg"},
+        artifact_metadata={"name": "Plot"},
+        session_id="turn_writer_session",
+    )
+    art.mutations.append(
+        MutationRecord(
+            artifact_id=art.id,
+            version_id="v1",
+            origin={"type": "chat_inference"},
+            payload=art.payload,
+            status="committed",
+        )
+    )
+    writer.add_artifact(art)
+    reply = writer.add_message("assistant", "done", artifacts=[art])
+
+    # Nothing is visible before commit
+    assert user_msg.id is None
+
+    await writer.commit()
+
+    # Response data is available from the in-memory objects
+    assert user_msg.id is not None
+    assert reply.created_at is not None
+    assert reply.artifacts[0].mutations[0].id is not None
+
+    session = await db_session.get(ChatSession, "turn_writer_session")
+    assert session is not None
+    result = await db_session.execute(
+        select(ChatMessage).where(ChatMessage.session_id == "turn_writer_session")
+    )
+    assert [m.role for m in result.scalars().all()] == ["user", "assistant"]
+
+
+@pytest.mark.asyncio
+async def test_turn_writer_reuses_existing_session(db_session):
+    writer = TurnWriter(db_session, "turn_writer_session_2")
+    await writer.ensure_session("First")
+    writer.add_message("user", "hello")
+    await writer.commit()
+
+    writer = TurnWriter(db_session, "turn_writer_session_2")
+    await writer.ensure_session("Second")
+    assert writer.session is None
+    writer.add_message("user", "again")
+    await writer.commit()
+
+    session = await db_session.get(ChatSession, "turn_writer_session_2")
+    assert session.name == "First"
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.artifact import MutationRecord
+from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.services.artifact_service import ArtifactService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_edits_get_distinct_versions(db_engine):
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        artifact = await ArtifactService.create_or_update_artifact(
+            db,
+            ArtifactCreate(
+                id="alloc_art", type="doc", name="Draft", payload={"n": 0},
+                session_id="alloc_session",
+            ),
+        )
+        assert artifact.head_version == 1
+
+    async def edit(n):
+        async with AsyncSession(db_engine, expire_on_commit=False) as db:
+            existing = await ArtifactService.get_artifact(db, "alloc_art")
+            await ArtifactService.update_artifact(db, existing, ArtifactUpdate(payload={"n": n}))
+
+    await asyncio.gather(*(edit(n) for n in range(1, 6)))
+
+    async with AsyncSession(db_engine, expire_on_commit=False) as db:
+        artifact = await ArtifactService.get_artifact(db, "alloc_art")
+        assert artifact.head_version == 6
+        assert ArtifactService.head_version(artifact) == "v6"
+        mutations = sorted(artifact.mutations, key=lambda m: int(m.version_id[1:]))
+        assert [m.version_id for m in mutations] == [f"v{i}" for i in range(1, 7)]
+        assert [m.parent_id for m in mutations] == [None] + [f"v{i}" for i in range(1, 6)]
+
+        # A metadata-only edit does not use up a version
+        await ArtifactService.update_artifact(db, artifact, ArtifactUpdate(name="Renamed"))
+        assert artifact.head_version == 6
+
+        db.add(
+            MutationRecord(
+                artifact_id="alloc_art", version_id="v6", origin={"type": "manual_edit"},
+                payload={"n": 6}, status="committed",
+            )
+        )
+        with pytest.raises(IntegrityError):
+            await db.commit()
+        await db.rollback()
+        stored = (
+            await db.execute(select(MutationRecord).where(MutationRecord.artifact_id == "alloc_art"))
+        ).scalars().all()
+        assert len(stored) == 6
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from app.core.artifact.blobs import canonical_json, payload_digest
+from app.core.artifact.deltas import apply, diff
+from app.core.artifact.versions import get_version_cache
+from app.core.config import get_settings
+from app.db.base_class import Base
+from app.models.artifact import MutationRecord
+from app.schemas.artifact import ArtifactCreate, ArtifactUpdate
+from app.services.artifact_service import ArtifactService
+from migrate_version_deltas import convert
+
+
+def _rows(count):
+    return {"title": "Sales", "rows": [{"n": i, "label": f"row {i}"} for i in range(count)]}
+
+
+def test_code_edits_are_line_hunks():
+    old = {"language": "python", "source": "".join(f"x{i} = {i}\n" for i in range(50))}
+    new = {"language": "python", "source": old["source"].replace("x7 = 7\n", "x7 = 70\n")}
+    delta = diff(old, new)
+    assert delta == [{"op": "text", "path": "/source", "hunks": [[7, 8, "x7 = 70\n"]]}]
+    assert apply(old, delta) == new
+    assert old["source"].count("x7 = 7\n") == 1  # The base is not modified
+
+
+@pytest.mark.asyncio
+async def test_delta_chain_with_keyframes(db_session):
+    settings = get_settings().model_copy(
+        update={"VERSION_STORAGE_MODE": "delta", "VERSION_KEYFRAME_INTERVAL": 3}
+    )
+    with patch("app.models.artifact.get_settings", return_value=settings):
+        artifact = await ArtifactService.create_or_update_artifact(
+            db_session,
+            ArtifactCreate(
+                id="delta_art", type="data", name="Sales", payload=_rows(40),
+                session_id="delta_session",
+            ),
+        )
+        for count in range(41, 46):
+            artifact = await ArtifactService.update_artifact(
+                db_session, artifact, ArtifactUpdate(payload=_rows(count))
+            )
+
+    mutations = sorted(artifact.mutations, key=lambda m: m.id)
+    assert [m.encoding for m in mutations] == [
+        "full", "delta", "delta", "full", "delta", "delta"
+    ]
+    assert [m.chain_length for m in mutations] == [0, 1, 2, 0, 1, 2]
+    assert all(m.checksum == payload_digest(_rows(40 + i))[0] for i, m in enumerate(mutations))
+    # Only keyframes point at a blob
+    assert [m.blob_checksum is not None for m in mutations] == [
+        True, False, False, True, False, False
+    ]
+
+    # Reconstructed from the loaded history, without the write-time copies
+    db_session.expunge_all()
+    get_version_cache().clear()
+    reloaded = await ArtifactService.get_artifact(db_session, "delta_art")
+    by_version = {
+        m.version_id: await ArtifactService.load_version_payload(db_session, m)
+        for m in reloaded.mutations
+    }
+    assert by_version == {f"v{i + 1}": _rows(40 + i) for i in range(6)}
+
+    # A single version on its own loads the chain it needs
+    db_session.expunge_all()
+    get_version_cache().clear()
+    last = await db_session.get(MutationRecord, mutations[-1].id)
+    assert await ArtifactService.load_version_payload(db_session, last) == _rows(45)
+
+
+def test_converter_rewrites_full_histories(tmp_path):
+    path = tmp_path / "history.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    conn = sqlite3.connect(path)
+    payloads = [_rows(count) for count in range(30, 37)]
+    for i, payload in enumerate(payloads):
+        checksum, size = payload_digest(payload)
+        conn.execute(
+            "INSERT OR IGNORE INTO payload_blobs (checksum, payload, size) VALUES (?, ?, ?)",
+            (checksum, canonical_json(payload), size),
+        )
+        conn.execute(
+            "INSERT INTO mutation_records "
+            "(artifact_id, version_id, parent_id, origin, payload, checksum, "
+            "blob_checksum, status) "
+            "VALUES ('conv_art', ?, ?, '{}', 'null', ?, ?, 'committed')",
+            (f"v{i + 1}", f"v{i}" if i else None, checksum, checksum),
+        )
+    conn.commit()
+
+    convert(str(path), keyframe_interval=4)
+    convert(str(path), keyframe_interval=4)  # Re-running is a no-op
+
+    rows = conn.execute(
+        "SELECT m.id, m.encoding, m.delta, m.base_id, b.payload FROM mutation_records m "
+        "LEFT JOIN payload_blobs b ON b.checksum = m.blob_checksum ORDER BY m.id"
+    ).fetchall()
+    assert [r[1] for r in rows] == ["full", "delta", "delta", "delta", "full", "delta", "delta"]
+    assert conn.execute("SELECT count(*) FROM payload_blobs").fetchone()[0] == 2
+    violations = conn.execute("PRAGMA foreign_key_check(mutation_records)").fetchall()
+    assert [v for v in violations if v[2] == "payload_blobs"] == []
+
+    materialized = {}
+    for mutation_id, encoding, delta, base_id, blob in rows:
+        if encoding == "full":
+            materialized[mutation_id] = json.loads(blob)
+        else:
+            materialized[mutation_id] = apply(materialized[base_id], json.loads(delta))
+    assert list(materialized.values()) == payloads
+    conn.close()
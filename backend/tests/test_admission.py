@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from app.core.admission import AdmissionController, AdmissionRejected
+
+
+def _controller(**kwargs):
+    options = dict(
+        max_concurrent=2,
+        max_per_user=1,
+        queue_size=4,
+        queue_per_user=2,
+        queue_timeout=1.0,
+        retry_after=3,
+    )
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_round_robin_across_users():
+    controller = _controller(
+        max_concurrent=1, max_per_user=1, queue_size=8, queue_per_user=3
+    )
+    first = await controller.acquire("a")
+    order = []
+
+    async def turn(user):
+        ticket = await controller.acquire(user)
+        order.append(user)
+        await asyncio.sleep(0)
+        ticket.release()
+
+    # "a" queues a backlog before "b" and "c" arrive
+    tasks = [asyncio.ensure_future(turn(u)) for u in ["a", "a", "a", "b", "c"]]
+    await asyncio.sleep(0.01)
+    assert controller.stats()["queued"] == 5
+    first.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["a", "b", "c", "a", "a"]
+    assert controller.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_timeout_are_rejected():
+    controller = _controller(max_per_user=1, queue_per_user=1, queue_timeout=0.05)
+    ticket = await controller.acquire("a")
+    waiter = asyncio.ensure_future(controller.acquire("a"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire("a")
+    assert exc.value.retry_after == 3
+
+    # Other users are not affected by "a"'s backlog
+    other = await controller.acquire("b")
+    other.release()
+
+    with pytest.raises(AdmissionRejected):
+        await waiter
+    stats = controller.stats()
+    assert stats["rejected"] == 1
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+
+    ticket.release()
+    ticket.release()  # Idempotent
+    assert controller.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    controller = _controller(max_concurrent=1)
+    ticket = await controller.acquire("a")
+    waiter = asyncio.ensure_future(controller.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    ticket.release()
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_guard_holds_slot_for_stream_lifetime():
+    controller = _controller()
+    ticket = await controller.acquire("a")
+
+    async def stream():
+        yield "one"
+        yield "two"
+
+    guarded = ticket.guard(stream())
+    assert await guarded.__anext__() == "one"
+    assert controller.stats()["in_flight"] == 1
+    await guarded.aclose()
+    assert controller.stats()["in_flight"] == 0
@@ -72,3 +72,19 @@ async def test_workspace_lifecycle(client: AsyncClient):
     assert response.status_code == 200
     workspaces = response.json()
     assert not any(w["id"] == ws_id for w in workspaces)
+
+
+@pytest.mark.asyncio
+async def test_event_stream_rejects_foreign_workspace(client: AsyncClient):
+    owner = await get_auth_headers(client, "stream_owner")
+    response = await client.post(
+        "/api/v1/workspaces/", json={"name": "Private", "state": {}}, headers=owner
+    )
+    assert response.status_code == 201
+    ws_id = response.json()["id"]
+
+    intruder = await get_auth_headers(client, "stream_intruder")
+    response = await client.get(
+        "/api/v1/events/stream", params={"workspace_id": ws_id}, headers=intruder
+    )
+    assert response.status_code == 403
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.core.events import EventBus
+from app.core.jobs import JobManager, JobQueueFull
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_on_bounded_pool_and_publish_lifecycle():
+    bus = EventBus()
+    owner = bus.subscribe(user_id=1)
+    other = bus.subscribe(user_id=2)
+    manager = JobManager(workers=1, queue_size=1, retention=10, bus=bus)
+    release = asyncio.Event()
+
+    async def slow(job):
+        job.report_progress(0.5, "halfway")
+        await release.wait()
+        return {"answer": 42}
+
+    async def broken(job):
+        raise ValueError("boom")
+
+    try:
+        first = manager.submit("slow", slow, user_id=1)
+        await asyncio.sleep(0.01)  # Worker picks up the first job
+        second = manager.submit("broken", broken, user_id=1)
+        with pytest.raises(JobQueueFull):
+            manager.submit("slow", slow, user_id=1)
+
+        stats = manager.stats()
+        assert stats["running"] == 1
+        assert stats["queue_depth"] == 1
+        assert stats["rejected"] == 1
+
+        release.set()
+        for _ in range(100):
+            if second.done:
+                break
+            await asyncio.sleep(0.01)
+
+        assert first.status == "succeeded"
+        assert first.result == {"answer": 42}
+        assert second.status == "failed"
+        assert second.error == "boom"
+        assert manager.get(first.id) is first
+
+        events = []
+        while not owner.queue.empty():
+            events.append(owner.queue.get_nowait())
+        assert [(e["job_id"], e["type"]) for e in events] == [
+            (first.id, "job_queued"),
+            (first.id, "job_started"),
+            (first.id, "job_progress"),
+            (second.id, "job_queued"),
+            (first.id, "job_completed"),
+            (second.id, "job_started"),
+            (second.id, "job_failed"),
+        ]
+        assert other.queue.empty()
+    finally:
+        await manager.stop()
+
+
+def test_subscription_drops_oldest_when_full():
+    bus = EventBus(maxsize=2)
+    subscription = bus.subscribe()
+    for i in range(3):
+        bus.publish({"n": i})
+    assert [subscription.queue.get_nowait()["n"] for _ in range(2)] == [1, 2]
+    assert bus.stats()["dropped"] == 1
@@ -0,0 +1,92 @@
+import json
+import time
+import pytest
+from pydantic import ValidationError
+from app.core.llm_protocol import (
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+    ArtifactStartEvent,
+    TextDeltaEvent,
+    decode_event,
+)
+
+_EVENT_CLASSES = {
+    "text_delta": TextDeltaEvent,
+    "artifact_start": ArtifactStartEvent,
+    "artifact_chunk": ArtifactChunkEvent,
+    "artifact_end": ArtifactEndEvent,
+}
+
+
+def _legacy_decode(line):
+    # The per-line decoding HttpLLMProvider used before decode_event
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    cls = _EVENT_CLASSES.get(data.get("type"))
+    return cls(**data) if cls is not None else None
+
+
+def _text_stream(count):
+    return [json.dumps({"type": "text_delta", "content": f"token{i} "}) for i in range(count)]
+
+
+def _artifact_stream(count):
+    lines = []
+    for a in range(count // 12):
+        artifact_id = f"art_{a}"
+        lines.append(
+            json.dumps(
+                {
+                    "type": "artifact_start",
+                    "artifact_id": artifact_id,
+                    "artifact_type": "data",
+                    "artifact_metadata": {"name": f"Table {a}", "rows": 10},
+                }
+            )
+        )
+        for i in range(10):
+            chunk = json.dumps({"row": i, "values": list(range(8))})
+            lines.append(
+                json.dumps({"type": "artifact_chunk", "artifact_id": artifact_id, "chunk": chunk})
+            )
+        lines.append(json.dumps({"type": "artifact_end", "artifact_id": artifact_id}))
+    return lines
+
+
+def test_decode_event_matches_validated_models():
+    lines = _text_stream(5) + _artifact_stream(24)
+    assert [decode_event(line) for line in lines] == [_legacy_decode(line) for line in lines]
+    for line in ['{"type": "usage", "tokens": 3}', '{"a": 1}', "not json", "5"]:
+        assert decode_event(line) is None
+
+
+def test_decode_event_rejects_malformed_known_events():
+    with pytest.raises(ValidationError):
+        decode_event('{"type": "text_delta"}')
+
+
+def _events_per_second(decode, lines, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for line in lines:
+            decode(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+@pytest.mark.parametrize("stream", ["text", "artifact"])
+def test_decode_throughput(stream, capsys):
+    lines = _text_stream(20000) if stream == "text" else _artifact_stream(20000)
+    rates = {
+        "legacy": _events_per_second(_legacy_decode, lines),
+        "adapter": _events_per_second(decode_event, lines),
+    }
+    with capsys.disabled():
+        print(
+            f"\n{stream}-heavy stream, events/s: "
+            + ", ".join(f"{name}={rate:,.0f}" for name, rate in rates.items())
+        )
+    assert all(rate > 0 for rate in rates.values())
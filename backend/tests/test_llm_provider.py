@@ -1,8 +1,15 @@
 import pytest
 import os
 import json
+import httpx
 from unittest.mock import patch, AsyncMock, MagicMock
-from app.services.llm_providers import HttpLLMProvider, MockLLMProvider, get_llm_provider
+from app.services.llm_providers import (
+    HttpLLMProvider,
+    MockLLMProvider,
+    create_llm_provider,
+    get_llm_provider,
+    shutdown_llm_provider,
+)
 from app.core.llm_protocol import LLMRequest, LLMMessage, TextDeltaEvent, ArtifactStartEvent
 
 @pytest.mark.asyncio
@@ -21,47 +28,108 @@ async def test_mock_llm_provider():
     assert any(isinstance(e, TextDeltaEvent) for e in events)
 
 @pytest.mark.asyncio
-async def test_get_llm_provider():
+async def test_create_llm_provider():
     with patch.dict(os.environ, {"LLM_PROVIDER": "http"}):
-        assert isinstance(get_llm_provider(), HttpLLMProvider)
+        assert isinstance(create_llm_provider(), HttpLLMProvider)
 
     with patch.dict(os.environ, {"LLM_PROVIDER": "mock"}):
-        assert isinstance(get_llm_provider(), MockLLMProvider)
+        assert isinstance(create_llm_provider(), MockLLMProvider)
+
+
+@pytest.mark.asyncio
+async def test_get_llm_provider_is_singleton():
+    await shutdown_llm_provider()
+    with patch.dict(os.environ, {"LLM_PROVIDER": "http"}):
+        provider = get_llm_provider()
+        assert isinstance(provider, HttpLLMProvider)
+        assert get_llm_provider() is provider
+        client = provider.client
+        assert provider.client is client
+
+    await shutdown_llm_provider()
+    assert client.is_closed
+
 
 @pytest.mark.asyncio
 async def test_http_llm_provider():
-    with patch("httpx.AsyncClient") as mock_client:
-        mock_instance = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_instance
+    mock_instance = AsyncMock()
+
+    # Mock response
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status_code = 200
+
+    async def mock_aiter_lines():
+        yield json.dumps({"type": "text_delta", "content": "Hello"})
+        yield json.dumps({"type": "text_delta", "content": " World"})
+
+    mock_response.aiter_lines = mock_aiter_lines
+
+    # Mock stream context manager
+    mock_stream_context = MagicMock()
+    mock_stream_context.__aenter__.return_value = mock_response
+    mock_stream_context.__aexit__.return_value = None
+
+    # Ensure client.stream returns the context manager, not a coroutine
+    mock_instance.stream = MagicMock(return_value=mock_stream_context)
+
+    provider = HttpLLMProvider(client=mock_instance)
+    request = LLMRequest(
+        session_id="test",
+        messages=[LLMMessage(role="user", content="hello")]
+    )
 
-        # Mock response
-        mock_response = AsyncMock()
-        mock_response.raise_for_status = MagicMock()
+    events = []
+    async for event in provider.generate_stream(request):
+        events.append(event)
 
-        async def mock_aiter_lines():
-            yield json.dumps({"type": "text_delta", "content": "Hello"})
-            yield json.dumps({"type": "text_delta", "content": " World"})
+    assert len(events) == 2
+    assert events[0].content == "Hello"
+    assert events[1].content == " World"
+    assert provider.stats()["requests_total"] == 1
+    assert provider.stats()["active_streams"] == 0
 
-        mock_response.aiter_lines = mock_aiter_lines
 
-        # Mock stream context manager
-        mock_stream_context = MagicMock()
-        mock_stream_context.__aenter__.return_value = mock_response
-        mock_stream_context.__aexit__.return_value = None
+@pytest.mark.asyncio
+async def test_http_llm_provider_shares_client_across_requests():
+    seen = []
 
-        # Ensure client.stream returns the context manager, not a coroutine
-        mock_instance.stream = MagicMock(return_value=mock_stream_context)
+    def handler(request):
+        seen.append(request.url.path)
+        body = json.dumps({"type": "text_delta", "content": "ok"}) + "\n"
+        return httpx.Response(200, content=body.encode())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = HttpLLMProvider(client=client)
+    request = LLMRequest(session_id="test", messages=[])
+
+    for _ in range(3):
+        events = [e async for e in provider.generate_stream(request)]
+        assert events[0].content == "ok"
+
+    assert len(seen) == 3
+    assert provider.stats()["requests_total"] == 3
+    assert provider.client is client
+    await provider.aclose()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_http_llm_provider_frames_pass_text_through():
+    lines = [
+        json.dumps({"type": "text_delta", "content": "raw"}),
+        json.dumps({"type": "artifact_start", "artifact_id": "a", "artifact_type": "data"}),
+        json.dumps({"type": "unknown"}),
+    ]
 
-        provider = HttpLLMProvider()
-        request = LLMRequest(
-            session_id="test",
-            messages=[LLMMessage(role="user", content="hello")]
-        )
+    def handler(request):
+        return httpx.Response(200, content="\n".join(lines).encode())
 
-        events = []
-        async for event in provider.generate_stream(request):
-            events.append(event)
+    provider = HttpLLMProvider(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    request = LLMRequest(session_id="test", messages=[])
+    frames = [f async for f in provider.generate_frames(request)]
 
-        assert len(events) == 2
-        assert events[0].content == "Hello"
-        assert events[1].content == " World"
+    assert frames[0] == lines[0]
+    assert isinstance(frames[1], ArtifactStartEvent)
+    assert len(frames) == 2
+    await provider.aclose()
@@ -0,0 +1,135 @@
+import asyncio
+import httpx
+import pytest
+from app.core.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, Upstream
+
+
+class FakeServer:
+    """Minimal local HTTP server answering from a script of behaviours."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = 0
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        self.requests += 1
+        behaviour = self.script.pop(0) if self.script else 200
+        if behaviour == "hang":
+            await asyncio.sleep(5)
+        elif behaviour == "close":
+            writer.close()
+            return
+        else:
+            body = b'{"ok": true}'
+            writer.write(
+                f"HTTP/1.1 {behaviour} X\r\nContent-Length: {len(body)}\r\n"
+                f"Content-Type: application/json\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+
+
+def _upstream(retries=2, failures=3, reset=60.0, budget=None):
+    return Upstream(
+        "fake",
+        connect_timeout=0.5,
+        read_timeout=0.2,
+        retries=retries,
+        backoff=0.0,
+        backoff_max=0.0,
+        breaker=CircuitBreaker(failures, reset),
+        budget=budget or RetryBudget(ratio=1.0, min_per_second=10.0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_retries_then_succeeds():
+    upstream = _upstream()
+    async with FakeServer([503, "close"]) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            response = await upstream.call(lambda: client.get(server.url))
+    assert response.status_code == 200
+    assert server.requests == 3
+    assert upstream.stats()["retries"] == 2
+    assert upstream.stats()["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_are_not_retried_after_a_read_timeout():
+    upstream = _upstream()
+    async with FakeServer(["hang"]) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                await upstream.call(lambda: client.post(server.url), idempotent=False)
+    assert server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_posts_are_not_idempotent_by_default():
+    upstream = _upstream()
+    async with FakeServer(["hang", 500]) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                await upstream.call(lambda: client.post(server.url))
+            response = await upstream.call(lambda: client.post(server.url))
+    assert response.status_code == 500
+    assert server.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_fails_fast_and_recovers():
+    upstream = _upstream(retries=0, failures=2, reset=0.2)
+    async with FakeServer([500, 500]) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            for _ in range(2):
+                response = await upstream.call(lambda: client.get(server.url))
+                assert response.status_code == 500
+
+            with pytest.raises(CircuitOpenError) as e:
+                await upstream.call(lambda: client.get(server.url))
+            assert 0 < e.value.retry_after <= 0.2
+            assert server.requests == 2
+            assert upstream.stats()["state"] == "open"
+
+            await asyncio.sleep(0.25)
+            # Half-open: one probe goes through and closes the circuit
+            response = await upstream.call(lambda: client.get(server.url))
+    assert response.status_code == 200
+    stats = upstream.stats()
+    assert (stats["state"], stats["opened"], stats["rejected"]) == ("closed", 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0)
+    upstream = _upstream(retries=3, failures=100, budget=budget)
+    async with FakeServer([503] * 20) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            for _ in range(4):
+                await upstream.call(lambda: client.get(server.url))
+    # 4 requests earn 2 retries in total, not 3 each
+    assert server.requests == 6
+    assert upstream.stats()["retry_budget_exhausted"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_only_while_opening():
+    upstream = _upstream()
+    async with FakeServer([503, 200]) as server:
+        async with httpx.AsyncClient(timeout=upstream.timeout) as client:
+            async with upstream.stream(lambda: client.stream("POST", server.url)) as response:
+                body = await response.aread()
+    assert response.status_code == 200 and body == b'{"ok": true}'
+    assert server.requests == 2
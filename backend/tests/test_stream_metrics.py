@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.llm_protocol import (
+    ArtifactChunkEvent,
+    ArtifactEndEvent,
+    ArtifactStartEvent,
+    LLMProvider,
+    TextDeltaEvent,
+)
+from app.core.stream_metrics import Histogram, StreamMetrics, StreamTiming
+from app.schemas.chat import ExecutionRequest
+from app.services.execution_service import ExecutionService
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.05, 0.5, 5.0, 50.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "10.0": 4, "+Inf": 5}
+    assert snapshot["count"] == 5 and snapshot["max"] == 50.0
+    assert snapshot["p50"] == 1.0
+    assert snapshot["p99"] == 50.0
+    assert Histogram().percentile(0.5) is None
+
+
+class PacedProvider(LLMProvider):
+    name = "paced"
+
+    async def generate_stream(self, request):
+        artifact_id = f"gen_{request.session_id}"
+        await asyncio.sleep(0.05)
+        yield TextDeltaEvent(content="héllo")
+        await asyncio.sleep(0.02)
+        yield ArtifactStartEvent(artifact_id=artifact_id, artifact_type="data")
+        yield ArtifactChunkEvent(artifact_id=artifact_id, chunk='{"a": 1}')
+        yield ArtifactEndEvent(artifact_id=artifact_id)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.asyncio
+async def test_chat_turn_timing_is_recorded(db_session, stream):
+    metrics = StreamMetrics()
+    req = ExecutionRequest(
+        type="chat", session_id=f"timing_session_{stream}", action="Hi", stream=stream
+    )
+    with (
+        patch("app.services.execution_service.get_llm_provider", return_value=PacedProvider()),
+        patch("app.core.stream_metrics.get_stream_metrics", return_value=metrics),
+    ):
+        if stream:
+            frames = [f async for f in ExecutionService.execute_stream(db_session, req)]
+            assert '"timing"' in frames[-1]
+        else:
+            result = await ExecutionService.execute(db_session, req)
+            timing = result["result"]["metadata"]["timing"]
+            assert timing["provider"] == "paced"
+            assert timing["time_to_first_token_ms"] >= 50
+            assert timing["max_inter_token_ms"] >= 20
+            assert timing["events"] == 4
+            assert timing["bytes"] == len("héllo".encode()) + len('{"a": 1}')
+
+    [series] = metrics.stats()["series"]
+    assert (series["provider"], series["kind"], series["artifacts"]) == ("paced", "chat", True)
+    assert series["turns"] == 1
+    assert series["time_to_first_token_seconds"]["count"] == 1
+    assert series["inter_token_seconds"]["count"] == 3
+    assert series["generation_seconds"]["sum"] >= 0.07
+
+
+@pytest.mark.asyncio
+async def test_timing_without_events():
+    metrics = StreamMetrics()
+    with patch("app.core.stream_metrics.get_stream_metrics", return_value=metrics):
+        summary = StreamTiming("builtin", "command").finish(artifacts=False)
+    assert summary["time_to_first_token_ms"] is None
+    assert summary["events"] == 0
+    assert metrics.stats()["series"][0]["time_to_first_token_seconds"]["count"] == 0
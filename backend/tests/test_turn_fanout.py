@@ -0,0 +1,75 @@
+import asyncio
+import json
+import pytest
+from app.core.events import EventBus
+from app.core.stream_log import MemoryStreamLog
+from app.core.turn_stream import TurnStreamBroker
+
+
+def _frame(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+
+
+@pytest.mark.asyncio
+async def test_workspace_viewers_share_one_producer():
+    bus = EventBus(maxsize=4)
+    fast = bus.subscribe(1, "ws_a")
+    slow = bus.subscribe(2, "ws_a")
+    elsewhere = bus.subscribe(3, "ws_b")
+
+    log = MemoryStreamLog(max_turns=10, max_frames=100, ttl_seconds=60)
+    broker = TurnStreamBroker(log, grace_seconds=5, poll_interval=0.01)
+    def produce(is_abandoned):
+        async def frames():
+            for word in ["one ", "two ", "three ", "four ", "five"]:
+                yield _frame({"type": "text_delta", "content": word})
+                await asyncio.sleep(0.01)
+
+        return frames()
+
+    turn_id = await broker.start(
+        1, produce, on_frame=bus.publish_turn_frame, on_close=bus.end_turn
+    )
+    bus.begin_turn(turn_id, "ws_a", session_id="s1", user_id=1)
+
+    received = []
+    while not received or received[-1]["type"] != "turn_end":
+        received.append(await fast.get(timeout=1))
+
+    assert [e["type"] for e in received] == ["turn_start"] + ["turn_frame"] * 5 + ["turn_end"]
+    assert [e["seq"] for e in received[1:-1]] == [1, 2, 3, 4, 5]
+    assert elsewhere.queue.empty()
+
+    # The slow viewer's inbox overflowed: it skips to a snapshot of the turn
+    events = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+    assert [e["type"] for e in events] == ["turn_start", "turn_frame", "turn_frame", "turn_frame"]
+    # Frames are decoded once and the same event is queued for every viewer
+    assert events[1] is received[1]
+    snapshot = await slow.get(timeout=1)
+    assert snapshot["type"] == "turn_snapshot"
+    assert snapshot["content"] == "one two three four five"
+    assert snapshot["seq"] == 5 and snapshot["done"]
+    assert slow.dropped == 3
+    assert bus.stats()["relayed_frames"] == 5
+
+
+@pytest.mark.asyncio
+async def test_late_viewer_starts_from_snapshot():
+    bus = EventBus(maxsize=8)
+    bus.begin_turn("t1", "ws_a", session_id="s1", user_id=1)
+    bus.publish_turn_frame(
+        "t1", 1, _frame({"type": "artifact_start", "artifact_id": "a", "artifact_type": "data"})
+    )
+    bus.publish_turn_frame("t1", 2, _frame({"type": "artifact_chunk", "artifact_id": "a", "chunk": '{"x"'}))
+
+    late = bus.subscribe(2, "ws_a")
+    snapshot = await late.get(timeout=1)
+    assert snapshot["type"] == "turn_snapshot" and snapshot["seq"] == 2
+    assert snapshot["artifacts"][0]["content"] == '{"x"'
+    assert not snapshot["done"]
+
+    bus.publish_turn_frame("t1", 3, _frame({"type": "artifact_chunk", "artifact_id": "a", "chunk": ": 1}"}))
+    event = await late.get(timeout=1)
+    assert event["type"] == "turn_frame" and event["seq"] == 3
@@ -24,6 +24,7 @@ import DataGridRenderer from '../renderers/DataGridRenderer';
 import VisualRenderer from '../renderers/VisualRenderer';
 import ChatRenderer from '../renderers/ChatRenderer';
 import { PaneType, MutationStatus } from '@/types/constants';
+import { apiClient } from '@/lib/apiClient';
 
 interface ContentFactoryProps {
     pane: Pane;
@@ -33,6 +34,23 @@ const ContentFactory: React.FC<ContentFactoryProps> = ({ pane }) => {
     const { artifacts, activeVersions } = useWorkspaceStore();
     const artifact = artifacts[pane.artifactId];
     const activeVersionId = activeVersions[pane.artifactId];
+    const currentMutation = artifact?.mutations?.find(m => m.version_id === activeVersionId);
+
+    // History arrives without payloads; fetch the viewed version's on demand
+    const versionKey = `${pane.artifactId}:${activeVersionId}`;
+    const [versionPayloads, setVersionPayloads] = React.useState<Record<string, any>>({});
+    const needsPayload = !!currentMutation && currentMutation.payload === undefined && !(versionKey in versionPayloads);
+
+    React.useEffect(() => {
+        if (!needsPayload) return;
+        let cancelled = false;
+        apiClient.getArtifactVersion(pane.artifactId, activeVersionId)
+            .then(version => {
+                if (!cancelled) setVersionPayloads(prev => ({ ...prev, [versionKey]: version.payload }));
+            })
+            .catch(err => console.error('Failed to load version payload', err));
+        return () => { cancelled = true; };
+    }, [needsPayload, versionKey]);
 
     if (!artifact) {
         return (
@@ -43,9 +61,10 @@ const ContentFactory: React.FC<ContentFactoryProps> = ({ pane }) => {
         );
     }
 
-    // Resolve what to display based on active versionId
-    const currentMutation = artifact.mutations?.find(m => m.version_id === activeVersionId);
-    const displayPayload = currentMutation ? currentMutation.payload : artifact.payload;
+    // Resolve what to display based on active versionId (the head until its payload arrives)
+    const displayPayload = currentMutation?.payload !== undefined
+        ? currentMutation.payload
+        : versionKey in versionPayloads ? versionPayloads[versionKey] : artifact.payload;
     const isGhost = currentMutation?.status === MutationStatus.GHOST;
     const title = artifact.metadata?.name || 'Untitled';
 
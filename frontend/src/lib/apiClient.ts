@@ -189,6 +189,44 @@ class ApiClient {
         });
     }
 
+    // Bulk reads/writes: one request for many panes, with a status per item
+    async batchGetArtifacts(artifactIds: string[]): Promise<{
+        items: { id: string; status: string; artifact?: any; error?: string }[];
+    }> {
+        return this.request('/api/v1/artifacts/batch-get', {
+            method: 'POST',
+            body: JSON.stringify({ artifact_ids: artifactIds }),
+        });
+    }
+
+    async batchUpsertArtifacts(artifacts: any[]): Promise<{
+        items: { id: string; status: string; artifact?: any; error?: string }[];
+    }> {
+        return this.request('/api/v1/artifacts/batch-upsert', {
+            method: 'POST',
+            body: JSON.stringify({ artifacts }),
+        });
+    }
+
+    // Version history: headers only, payloads fetched one version at a time
+    async listArtifactVersions(id: string, offset: number = 0, limit: number = 50): Promise<{
+        items: any[]; total: number; offset: number; limit: number;
+    }> {
+        return this.request(`/api/v1/artifacts/${id}/versions?offset=${offset}&limit=${limit}`);
+    }
+
+    async getArtifactVersion(id: string, versionId: string): Promise<any> {
+        return this.request(`/api/v1/artifacts/${id}/versions/${encodeURIComponent(versionId)}`);
+    }
+
+    // Warm referenced artifacts before an execute call (e.g. when @P2 is typed)
+    async prefetchArtifacts(artifactIds: string[]): Promise<{ artifacts: Record<string, string> }> {
+        return this.request('/api/v1/artifacts/prefetch', {
+            method: 'POST',
+            body: JSON.stringify({ artifact_ids: artifactIds }),
+        });
+    }
+
     // Auth
     async login(username: string, password: string): Promise<any> {
         const cleanUsername = username?.trim();
@@ -61,7 +61,7 @@ export interface MutationRecord {
     timestamp: string;
     origin: MutationOrigin;
     change_summary?: string;
-    payload: any;
+    payload?: any; // Omitted from history listings; see apiClient.getArtifactVersion
     checksum?: string;
     status: MutationStatus;
 }